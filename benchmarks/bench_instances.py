@@ -0,0 +1,144 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+"""
+Measure the time it takes to build 50 Klipper instances from their systemd
+service files, with the previous get_data_dir that reads the service file on
+every call, with a cold unit file cache and with a warm unit file cache.
+The lazy variant only creates the instances without accessing their data dir.
+
+The service files are created in a temporary directory, which is used in place
+of /etc/systemd/system.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_instances
+"""
+
+from __future__ import annotations
+
+import re
+import tempfile
+import timeit
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import kiauh  # noqa: F401 - sets up the import paths of the application
+
+# isort: split
+from components.klipper.klipper import Klipper
+from core.instance_manager import base_instance
+from utils import fs_utils, sys_utils
+
+INSTANCE_COUNT = 50
+REPEAT = 5
+NUMBER = 20
+
+_SERVICE_TEMPLATE = """[Unit]
+Description=Klipper 3D Printer Firmware SV1
+Documentation=https://www.klipper3d.org/
+After=network-online.target
+Wants=udev.target
+
+[Install]
+WantedBy=multi-user.target
+
+[Service]
+Type=simple
+User=pi
+RemainAfterExit=yes
+WorkingDirectory=/home/pi/klipper
+EnvironmentFile={data_dir}/systemd/klipper.env
+ExecStart=/home/pi/klippy-env/bin/python $KLIPPER_ARGS
+Restart=always
+RestartSec=10
+"""
+
+
+def legacy_get_data_dir(instance_type: type, suffix: str) -> Path:
+    """get_data_dir as it was before unit file metadata was cached"""
+    service_file_path = sys_utils.get_service_file_path(instance_type, suffix)
+    if service_file_path and service_file_path.exists():
+        with open(service_file_path, "r") as service_file:
+            lines = service_file.readlines()
+            for line in lines:
+                pattern = r"^EnvironmentFile=(.+)(/systemd/.+\.env)"
+                match = re.search(pattern, line)
+                if match:
+                    return Path(match.group(1))
+
+    if suffix != "":
+        return Path.home().joinpath(f"printer_{suffix}_data")
+
+    return Path.home().joinpath("printer_data")
+
+
+@contextmanager
+def fake_systemd_dir() -> Iterator[Path]:
+    """Create the service files of all instances in a temporary directory"""
+    original = sys_utils.SYSTEMD
+    with tempfile.TemporaryDirectory() as tmp:
+        systemd = Path(tmp)
+        for i in range(1, INSTANCE_COUNT + 1):
+            content = _SERVICE_TEMPLATE.format(data_dir=f"/home/pi/printer_{i}_data")
+            systemd.joinpath(f"klipper-{i}.service").write_text(content)
+        sys_utils.SYSTEMD = systemd
+        try:
+            yield systemd
+        finally:
+            sys_utils.SYSTEMD = original
+
+
+def build_instances(resolve_data_dir: bool = True) -> None:
+    for i in range(1, INSTANCE_COUNT + 1):
+        instance = Klipper(str(i))
+        if resolve_data_dir:
+            # the data dir is resolved lazily on first access
+            _ = instance.data_dir
+
+
+def bench(setup=None, resolve_data_dir: bool = True) -> float:
+    """Return the best time in ms to build all instances"""
+
+    def _run() -> None:
+        if setup is not None:
+            setup()
+        build_instances(resolve_data_dir)
+
+    return min(timeit.repeat(_run, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def main() -> None:
+    with fake_systemd_dir():
+        base_instance.get_data_dir = legacy_get_data_dir
+        try:
+            # the legacy Klipper class read the service file a second time, so
+            # this variant still underestimates the previous cost
+            legacy = bench()
+        finally:
+            base_instance.get_data_dir = fs_utils.get_data_dir
+
+        cold = bench(setup=fs_utils._UNIT_FILE_CACHE.clear)
+        warm = bench()
+        lazy = bench(resolve_data_dir=False)
+
+    print(f"{'variant':>8} {'total [ms]':>12} {'per instance [us]':>18}")
+    for variant, elapsed in (
+        ("legacy", legacy),
+        ("cold", cold),
+        ("warm", warm),
+        ("lazy", lazy),
+    ):
+        per_instance = elapsed / INSTANCE_COUNT * 1000
+        print(f"{variant:>8} {elapsed:>12.3f} {per_instance:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ from core.constants import (
 )
 from core.instance_type import InstanceType
 from core.menus.base_menu import print_back_footer
+from utils.instance_utils import UNIT_STATUS
 
 
 @unique
@@ -51,9 +52,16 @@ def print_instance_overview(
         dialog += f"║ {select_all:<63}║\n"
         dialog += "║                                                       ║\n"
 
+    # the unit states of all listed instances are fetched at once
+    states = (
+        UNIT_STATUS.get_states() if display_type is DisplayType.SERVICE_NAME else {}
+    )
     for i, s in enumerate(instances):
         if display_type is DisplayType.SERVICE_NAME:
             name = s.service_file_path.stem
+            state = states.get(s.service_file_path.name)
+            if state is not None:
+                name = f"{name} ({state.active_state})"
         else:
             name = s.data_dir
         line = f"{COLOR_CYAN}{f'{i + start_index})' if show_index else '●'} {name}{RESET_FORMAT}"
@@ -18,7 +18,7 @@ from core.logger import Logger
 from utils.fs_utils import run_remove_routines
 from utils.input_utils import get_selection_input
 from utils.instance_utils import get_instances
-from utils.sys_utils import unit_file_exists
+from utils.sys_utils import systemd_transaction, unit_file_exists
 
 
 def run_klipper_removal(
@@ -80,9 +80,13 @@ def remove_instances(
     if not instance_list:
         return
 
-    for instance in instance_list:
-        Logger.print_status(f"Removing instance {instance.service_file_path.stem} ...")
-        InstanceManager.remove(instance)
+    # systemd is reloaded once after all instances were removed
+    with systemd_transaction():
+        for instance in instance_list:
+            Logger.print_status(
+                f"Removing instance {instance.service_file_path.stem} ..."
+            )
+            InstanceManager.remove(instance)
 
 
 def delete_klipper_logs(instances: List[Klipper]) -> None:
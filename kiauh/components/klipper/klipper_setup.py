@@ -8,6 +8,7 @@
 # ======================================================================= #
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -31,10 +32,12 @@ from components.klipper.klipper_utils import (
     handle_disruptive_system_packages,
 )
 from components.moonraker.moonraker import Moonraker
+from components.webui_client.base_data import BaseWebClient
 from components.webui_client.client_utils import (
     get_existing_clients,
 )
 from core.instance_manager.instance_manager import InstanceManager
+from core.instance_manager.lifecycle_executor import LifecycleExecutor
 from core.logger import DialogType, Logger
 from core.settings.kiauh_settings import KiauhSettings
 from utils.common import check_install_dependencies
@@ -42,11 +45,11 @@ from utils.git_utils import git_clone_wrapper, git_pull_wrapper
 from utils.input_utils import get_confirm
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
-    cmd_sysctl_manage,
     cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
+    systemd_transaction,
 )
 
 
@@ -101,23 +104,25 @@ def run_klipper_setup(
     if not klipper_list:
         setup_klipper_prerequesites()
 
+    # if a client-config is installed, include it in the new example cfg
+    clients = get_existing_clients() if create_example_cfg else []
+
+    # the instances are independent of each other and set up concurrently
+    executor = LifecycleExecutor()
     for i in name_dict:
         # skip this iteration if there is already an instance with the name
         if name_dict[i] in [n.suffix for n in klipper_list]:
             continue
 
         instance = Klipper(suffix=name_dict[i])
-        instance.create()
-        cmd_sysctl_service(instance.service_file_path.name, "enable")
-
-        if create_example_cfg:
-            # if a client-config is installed, include it in the new example cfg
-            clients = get_existing_clients()
-            create_example_printer_cfg(instance, clients)
+        executor.add_instance(
+            instance,
+            partial(setup_klipper_instance, instance, create_example_cfg, clients),
+        )
 
-        cmd_sysctl_service(instance.service_file_path.name, "start")
-
-    cmd_sysctl_manage("daemon-reload")
+    # systemd is reloaded once for all created service files
+    with systemd_transaction():
+        executor.run()
 
     # step 4: check/handle conflicting packages/services
     handle_disruptive_system_packages()
@@ -126,6 +131,18 @@ def run_klipper_setup(
     check_user_groups()
 
 
+def setup_klipper_instance(
+    instance: Klipper, create_example_cfg: bool, clients: List[BaseWebClient]
+) -> None:
+    instance.create()
+    cmd_sysctl_service(instance.service_file_path.name, "enable")
+
+    if create_example_cfg:
+        create_example_printer_cfg(instance, clients)
+
+    cmd_sysctl_service(instance.service_file_path.name, "start")
+
+
 def handle_instance_names(
     install_count: int, name_dict: Dict[int, str], custom_names: bool
 ) -> None:
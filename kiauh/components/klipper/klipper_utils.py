@@ -33,11 +33,9 @@ from core.backup_manager.backup_manager import BackupManager
 from core.constants import CURRENT_USER
 from core.instance_manager.base_instance import SUFFIX_BLACKLIST
 from core.logger import DialogType, Logger
-from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
-    SimpleConfigParser,
-)
 from core.types import ComponentStatus
 from utils.common import get_install_status
+from utils.config_utils import CONFIG_CACHE
 from utils.input_utils import get_confirm, get_number_input, get_string_input
 from utils.instance_utils import get_instances
 from utils.sys_utils import cmd_sysctl_service
@@ -173,8 +171,7 @@ def create_example_printer_cfg(
         Logger.print_error(f"Unable to create example printer.cfg:\n{e}")
         return
 
-    scp = SimpleConfigParser()
-    scp.read(target)
+    scp = CONFIG_CACHE.get(target)
     scp.set("virtual_sdcard", "path", str(instance.base.gcodes_dir))
 
     # include existing client configs in the example config
@@ -185,7 +182,7 @@ def create_example_printer_cfg(
             scp.add_section(section=section)
             create_client_config_symlink(client_config, [instance])
 
-    scp.write(target)
+    scp.write(target, incremental=True)
 
     Logger.print_ok(f"Example printer.cfg created in '{instance.base.cfg_dir}'")
 
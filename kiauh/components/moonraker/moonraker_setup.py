@@ -10,7 +10,8 @@ from __future__ import annotations
 
 import json
 import subprocess
-from typing import List
+from functools import partial
+from typing import Dict, List
 
 from components.klipper.klipper import Klipper
 from components.moonraker import (
@@ -29,15 +30,18 @@ from components.moonraker import (
 from components.moonraker.moonraker import Moonraker
 from components.moonraker.moonraker_dialogs import print_moonraker_overview
 from components.moonraker.moonraker_utils import (
+    assign_moonraker_port,
     backup_moonraker_dir,
     create_example_moonraker_conf,
 )
+from components.webui_client.base_data import BaseWebClient
 from components.webui_client.client_utils import (
     enable_mainsail_remotemode,
     get_existing_clients,
 )
 from components.webui_client.mainsail_data import MainsailData
 from core.instance_manager.instance_manager import InstanceManager
+from core.instance_manager.lifecycle_executor import LifecycleExecutor
 from core.logger import Logger
 from core.settings.kiauh_settings import KiauhSettings
 from utils.common import check_install_dependencies
@@ -50,11 +54,11 @@ from utils.input_utils import (
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
     check_python_version,
-    cmd_sysctl_manage,
     cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
+    systemd_transaction,
 )
 
 
@@ -103,19 +107,30 @@ def install_moonraker() -> None:
         install_moonraker_polkit()
 
         used_ports_map = {m.suffix: m.port for m in moonraker_list}
-        for instance in instances:
-            instance.create()
-            cmd_sysctl_service(instance.service_file_path.name, "enable")
-
-            if create_example_cfg:
-                # if a webclient and/or it's config is installed, patch
-                # its update section to the config
-                clients = get_existing_clients()
-                create_example_moonraker_conf(instance, used_ports_map, clients)
+        # if a webclient and/or it's config is installed, patch
+        # its update section to the config
+        clients = get_existing_clients() if create_example_cfg else []
 
-            cmd_sysctl_service(instance.service_file_path.name, "start")
-
-        cmd_sysctl_manage("daemon-reload")
+        # the instances are independent of each other and set up concurrently,
+        # their ports are assigned upfront to keep them in the selected order
+        executor = LifecycleExecutor()
+        for instance in instances:
+            if create_example_cfg and not instance.cfg_file.is_file():
+                assign_moonraker_port(instance, used_ports_map)
+            executor.add_instance(
+                instance,
+                partial(
+                    setup_moonraker_instance,
+                    instance,
+                    create_example_cfg,
+                    used_ports_map,
+                    clients,
+                ),
+            )
+
+        # systemd is reloaded once for all created service files
+        with systemd_transaction():
+            executor.run()
 
         # if mainsail is installed, and we installed
         # multiple moonraker instances, we enable mainsails remote mode
@@ -127,6 +142,21 @@ def install_moonraker() -> None:
         return
 
 
+def setup_moonraker_instance(
+    instance: Moonraker,
+    create_example_cfg: bool,
+    used_ports_map: Dict[str, int],
+    clients: List[BaseWebClient],
+) -> None:
+    instance.create()
+    cmd_sysctl_service(instance.service_file_path.name, "enable")
+
+    if create_example_cfg:
+        create_example_moonraker_conf(instance, used_ports_map, clients)
+
+    cmd_sysctl_service(instance.service_file_path.name, "start")
+
+
 def check_moonraker_install_requirements(klipper_list: List[Klipper]) -> bool:
     def check_klipper_instances() -> bool:
         if len(klipper_list) >= 1:
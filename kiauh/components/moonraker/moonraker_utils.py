@@ -22,11 +22,9 @@ from components.moonraker.moonraker import Moonraker
 from components.webui_client.base_data import BaseWebClient
 from core.backup_manager.backup_manager import BackupManager
 from core.logger import Logger
-from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
-    SimpleConfigParser,
-)
 from core.types import ComponentStatus
 from utils.common import get_install_status
+from utils.config_utils import CONFIG_CACHE
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
     get_ipv4_addr,
@@ -37,6 +35,33 @@ def get_moonraker_status() -> ComponentStatus:
     return get_install_status(MOONRAKER_DIR, MOONRAKER_ENV_DIR, Moonraker)
 
 
+def assign_moonraker_port(instance: Moonraker, ports_map: Dict[str, int]) -> int:
+    """
+    Return the port of the given instance from the ports map, an instance
+    without port is assigned the next free port in the ports map first |
+    :param instance: the Moonraker instance
+    :param ports_map: the ports already in use, by instance suffix
+    :return: the port of the instance
+    """
+    ports = [
+        ports_map.get(instance)
+        for instance in ports_map
+        if ports_map.get(instance) is not None
+    ]
+    if ports_map.get(instance.suffix) is None:
+        # this could be improved to not increment the max value of the ports list and assign it as the port
+        # as it can lead to situation where the port for e.g. instance moonraker-2 becomes 7128 if the port
+        # of moonraker-1 is 7125 and moonraker-3 is 7127 and there are moonraker.conf files for moonraker-1
+        # and moonraker-3 already. though, there does not seem to be a very reliable way of always assigning
+        # the correct port to each instance and the user will likely be required to correct the value manually.
+        port = max(ports) + 1 if ports else MOONRAKER_DEFAULT_PORT
+    else:
+        port = ports_map.get(instance.suffix)
+
+    ports_map[instance.suffix] = port
+    return port
+
+
 def create_example_moonraker_conf(
     instance: Moonraker,
     ports_map: Dict[str, int],
@@ -55,29 +80,13 @@ def create_example_moonraker_conf(
         Logger.print_error(f"Unable to create example moonraker.conf:\n{e}")
         return
 
-    ports = [
-        ports_map.get(instance)
-        for instance in ports_map
-        if ports_map.get(instance) is not None
-    ]
-    if ports_map.get(instance.suffix) is None:
-        # this could be improved to not increment the max value of the ports list and assign it as the port
-        # as it can lead to situation where the port for e.g. instance moonraker-2 becomes 7128 if the port
-        # of moonraker-1 is 7125 and moonraker-3 is 7127 and there are moonraker.conf files for moonraker-1
-        # and moonraker-3 already. though, there does not seem to be a very reliable way of always assigning
-        # the correct port to each instance and the user will likely be required to correct the value manually.
-        port = max(ports) + 1 if ports else MOONRAKER_DEFAULT_PORT
-    else:
-        port = ports_map.get(instance.suffix)
-
-    ports_map[instance.suffix] = port
+    port = assign_moonraker_port(instance, ports_map)
 
     ip = get_ipv4_addr().split(".")[:2]
     ip.extend(["0", "0/16"])
     uds = instance.base.comms_dir.joinpath("klippy.sock")
 
-    scp = SimpleConfigParser()
-    scp.read(target)
+    scp = CONFIG_CACHE.get(target)
     trusted_clients: List[str] = [
         ".".join(ip),
         *scp.get("authorization", "trusted_clients"),
@@ -122,7 +131,7 @@ def create_example_moonraker_conf(
                 for option in c_config_options:
                     scp.set(c_config_section, option[0], option[1])
 
-    scp.write(target)
+    scp.write(target, incremental=True)
     Logger.print_ok(f"Example moonraker.conf created in '{instance.base.cfg_dir}'")
 
 
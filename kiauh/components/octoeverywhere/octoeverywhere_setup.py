@@ -39,6 +39,7 @@ from utils.instance_utils import get_instances
 from utils.sys_utils import (
     install_python_requirements,
     parse_packages_from_file,
+    systemd_transaction,
 )
 
 
@@ -172,9 +173,13 @@ def remove_oe_instances(
         Logger.print_info("No OctoEverywhere instances found. Skipped ...")
         return
 
-    for instance in instance_list:
-        Logger.print_status(f"Removing instance {instance.service_file_path.stem} ...")
-        InstanceManager.remove(instance)
+    # systemd is reloaded once after all instances were removed
+    with systemd_transaction():
+        for instance in instance_list:
+            Logger.print_status(
+                f"Removing instance {instance.service_file_path.stem} ..."
+            )
+            InstanceManager.remove(instance)
 
 
 def remove_oe_dir() -> None:
@@ -68,6 +68,7 @@ def install_client_config(client_data: BaseWebClient) -> None:
                 ("origin", str(client_config.repo_url)),
                 ("managed_services", "klipper"),
             ],
+            skip_if_included=True,
         )
         add_config_section_at_top(client_config.config_section, kl_instances)
         InstanceManager.restart_all(kl_instances)
@@ -115,6 +115,8 @@ def install_client(client: BaseWebClient) -> None:
         if enable_remotemode and client.client == WebClientType.MAINSAIL:
             enable_mainsail_remotemode()
         if mr_instances:
+            # the section may already be defined in a file moonraker.conf
+            # includes, like a shared update manager config
             add_config_section(
                 section=f"update_manager {client.name}",
                 instances=mr_instances,
@@ -124,6 +126,7 @@ def install_client(client: BaseWebClient) -> None:
                     ("repo", str(client.repo_path)),
                     ("path", str(client.client_dir)),
                 ],
+                skip_if_included=True,
             )
             InstanceManager.restart_all(mr_instances)
         if install_client_cfg and kl_instances:
@@ -10,9 +10,8 @@ from __future__ import annotations
 
 import json
 import re
-import shutil
 from pathlib import Path
-from subprocess import PIPE, CalledProcessError, run
+from subprocess import CalledProcessError
 from typing import List, get_args
 
 from components.klipper.klipper import Klipper
@@ -41,6 +40,7 @@ from utils.git_utils import (
     get_latest_remote_tag,
     get_latest_unstable_tag,
 )
+from utils.privileged_ops import PRIVILEGED_OPS
 
 
 def get_client_status(
@@ -227,8 +227,7 @@ def copy_upstream_nginx_cfg() -> None:
     source = MODULE_PATH.joinpath("assets/upstreams.conf")
     target = NGINX_CONFD.joinpath("upstreams.conf")
     try:
-        command = ["sudo", "cp", source, target]
-        run(command, stderr=PIPE, check=True)
+        PRIVILEGED_OPS.copy(source, target)
     except CalledProcessError as e:
         log = f"Unable to create upstreams.conf: {e.stderr.decode()}"
         Logger.print_error(log)
@@ -243,8 +242,7 @@ def copy_common_vars_nginx_cfg() -> None:
     source = MODULE_PATH.joinpath("assets/common_vars.conf")
     target = NGINX_CONFD.joinpath("common_vars.conf")
     try:
-        command = ["sudo", "cp", source, target]
-        run(command, stderr=PIPE, check=True)
+        PRIVILEGED_OPS.copy(source, target)
     except CalledProcessError as e:
         log = f"Unable to create upstreams.conf: {e.stderr.decode()}"
         Logger.print_error(log)
@@ -260,22 +258,15 @@ def generate_nginx_cfg_from_template(name: str, template_src: Path, **kwargs) ->
     :param template_src: the path to the template file
     :return: None
     """
-    tmp = Path.home().joinpath(f"{name}.tmp")
-    shutil.copy(template_src, tmp)
-    with open(tmp, "r+") as f:
+    with open(template_src, "r") as f:
         content = f.read()
 
-        for key, value in kwargs.items():
-            content = content.replace(f"%{key}%", str(value))
-
-        f.seek(0)
-        f.write(content)
-        f.truncate()
+    for key, value in kwargs.items():
+        content = content.replace(f"%{key}%", str(value))
 
     target = NGINX_SITES_AVAILABLE.joinpath(name)
     try:
-        command = ["sudo", "mv", tmp, target]
-        run(command, stderr=PIPE, check=True)
+        PRIVILEGED_OPS.write_file(target, content)
     except CalledProcessError as e:
         log = f"Unable to create '{target}': {e.stderr.decode()}"
         Logger.print_error(log)
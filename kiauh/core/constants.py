@@ -33,6 +33,7 @@ CURRENT_USER = pwd.getpwuid(os.getuid())[0]
 
 # dirs
 SYSTEMD = Path("/etc/systemd/system")
+KIAUH_DATA_DIR = Path.home().joinpath(".kiauh")
 PRINTER_CFG_BACKUP_DIR = BACKUP_ROOT_DIR.joinpath("printer-cfg-backups")
 NGINX_SITES_AVAILABLE = Path("/etc/nginx/sites-available")
 NGINX_SITES_ENABLED = Path("/etc/nginx/sites-enabled")
@@ -10,7 +10,6 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List
 
@@ -19,30 +18,101 @@ from utils.fs_utils import get_data_dir
 SUFFIX_BLACKLIST: List[str] = ["None", "mcu", "obico", "bambu", "companion"]
 
 
-@dataclass(repr=True)
+_LEGACY_PATTERN = re.compile(r"^(?!printer)(.+)_data")
+
+
 class BaseInstance:
-    instance_type: type
-    suffix: str
-    log_file_name: str | None = None
-    data_dir: Path = field(init=False)
-    base_folders: List[Path] = field(init=False)
-    cfg_dir: Path = field(init=False)
-    log_dir: Path = field(init=False)
-    gcodes_dir: Path = field(init=False)
-    comms_dir: Path = field(init=False)
-    sysd_dir: Path = field(init=False)
-    is_legacy_instance: bool = field(init=False)
-
-    def __post_init__(self):
-        self.data_dir = get_data_dir(self.instance_type, self.suffix)
-        # the following attributes require the data_dir to be set
-        self.cfg_dir = self.data_dir.joinpath("config")
-        self.log_dir = self.data_dir.joinpath("logs")
-        self.gcodes_dir = self.data_dir.joinpath("gcodes")
-        self.comms_dir = self.data_dir.joinpath("comms")
-        self.sysd_dir = self.data_dir.joinpath("systemd")
-        self.is_legacy_instance = self._set_is_legacy_instance()
-        self.base_folders = [
+    """
+    The data directory of an instance and the folders derived from it
+
+    Instances are cheap to create: the data dir is only resolved from the
+    service file when it is first accessed, and each derived path is built once
+    on first access and then cached.
+    """
+
+    __slots__ = (
+        "instance_type",
+        "suffix",
+        "log_file_name",
+        "_data_dir",
+        "_cfg_dir",
+        "_log_dir",
+        "_gcodes_dir",
+        "_comms_dir",
+        "_sysd_dir",
+        "_is_legacy_instance",
+    )
+
+    def __init__(
+        self, instance_type: type, suffix: str, log_file_name: str | None = None
+    ) -> None:
+        self.instance_type = instance_type
+        self.suffix = suffix
+        self.log_file_name = log_file_name
+        self._data_dir: Path | None = None
+        self._cfg_dir: Path | None = None
+        self._log_dir: Path | None = None
+        self._gcodes_dir: Path | None = None
+        self._comms_dir: Path | None = None
+        self._sysd_dir: Path | None = None
+        self._is_legacy_instance: bool | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"BaseInstance(instance_type={self.instance_type!r}, "
+            f"suffix={self.suffix!r}, log_file_name={self.log_file_name!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BaseInstance):
+            return NotImplemented
+        return (self.instance_type, self.suffix, self.log_file_name) == (
+            other.instance_type,
+            other.suffix,
+            other.log_file_name,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def data_dir(self) -> Path:
+        if self._data_dir is None:
+            self._data_dir = get_data_dir(self.instance_type, self.suffix)
+        return self._data_dir
+
+    @property
+    def cfg_dir(self) -> Path:
+        if self._cfg_dir is None:
+            self._cfg_dir = self.data_dir.joinpath("config")
+        return self._cfg_dir
+
+    @property
+    def log_dir(self) -> Path:
+        if self._log_dir is None:
+            self._log_dir = self.data_dir.joinpath("logs")
+        return self._log_dir
+
+    @property
+    def gcodes_dir(self) -> Path:
+        if self._gcodes_dir is None:
+            self._gcodes_dir = self.data_dir.joinpath("gcodes")
+        return self._gcodes_dir
+
+    @property
+    def comms_dir(self) -> Path:
+        if self._comms_dir is None:
+            self._comms_dir = self.data_dir.joinpath("comms")
+        return self._comms_dir
+
+    @property
+    def sysd_dir(self) -> Path:
+        if self._sysd_dir is None:
+            self._sysd_dir = self.data_dir.joinpath("systemd")
+        return self._sysd_dir
+
+    @property
+    def base_folders(self) -> List[Path]:
+        return [
             self.data_dir,
             self.cfg_dir,
             self.log_dir,
@@ -51,8 +121,9 @@ class BaseInstance:
             self.sysd_dir,
         ]
 
-    def _set_is_legacy_instance(self) -> bool:
-        legacy_pattern = r"^(?!printer)(.+)_data"
-        match = re.search(legacy_pattern, self.data_dir.name)
-
-        return True if (match and self.suffix != "") else False
+    @property
+    def is_legacy_instance(self) -> bool:
+        if self._is_legacy_instance is None:
+            match = _LEGACY_PATTERN.search(self.data_dir.name)
+            self._is_legacy_instance = bool(match and self.suffix != "")
+        return self._is_legacy_instance
@@ -12,9 +12,10 @@ from pathlib import Path
 from subprocess import CalledProcessError
 from typing import List
 
+from core.instance_manager.systemd_backend import get_systemd_backend
 from core.instance_type import InstanceType
 from core.logger import Logger
-from utils.sys_utils import cmd_sysctl_service
+from utils.sys_utils import SysCtlServiceAction, SysCtlServiceError
 
 
 class InstanceManager:
@@ -22,7 +23,7 @@ class InstanceManager:
     def enable(instance: InstanceType) -> None:
         service_name: str = instance.service_file_path.name
         try:
-            cmd_sysctl_service(service_name, "enable")
+            InstanceManager._run_batch_names([service_name], "enable")
         except CalledProcessError as e:
             Logger.print_error(f"Error enabling service {service_name}:")
             Logger.print_error(f"{e}")
@@ -31,7 +32,7 @@ class InstanceManager:
     def disable(instance: InstanceType) -> None:
         service_name: str = instance.service_file_path.name
         try:
-            cmd_sysctl_service(service_name, "disable")
+            InstanceManager._run_batch_names([service_name], "disable")
         except CalledProcessError as e:
             Logger.print_error(f"Error disabling {service_name}: {e}")
             raise
@@ -40,7 +41,7 @@ class InstanceManager:
     def start(instance: InstanceType) -> None:
         service_name: str = instance.service_file_path.name
         try:
-            cmd_sysctl_service(service_name, "start")
+            InstanceManager._run_batch_names([service_name], "start")
         except CalledProcessError as e:
             Logger.print_error(f"Error starting {service_name}: {e}")
             raise
@@ -49,7 +50,7 @@ class InstanceManager:
     def stop(instance: InstanceType) -> None:
         name: str = instance.service_file_path.name
         try:
-            cmd_sysctl_service(name, "stop")
+            InstanceManager._run_batch_names([name], "stop")
         except CalledProcessError as e:
             Logger.print_error(f"Error stopping {name}: {e}")
             raise
@@ -58,36 +59,58 @@ class InstanceManager:
     def restart(instance: InstanceType) -> None:
         name: str = instance.service_file_path.name
         try:
-            cmd_sysctl_service(name, "restart")
+            InstanceManager._run_batch_names([name], "restart")
         except CalledProcessError as e:
             Logger.print_error(f"Error restarting {name}: {e}")
             raise
 
+    @staticmethod
+    def enable_all(instances: List[InstanceType]) -> None:
+        InstanceManager._run_batch(instances, "enable")
+
     @staticmethod
     def start_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.start(instance)
+        InstanceManager._run_batch(instances, "start")
 
     @staticmethod
     def stop_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.stop(instance)
+        InstanceManager._run_batch(instances, "stop")
 
     @staticmethod
     def restart_all(instances: List[InstanceType]) -> None:
-        for instance in instances:
-            InstanceManager.restart(instance)
+        InstanceManager._run_batch(instances, "restart")
+
+    @staticmethod
+    def _run_batch(instances: List[InstanceType], action: SysCtlServiceAction) -> None:
+        names = [instance.service_file_path.name for instance in instances]
+        InstanceManager._run_batch_names(names, action)
+
+    @staticmethod
+    def _run_batch_names(names: List[str], action: SysCtlServiceAction) -> None:
+        # all units are handled by a single call of the systemd backend, either
+        # over D-Bus or a single systemctl call, the state of each unit is
+        # verified afterward and every failed unit is reported
+        from utils.instance_utils import UNIT_STATUS
+
+        try:
+            failed = get_systemd_backend().run_action(names, action)
+        finally:
+            UNIT_STATUS.invalidate()
+        if failed:
+            raise SysCtlServiceError(action, failed)
 
     @staticmethod
     def remove(instance: InstanceType) -> None:
         from utils.fs_utils import run_remove_routines
-        from utils.sys_utils import remove_system_service
+        from utils.sys_utils import remove_system_service, systemd_transaction
 
         try:
-            # remove the service file
+            # remove the service file, if called within a systemd transaction,
+            # systemd is reloaded once after all services were removed
             service_file_path: Path = instance.service_file_path
             if service_file_path is not None:
-                remove_system_service(service_file_path.name)
+                with systemd_transaction():
+                    remove_system_service(service_file_path.name)
 
             # then remove all the log files
             if (
@@ -0,0 +1,188 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Set
+
+from components.klipper.klipper import Klipper
+from components.moonraker.moonraker import Moonraker
+from core.instance_type import InstanceType
+from core.logger import Logger
+
+# the maximum number of lifecycle tasks run concurrently
+LIFECYCLE_MAX_WORKERS = 4
+
+
+def get_instance_stage(instance: InstanceType) -> int:
+    """
+    Return the position of the instance in the startup order of a printer.
+    Klipper comes first, Moonraker second and all Moonraker clients, like the
+    obico and telegram bots, last.
+    """
+    if isinstance(instance, Klipper):
+        return 0
+    if isinstance(instance, Moonraker):
+        return 1
+    return 2
+
+
+class LifecycleError(Exception):
+    """Raised when at least one task of a lifecycle run failed"""
+
+    def __init__(self, failed: Dict[str, BaseException], skipped: List[str]) -> None:
+        self.failed = failed
+        self.skipped = skipped
+        msg = "; ".join(f"{key}: {e}" for key, e in failed.items())
+        if skipped:
+            msg += f" (skipped: {', '.join(skipped)})"
+        super().__init__(msg)
+
+
+@dataclass
+class LifecycleTask:
+    key: str
+    action: Callable[[], None]
+    depends_on: Set[str] = field(default_factory=set)
+    instance: InstanceType | None = None
+
+
+class LifecycleExecutor:
+    """
+    Run lifecycle tasks, like creating, enabling and starting instances, on a
+    bounded worker pool. A task only runs after all tasks it depends on
+    succeeded, tasks without dependency between each other run concurrently.
+    If a task fails, all tasks depending on it are skipped while independent
+    tasks are still run. All errors are reported together at the end.
+    """
+
+    def __init__(self, max_workers: int = LIFECYCLE_MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self.tasks: Dict[str, LifecycleTask] = {}
+
+    def add(
+        self,
+        key: str,
+        action: Callable[[], None],
+        depends_on: Iterable[str] = (),
+    ) -> LifecycleExecutor:
+        """Add a task, which runs after the tasks with the given keys"""
+        if key in self.tasks:
+            raise ValueError(f"Duplicate lifecycle task '{key}'")
+        self.tasks[key] = LifecycleTask(key, action, set(depends_on))
+        return self
+
+    def add_instance(
+        self, instance: InstanceType, action: Callable[[], None]
+    ) -> LifecycleExecutor:
+        """
+        Add a task for the given instance. The task depends on the tasks of all
+        instances with the same suffix coming earlier in the startup order,
+        regardless of the order in which the tasks are added.
+        """
+        key = instance.service_file_path.name
+        self.add(key, action)
+        self.tasks[key].instance = instance
+        return self
+
+    def run(self) -> None:
+        """
+        Run all tasks and raise a LifecycleError if any task failed
+        :return: None
+        """
+        pending = self._resolve_dependencies()
+        failed: Dict[str, BaseException] = {}
+        skipped: List[str] = []
+        if not pending:
+            return
+
+        workers = max(1, min(self.max_workers, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running: Dict[Future, str] = {}
+
+            def submit_ready() -> None:
+                for key in [k for k, deps in pending.items() if not deps]:
+                    del pending[key]
+                    running[executor.submit(self.tasks[key].action)] = key
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        failed[key] = error
+                        skipped.extend(self._skip_dependents(key, pending))
+                        continue
+                    for deps in pending.values():
+                        deps.discard(key)
+                submit_ready()
+
+        for key, error in failed.items():
+            Logger.print_error(f"{key} failed: {error}")
+        for key in skipped:
+            Logger.print_warn(f"{key} skipped, a task it depends on failed")
+
+        if failed:
+            raise LifecycleError(failed, skipped)
+
+    def _resolve_dependencies(self) -> Dict[str, Set[str]]:
+        """Return the keys each task depends on, rejecting unknown keys and cycles"""
+        deps: Dict[str, Set[str]] = {
+            k: set(t.depends_on) for k, t in self.tasks.items()
+        }
+
+        instances = {
+            t.key: t.instance for t in self.tasks.values() if t.instance is not None
+        }
+        for key, instance in instances.items():
+            stage = get_instance_stage(instance)
+            deps[key].update(
+                other_key
+                for other_key, other in instances.items()
+                if other.suffix == instance.suffix and get_instance_stage(other) < stage
+            )
+
+        for key, task_deps in deps.items():
+            unknown = task_deps - deps.keys()
+            if unknown:
+                raise ValueError(
+                    f"Lifecycle task '{key}' depends on unknown tasks: "
+                    f"{', '.join(sorted(unknown))}"
+                )
+
+        # a task graph without cycles can be fully ordered by repeatedly
+        # removing the tasks whose dependencies were all removed before
+        remaining = {k: set(v) for k, v in deps.items()}
+        while remaining:
+            ready = [k for k, v in remaining.items() if not v]
+            if not ready:
+                cycle = ", ".join(sorted(remaining))
+                raise ValueError(f"Cyclic lifecycle task dependencies: {cycle}")
+            for key in ready:
+                del remaining[key]
+            for v in remaining.values():
+                v.difference_update(ready)
+
+        return deps
+
+    @staticmethod
+    def _skip_dependents(key: str, pending: Dict[str, Set[str]]) -> List[str]:
+        """Remove all pending tasks depending, directly or not, on the given task"""
+        skipped: List[str] = []
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            for k in [k for k, deps in pending.items() if current in deps]:
+                del pending[k]
+                skipped.append(k)
+                stack.append(k)
+        return skipped
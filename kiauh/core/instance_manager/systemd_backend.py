@@ -0,0 +1,427 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from subprocess import CalledProcessError
+from typing import Any, Dict, List, Tuple
+
+from core.logger import Logger
+from utils.sys_utils import (
+    SysCtlServiceAction,
+    UnitState,
+    cmd_sysctl_services,
+    get_unit_states,
+    verify_unit_states,
+)
+
+# systemd job results, see the JobRemoved signal of org.freedesktop.systemd1.Manager
+JOB_RESULT_DONE = "done"
+
+_SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+_SYSTEMD_PATH = "/org/freedesktop/systemd1"
+_MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+_PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+_UNIT_PATH_PREFIX = "/org/freedesktop/systemd1/unit/"
+# how often a thread waiting for jobs looks for JobRemoved signals, in seconds
+_JOB_POLL_INTERVAL = 0.05
+
+
+class SystemdBusError(CalledProcessError):
+    """
+    Raised when a call to systemd over D-Bus failed. It is a CalledProcessError,
+    so that callers handle it like a failed systemctl call.
+    """
+
+    def __init__(self, name: str, message: str = "") -> None:
+        error = f"{name}: {message}" if message else name
+        super().__init__(1, ["dbus", name], stderr=error.encode())
+        self.name = name
+        self.error = error
+
+    def __str__(self) -> str:
+        return self.error
+
+
+class SystemdBus(ABC):
+    """
+    The subset of the systemd D-Bus API used by the D-Bus backend
+
+    Job methods return the object path of the queued job. wait_for_jobs blocks
+    until the given jobs were removed from the job queue and returns the result
+    of each job. Implementations raise SystemdBusError on failed calls.
+
+    Several threads may use the bus at once. Implementations hold the lock while
+    using the connection, add each job they queue with _add_job before releasing
+    it, and return the results of the JobRemoved signals already received on the
+    connection from _receive_job_results without blocking. The result of a job
+    is kept until the thread waiting for it picks it up, no matter which thread
+    received it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # the queued jobs, mapped to their result once they were removed
+        self._jobs: Dict[str, str | None] = {}
+
+    @abstractmethod
+    def start_unit(self, name: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stop_unit(self, name: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def restart_unit(self, name: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def reload_unit(self, name: str) -> str:
+        raise NotImplementedError
+
+    def wait_for_jobs(self, jobs: List[str], timeout: float) -> Dict[str, str]:
+        pending = set(jobs)
+        results: Dict[str, str] = {}
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                for job, received in self._receive_job_results():
+                    # signals of jobs queued by other clients are dropped
+                    if job in self._jobs:
+                        self._jobs[job] = received
+                for job in list(pending):
+                    result = self._jobs.get(job)
+                    if result is not None:
+                        results[job] = result
+                        del self._jobs[job]
+                        pending.discard(job)
+                remaining = deadline - time.monotonic()
+                if not pending or remaining <= 0:
+                    for job in pending:
+                        self._jobs.pop(job, None)
+                    return results
+            # the lock is not held while waiting, so that other threads can
+            # call methods or pick up the results received for them meanwhile
+            time.sleep(min(remaining, _JOB_POLL_INTERVAL))
+
+    @abstractmethod
+    def enable_unit_files(self, names: List[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def disable_unit_files(self, names: List[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def mask_unit_files(self, names: List[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def unmask_unit_files(self, names: List[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def reload(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_unit_properties(self, name: str) -> Dict[str, Any]:
+        """Return the properties of all interfaces of the unit"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _receive_job_results(self) -> List[Tuple[str, str]]:
+        raise NotImplementedError
+
+    def _add_job(self, job: str) -> str:
+        self._jobs[job] = None
+        return job
+
+
+class JeepneySystemdBus(SystemdBus):
+    """
+    SystemdBus on one persistent connection to the system bus, using the
+    optional jeepney package. Creating it fails with ImportError if jeepney is
+    not installed and with OSError if the system bus is not available.
+    """
+
+    def __init__(self) -> None:
+        from jeepney import DBusAddress, MatchRule
+        from jeepney.bus_messages import message_bus
+        from jeepney.io.blocking import open_dbus_connection
+
+        super().__init__()
+        self._conn = open_dbus_connection(bus="SYSTEM")
+        self._manager = DBusAddress(
+            _SYSTEMD_PATH, bus_name=_SYSTEMD_BUS_NAME, interface=_MANAGER_INTERFACE
+        )
+        self._job_removed = MatchRule(
+            type="signal",
+            sender=_SYSTEMD_BUS_NAME,
+            interface=_MANAGER_INTERFACE,
+            member="JobRemoved",
+            path=_SYSTEMD_PATH,
+        )
+        # the filter is installed before any job is queued, so that no
+        # JobRemoved signal is lost while a method call waits for its reply
+        self._job_queue = self._conn.filter(self._job_removed, bufsize=1024).queue
+        self._call(message_bus.AddMatch(self._job_removed))
+        self._call_manager("Subscribe")
+
+    def start_unit(self, name: str) -> str:
+        return self._queue_job("StartUnit", name)
+
+    def stop_unit(self, name: str) -> str:
+        return self._queue_job("StopUnit", name)
+
+    def restart_unit(self, name: str) -> str:
+        return self._queue_job("RestartUnit", name)
+
+    def reload_unit(self, name: str) -> str:
+        return self._queue_job("ReloadUnit", name)
+
+    def enable_unit_files(self, names: List[str]) -> None:
+        self._call_manager("EnableUnitFiles", "asbb", names, False, False)
+
+    def disable_unit_files(self, names: List[str]) -> None:
+        self._call_manager("DisableUnitFiles", "asb", names, False)
+
+    def mask_unit_files(self, names: List[str]) -> None:
+        self._call_manager("MaskUnitFiles", "asbb", names, False, False)
+
+    def unmask_unit_files(self, names: List[str]) -> None:
+        self._call_manager("UnmaskUnitFiles", "asb", names, False)
+
+    def reload(self) -> None:
+        self._call_manager("Reload")
+
+    def get_unit_properties(self, name: str) -> Dict[str, Any]:
+        from jeepney import DBusAddress, new_method_call
+
+        # like systemctl, read the properties of all interfaces (Unit, Service,
+        # ...) at once from the object path derived from the unit name, which
+        # loads the unit if needed
+        unit = DBusAddress(
+            _get_unit_path(name),
+            bus_name=_SYSTEMD_BUS_NAME,
+            interface=_PROPERTIES_INTERFACE,
+        )
+        props = self._call(new_method_call(unit, "GetAll", "s", ("",)))[0]
+        # jeepney returns variants as (signature, value) tuples
+        return {key: value for key, (_sig, value) in props.items()}
+
+    def _queue_job(self, method: str, name: str) -> str:
+        # the job is added before the lock is released, so that its JobRemoved
+        # signal is kept even if another thread receives it
+        with self._lock:
+            job = self._call_manager(method, "ss", name, "replace")[0]
+            return self._add_job(str(job))
+
+    def _receive_job_results(self) -> List[Tuple[str, str]]:
+        # signals received while waiting for a method reply are queued already,
+        # a read with zero timeout only takes what is available on the socket
+        if not self._job_queue:
+            try:
+                msg = self._conn.recv_until_filtered(self._job_queue, timeout=0)
+            except TimeoutError:
+                return []
+            self._job_queue.append(msg)
+        results = []
+        while self._job_queue:
+            _id, job, _unit, result = self._job_queue.popleft().body
+            results.append((str(job), str(result)))
+        return results
+
+    def _call_manager(self, method: str, signature: str | None = None, *args):
+        from jeepney import new_method_call
+
+        return self._call(new_method_call(self._manager, method, signature, args))
+
+    def _call(self, msg):
+        from jeepney import DBusErrorResponse
+
+        try:
+            with self._lock:
+                return self._conn.send_and_get_reply(msg, unwrap=True)
+        except DBusErrorResponse as e:
+            raise SystemdBusError(e.name, " ".join(map(str, e.data))) from e
+
+
+class SubprocessBackend:
+    """Controls systemd units through 'sudo systemctl' subprocesses"""
+
+    name = "subprocess"
+
+    def run_action(
+        self, names: List[str], action: SysCtlServiceAction
+    ) -> Dict[str, str]:
+        return cmd_sysctl_services(names, action)
+
+    def get_unit_states(self, names: List[str]) -> Dict[str, UnitState]:
+        return get_unit_states(names)
+
+
+class DBusBackend:
+    """
+    Controls systemd units over D-Bus, falling back to the subprocess backend
+
+    State changing calls usually require privileges, which KIAUH gets through
+    sudo. If systemd denies such a call, the action and all following state
+    changing actions are run through the fallback instead. Unit state queries
+    do not require privileges and stay on the bus, unless the bus fails. Any
+    other failed call fails the action for the affected units.
+    """
+
+    name = "dbus"
+
+    def __init__(
+        self,
+        bus: SystemdBus,
+        fallback: SubprocessBackend | None = None,
+        job_timeout: float = 90.0,
+    ) -> None:
+        self.bus = bus
+        self.fallback = fallback or SubprocessBackend()
+        self.job_timeout = job_timeout
+        self.write_denied = False
+
+    def run_action(
+        self, names: List[str], action: SysCtlServiceAction
+    ) -> Dict[str, str]:
+        if not names:
+            return {}
+        if self.write_denied:
+            return self.fallback.run_action(names, action)
+
+        Logger.print_status(f"{action.capitalize()} {', '.join(names)} ...")
+        try:
+            failed = self._run_action(names, action)
+        except SystemdBusError as e:
+            if _is_access_denied(e):
+                self.write_denied = True
+                return self.fallback.run_action(names, action)
+            failed = {name: str(e) for name in names}
+
+        try:
+            states = self.get_unit_states(names)
+        except CalledProcessError:
+            # the units are reported as failed by the action or not at all,
+            # same as after a systemctl call
+            states = {}
+        failed.update(verify_unit_states(names, action, states))
+        for name in names:
+            if name in failed:
+                Logger.print_error(f"Failed to {action} {name}: {failed[name]}")
+        if not failed:
+            Logger.print_ok("OK!")
+
+        return failed
+
+    def get_unit_states(self, names: List[str]) -> Dict[str, UnitState]:
+        try:
+            return self._get_bus_unit_states(names)
+        except SystemdBusError:
+            return self.fallback.get_unit_states(names)
+
+    def _get_bus_unit_states(self, names: List[str]) -> Dict[str, UnitState]:
+        states: Dict[str, UnitState] = {}
+        for name in names:
+            props = self.bus.get_unit_properties(name)
+            states[name] = UnitState(
+                name=name,
+                load_state=str(props.get("LoadState", "")),
+                active_state=str(props.get("ActiveState", "")),
+                sub_state=str(props.get("SubState", "")),
+                main_pid=int(props.get("MainPID", 0) or 0),
+                unit_file_state=str(props.get("UnitFileState", "")),
+            )
+        return states
+
+    def _run_action(
+        self, names: List[str], action: SysCtlServiceAction
+    ) -> Dict[str, str]:
+        unit_file_methods = {
+            "enable": self.bus.enable_unit_files,
+            "disable": self.bus.disable_unit_files,
+            "mask": self.bus.mask_unit_files,
+            "unmask": self.bus.unmask_unit_files,
+        }
+        if action in unit_file_methods:
+            unit_file_methods[action](names)
+            self.bus.reload()
+            return {}
+
+        job_methods = {
+            "start": self.bus.start_unit,
+            "stop": self.bus.stop_unit,
+            "restart": self.bus.restart_unit,
+            "reload": self.bus.reload_unit,
+        }
+        failed: Dict[str, str] = {}
+        jobs: Dict[str, str] = {}
+        for name in names:
+            try:
+                jobs[job_methods[action](name)] = name
+            except SystemdBusError as e:
+                if _is_access_denied(e):
+                    raise
+                failed[name] = str(e)
+
+        results = self.bus.wait_for_jobs(list(jobs), self.job_timeout)
+        for job, name in jobs.items():
+            result = results.get(job, "timeout")
+            if result != JOB_RESULT_DONE:
+                failed[name] = f"job {result}"
+
+        return failed
+
+
+def _get_unit_path(name: str) -> str:
+    # systemd escapes every character except ASCII letters and digits as _xx
+    label = "".join(
+        c if c.isascii() and c.isalnum() else f"_{ord(c):02x}" for c in name
+    )
+    return _UNIT_PATH_PREFIX + (label or "_")
+
+
+def _is_access_denied(e: SystemdBusError) -> bool:
+    return e.name in (
+        "org.freedesktop.DBus.Error.AccessDenied",
+        "org.freedesktop.DBus.Error.InteractiveAuthorizationRequired",
+    )
+
+
+_backend: SubprocessBackend | DBusBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_systemd_backend() -> SubprocessBackend | DBusBackend:
+    """
+    Return the systemd backend shared by the process. The D-Bus backend is used
+    if the optional jeepney package is installed and the system bus can be
+    reached, the subprocess backend otherwise.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            try:
+                _backend = DBusBackend(JeepneySystemdBus())
+            except (ImportError, OSError, SystemdBusError):
+                _backend = SubprocessBackend()
+        return _backend
+
+
+def set_systemd_backend(backend: SubprocessBackend | DBusBackend | None) -> None:
+    """Replace the shared systemd backend, None selects it again on next use"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
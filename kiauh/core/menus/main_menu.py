@@ -10,14 +10,23 @@ from __future__ import annotations
 
 import sys
 import textwrap
-from typing import Callable, Type
+from pathlib import Path
+from typing import Any, List, Type
 
+from components.crowsnest import CROWSNEST_DIR
 from components.crowsnest.crowsnest import get_crowsnest_status
+from components.klipper import KLIPPER_DIR, KLIPPER_ENV_DIR
+from components.klipper.klipper import Klipper
 from components.klipper.klipper_utils import get_klipper_status
+from components.klipperscreen import KLIPPERSCREEN_DIR, KLIPPERSCREEN_ENV_DIR
 from components.klipperscreen.klipperscreen import get_klipperscreen_status
 from components.log_uploads.menus.log_upload_menu import LogUploadMenu
+from components.mobileraker import MOBILERAKER_DIR, MOBILERAKER_ENV_DIR
 from components.mobileraker.mobileraker import get_mobileraker_status
+from components.moonraker import MOONRAKER_DIR, MOONRAKER_ENV_DIR
+from components.moonraker.moonraker import Moonraker
 from components.moonraker.moonraker_utils import get_moonraker_status
+from components.octoeverywhere import OE_DIR, OE_ENV_DIR
 from components.octoeverywhere.octoeverywhere_setup import get_octoeverywhere_status
 from components.webui_client.client_utils import (
     get_client_status,
@@ -31,7 +40,10 @@ from core.constants import (
     COLOR_MAGENTA,
     COLOR_RED,
     COLOR_YELLOW,
+    NGINX_CONFD,
+    NGINX_SITES_AVAILABLE,
     RESET_FORMAT,
+    SYSTEMD,
 )
 from core.logger import Logger
 from core.menus import FooterType
@@ -45,6 +57,80 @@ from core.menus.update_menu import UpdateMenu
 from core.types import ComponentStatus, StatusMap, StatusText
 from extensions.extensions_menu import ExtensionsMenu
 from utils.common import get_kiauh_version
+from utils.git_utils import get_repo_ref_paths
+from utils.instance_utils import UNIT_STATUS, get_instances
+from utils.status_utils import StatusSnapshotStore
+
+from kiauh import PROJECT_ROOT
+
+# the components whose number of running instances is shown in the main menu
+RUNNING_COUNT_TYPES = {"kl": Klipper, "mr": Moonraker}
+
+_status_store: StatusSnapshotStore | None = None
+
+
+def get_status_store() -> StatusSnapshotStore:
+    """Return the status snapshots of the main menu, shared by all its instances"""
+    global _status_store
+    if _status_store is not None:
+        return _status_store
+
+    def watch_component(repo: Path, *paths: Path) -> List[Path]:
+        return [*get_repo_ref_paths(repo), repo, *paths]
+
+    mainsail, fluidd = MainsailData(), FluiddData()
+    clients = [mainsail, fluidd]
+    nginx = [NGINX_SITES_AVAILABLE, NGINX_CONFD]
+    _status_store = (
+        StatusSnapshotStore()
+        .register(
+            "version",
+            get_kiauh_version,
+            ttl=3600,
+            watch=get_repo_ref_paths(PROJECT_ROOT),
+        )
+        .register(
+            "kl",
+            get_klipper_status,
+            watch=watch_component(KLIPPER_DIR, KLIPPER_ENV_DIR, SYSTEMD),
+        )
+        .register(
+            "mr",
+            get_moonraker_status,
+            watch=watch_component(MOONRAKER_DIR, MOONRAKER_ENV_DIR, SYSTEMD),
+        )
+        .register(
+            "ms", get_client_status, mainsail, watch=[mainsail.client_dir, *nginx]
+        )
+        .register("fl", get_client_status, fluidd, watch=[fluidd.client_dir, *nginx])
+        .register(
+            "cc",
+            get_current_client_config,
+            clients,
+            watch=[c.client_config.config_dir for c in clients],
+        )
+        .register(
+            "ks",
+            get_klipperscreen_status,
+            watch=watch_component(KLIPPERSCREEN_DIR, KLIPPERSCREEN_ENV_DIR, SYSTEMD),
+        )
+        .register(
+            "mb",
+            get_mobileraker_status,
+            watch=watch_component(MOBILERAKER_DIR, MOBILERAKER_ENV_DIR, SYSTEMD),
+        )
+        .register(
+            "cn",
+            get_crowsnest_status,
+            watch=watch_component(CROWSNEST_DIR, SYSTEMD),
+        )
+        .register(
+            "oe",
+            get_octoeverywhere_status,
+            watch=watch_component(OE_DIR, OE_ENV_DIR, SYSTEMD),
+        )
+    )
+    return _status_store
 
 
 # noinspection PyUnusedLocal
@@ -89,28 +175,45 @@ class MainMenu(BaseMenu):
             )
 
     def _fetch_status(self) -> None:
-        self.version = get_kiauh_version()
-        self._get_component_status("kl", get_klipper_status)
-        self._get_component_status("mr", get_moonraker_status)
-        self._get_component_status("ms", get_client_status, MainsailData())
-        self._get_component_status("fl", get_client_status, FluiddData())
-        self.cc_status = get_current_client_config([MainsailData(), FluiddData()])
-        self._get_component_status("ks", get_klipperscreen_status)
-        self._get_component_status("mb", get_mobileraker_status)
-        self._get_component_status("cn", get_crowsnest_status)
-        self._get_component_status("oe", get_octoeverywhere_status)
-
-    def _get_component_status(self, name: str, status_fn: Callable, *args) -> None:
-        status_data: ComponentStatus = status_fn(*args)
+        # only outdated snapshots are fetched again, concurrently, so that a
+        # redraw of the menu does not run all status probes again
+        store = get_status_store()
+        errors = {**store.pop_refresher_errors(), **store.refresh()}
+        for name, value in store.values().items():
+            if name in store.probes:
+                self._set_fetched_status(name, value)
+        for name, error in errors.items():
+            Logger.print_warn(f"Unable to fetch status '{name}': {error}")
+        store.start_refresher()
+
+    def _set_fetched_status(self, name: str, result: Any) -> None:
+        if name == "version":
+            self.version = result
+        elif name == "cc":
+            self.cc_status = result
+        else:
+            self._set_component_status(name, result)
+
+    def _set_component_status(self, name: str, status_data: ComponentStatus) -> None:
         code: int = status_data.status
         status: StatusText = StatusMap[code]
         owner: str = status_data.owner
         repo: str = status_data.repo
         instance_count: int = status_data.instances
+        # the number of running instances is not taken from the snapshot, it
+        # changes without any watched path changing, e.g. on a service restart
+        running: int | None = None
+        if name in RUNNING_COUNT_TYPES:
+            instances = get_instances(RUNNING_COUNT_TYPES[name])
+            running = UNIT_STATUS.count_active(instances)
 
         count_txt: str = ""
         if instance_count > 0 and code == 2:
             count_txt = f": {instance_count}"
+            # instances with an inactive unit are shown as "running/total"
+            if running is not None and running < instance_count:
+                count_txt = f": {running}/{instance_count}"
+                code = 1
 
         setattr(self, f"{name}_status", self._format_by_code(code, status, count_txt))
         setattr(self, f"{name}_owner", f"{COLOR_CYAN}{owner}{RESET_FORMAT}")
@@ -165,30 +268,43 @@ class MainMenu(BaseMenu):
         )[1:]
         print(menu, end="")
 
+    def _stop_status_refresher(self) -> None:
+        # the status is refreshed in the background only while the main menu
+        # waits for input, it is started again when the main menu is redrawn
+        get_status_store().stop_refresher()
+
     def exit(self, **kwargs) -> None:
         Logger.print_ok("###### Happy printing!", False)
         sys.exit(0)
 
     def log_upload_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         LogUploadMenu().run()
 
     def install_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         InstallMenu(previous_menu=self.__class__).run()
 
     def update_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         UpdateMenu(previous_menu=self.__class__).run()
 
     def remove_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         RemoveMenu(previous_menu=self.__class__).run()
 
     def advanced_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         AdvancedMenu(previous_menu=self.__class__).run()
 
     def backup_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         BackupMenu(previous_menu=self.__class__).run()
 
     def settings_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         SettingsMenu(previous_menu=self.__class__).run()
 
     def extension_menu(self, **kwargs) -> None:
+        self._stop_status_refresher()
         ExtensionsMenu(previous_menu=self.__class__).run()
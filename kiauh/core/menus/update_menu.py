@@ -9,23 +9,30 @@
 from __future__ import annotations
 
 import textwrap
-from typing import Callable, List, Type
+from pathlib import Path
+from typing import Any, Dict, List, Type
 
+from components.crowsnest import CROWSNEST_DIR
 from components.crowsnest.crowsnest import get_crowsnest_status, update_crowsnest
+from components.klipper import KLIPPER_DIR
 from components.klipper.klipper_setup import update_klipper
 from components.klipper.klipper_utils import (
     get_klipper_status,
 )
+from components.klipperscreen import KLIPPERSCREEN_DIR
 from components.klipperscreen.klipperscreen import (
     get_klipperscreen_status,
     update_klipperscreen,
 )
+from components.mobileraker import MOBILERAKER_DIR
 from components.mobileraker.mobileraker import (
     get_mobileraker_status,
     update_mobileraker,
 )
+from components.moonraker import MOONRAKER_DIR
 from components.moonraker.moonraker_setup import update_moonraker
 from components.moonraker.moonraker_utils import get_moonraker_status
+from components.octoeverywhere import OE_DIR
 from components.octoeverywhere.octoeverywhere_setup import (
     get_octoeverywhere_status,
     update_octoeverywhere,
@@ -51,7 +58,12 @@ from core.menus import Option
 from core.menus.base_menu import BaseMenu
 from core.spinner import Spinner
 from core.types import ComponentStatus
+from extensions.klipper_backup import KLIPPERBACKUP_DIR
+from extensions.obico import OBICO_DIR
+from extensions.telegram_bot import TG_BOT_DIR
+from utils.git_fetch import FetchResult, GitFetchScheduler
 from utils.input_utils import get_confirm
+from utils.status_utils import StatusCollector
 from utils.sys_utils import (
     get_upgradable_packages,
     update_system_package_lists,
@@ -68,6 +80,8 @@ class UpdateMenu(BaseMenu):
 
         self.packages: List[str] = []
         self.package_count: int = 0
+        self.fetch_errors: Dict[str, Exception] = {}
+        self.git_fetch_results: Dict[Path, FetchResult] = {}
 
         self.klipper_local = self.klipper_remote = ""
         self.moonraker_local = self.moonraker_remote = ""
@@ -124,6 +138,12 @@ class UpdateMenu(BaseMenu):
 
         spinner.stop()
 
+        for repo, result in self.git_fetch_results.items():
+            if result.error is not None:
+                Logger.print_warn(f"Unable to fetch '{repo.name}': {result.error}")
+        for name, error in self.fetch_errors.items():
+            Logger.print_warn(f"Unable to fetch status of '{name}': {error}")
+
         header = " [ Update Menu ] "
         color = COLOR_GREEN
         count = 62 - len(color) - len(RESET_FORMAT)
@@ -214,24 +234,54 @@ class UpdateMenu(BaseMenu):
         self._run_system_updates()
 
     def _fetch_update_status(self) -> None:
-        self._set_status_data("klipper", get_klipper_status)
-        self._set_status_data("moonraker", get_moonraker_status)
-        self._set_status_data("mainsail", get_client_status, self.mainsail_data, True)
-        self._set_status_data(
-            "mainsail_config", get_client_config_status, self.mainsail_data
+        # fetch all repositories in one round, so that the status probes
+        # compare the local commits to the current remote branches
+        self.git_fetch_results = (
+            GitFetchScheduler()
+            .add(
+                KLIPPER_DIR,
+                MOONRAKER_DIR,
+                self.mainsail_data.client_config.config_dir,
+                self.fluidd_data.client_config.config_dir,
+                KLIPPERSCREEN_DIR,
+                MOBILERAKER_DIR,
+                CROWSNEST_DIR,
+                OE_DIR,
+                TG_BOT_DIR,
+                OBICO_DIR,
+                KLIPPERBACKUP_DIR,
+            )
+            .run()
         )
-        self._set_status_data("fluidd", get_client_status, self.fluidd_data, True)
-        self._set_status_data(
-            "fluidd_config", get_client_config_status, self.fluidd_data
+
+        # all status probes run concurrently, each result is set once available
+        collector = (
+            StatusCollector()
+            .add("klipper", get_klipper_status)
+            .add("moonraker", get_moonraker_status)
+            .add("mainsail", get_client_status, self.mainsail_data, True)
+            .add("mainsail_config", get_client_config_status, self.mainsail_data)
+            .add("fluidd", get_client_status, self.fluidd_data, True)
+            .add("fluidd_config", get_client_config_status, self.fluidd_data)
+            .add("klipperscreen", get_klipperscreen_status)
+            .add("mobileraker", get_mobileraker_status)
+            .add("crowsnest", get_crowsnest_status)
+            .add("octoeverywhere", get_octoeverywhere_status)
+            # apt holds its lock until done, so the probe is waited for
+            .add("system", self._fetch_upgradable_packages, exclusive=True)
         )
-        self._set_status_data("klipperscreen", get_klipperscreen_status)
-        self._set_status_data("mobileraker", get_mobileraker_status)
-        self._set_status_data("crowsnest", get_crowsnest_status)
-        self._set_status_data("octoeverywhere", get_octoeverywhere_status)
+        self.fetch_errors = collector.collect(self._set_fetched_status)
 
+    def _fetch_upgradable_packages(self) -> List[str]:
         update_system_package_lists(silent=True)
-        self.packages = get_upgradable_packages()
-        self.package_count = len(self.packages)
+        return get_upgradable_packages()
+
+    def _set_fetched_status(self, name: str, result: Any) -> None:
+        if name == "system":
+            self.packages = result
+            self.package_count = len(self.packages)
+        else:
+            self._set_status_data(name, result)
 
     def _format_local_status(self, local_version, remote_version) -> str:
         color = COLOR_RED
@@ -244,9 +294,7 @@ class UpdateMenu(BaseMenu):
 
         return f"{color}{local_version or '-'}{RESET_FORMAT}"
 
-    def _set_status_data(self, name: str, status_fn: Callable, *args) -> None:
-        comp_status: ComponentStatus = status_fn(*args)
-
+    def _set_status_data(self, name: str, comp_status: ComponentStatus) -> None:
         self.status_data[name]["installed"] = True if comp_status.status == 2 else False
         self.status_data[name]["local"] = comp_status.local
         self.status_data[name]["remote"] = comp_status.remote
@@ -17,6 +17,7 @@ from core.submodules.simple_config_parser.src.simple_config_parser.simple_config
     NoSectionError,
     SimpleConfigParser,
 )
+from utils.config_utils import CONFIG_CACHE
 from utils.sys_utils import kill
 
 from kiauh import PROJECT_ROOT
@@ -91,7 +92,7 @@ class KiauhSettings:
 
     def save(self) -> None:
         self._set_config_options_state()
-        self.config.write(CUSTOM_CFG)
+        self.config.write(CUSTOM_CFG, incremental=True)
         self._load_config()
 
     def _load_config(self) -> None:
@@ -99,7 +100,7 @@ class KiauhSettings:
             self._kill()
 
         cfg = CUSTOM_CFG if CUSTOM_CFG.exists() else DEFAULT_CFG
-        self.config.read(cfg)
+        self.config = CONFIG_CACHE.get(cfg)
 
         self._validate_cfg()
         self._apply_settings_from_file()
@@ -0,0 +1,112 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+"""
+Compare the single-pass line classifier of SimpleConfigParser with the previous
+approach of running up to five regexes per line and matching options twice.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_line_classifier
+"""
+
+from __future__ import annotations
+
+import timeit
+from typing import List
+
+from benchmarks.config_generator import generate_macro_config
+from src.simple_config_parser.simple_config_parser import LineType, SimpleConfigParser
+
+LINE_COUNTS = [10_000, 50_000, 100_000]
+REPEAT = 5
+
+
+class LegacyClassifierParser(SimpleConfigParser):
+    """SimpleConfigParser using the previous regex-per-line-type classification"""
+
+    def _parse_config(self, content: List[str]) -> None:
+        _curr_multi_opt = ""
+
+        for line in content:
+            if self._is_section(line):
+                self._parse_section(line)
+
+            elif self._is_option(line):
+                self._parse_option(line)
+
+            elif self._is_multiline_option(line):
+                self.in_option_block = True
+                _curr_multi_opt = self._OPTION_RE.match(line).group(1).strip()
+                self._curr_ml_option = self._add_option_to_section_body(
+                    _curr_multi_opt, "", line
+                )
+
+            elif self.in_option_block:
+                self._parse_multiline_option(_curr_multi_opt, line)
+
+            elif self._is_comment(line) or self._is_empty_line(line):
+                self._parse_comment(line)
+
+    def _classify_line(self, line: str, in_option_block: bool):
+        # the same checks as in _parse_config above, without any handlers
+        if self._is_section(line):
+            self._SECTION_RE.match(line)
+            return LineType.SECTION, None
+        elif self._is_option(line):
+            self._OPTION_RE.match(line)
+            return LineType.OPTION, None
+        elif self._is_multiline_option(line):
+            return LineType.MULTILINE_OPTION, self._OPTION_RE.match(line)
+        elif in_option_block:
+            return LineType.MULTILINE_VALUE, None
+        elif self._is_comment(line) or self._is_empty_line(line):
+            return LineType.COMMENT, None
+        return None, None
+
+
+def bench_parse(parser_cls: type, content: List[str]) -> float:
+    """Return the best parse time in seconds of the given parser class"""
+
+    def _parse() -> None:
+        parser_cls()._parse_config(content)
+
+    return min(timeit.repeat(_parse, number=1, repeat=REPEAT))
+
+
+def bench_classify(parser_cls: type, content: List[str]) -> float:
+    """Return the best time in seconds to only classify all lines of the content"""
+
+    parser = parser_cls()
+
+    def _classify() -> None:
+        for line in content:
+            parser._classify_line(line, True)
+
+    return min(timeit.repeat(_classify, number=1, repeat=REPEAT))
+
+
+def main() -> None:
+    for title, bench_fn in (("parse", bench_parse), ("classify", bench_classify)):
+        print(f"{title}:")
+        print(
+            f"{'lines':>10} {'legacy [ms]':>12} {'single-pass [ms]':>17} {'speedup':>8}"
+        )
+        for line_count in LINE_COUNTS:
+            content = generate_macro_config(line_count)
+            legacy = bench_fn(LegacyClassifierParser, content)
+            current = bench_fn(SimpleConfigParser, content)
+            print(
+                f"{len(content):>10} {legacy * 1000:>12.2f} "
+                f"{current * 1000:>17.2f} {legacy / current:>7.2f}x"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+"""
+Compare the memory retained by SimpleConfigParser after parsing a config file,
+using the compact __slots__ line records and the previous Option dicts per line.
+
+The raw lines are owned by the content list and shared by both variants, so the
+difference is the memory of the per-line records themselves.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+"""
+
+from __future__ import annotations
+
+import gc
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.config_generator import generate_macro_config, generate_printer_config
+from src.simple_config_parser.simple_config_parser import SimpleConfigParser
+
+LINE_COUNT = 50_000
+
+
+class LegacyDictParser(SimpleConfigParser):
+    """SimpleConfigParser storing every line of a section body as an Option dict"""
+
+    def _add_option_to_section_body(
+        self, option: str, value: str, line: str, is_multiline: bool = False
+    ):
+        self._ensure_section_body_exists()
+
+        new_option = {
+            "is_multiline": is_multiline,
+            "option": option,
+            "value": value,
+            "_raw": line,
+        }
+        self._config[self.section_name]["body"].append(new_option)
+        if option:
+            self._option_index.setdefault(self.section_name, {})[option] = new_option
+
+        return new_option
+
+    def _parse_multiline_option(self, curr_ml_opt: str, line: str) -> None:
+        section_options = self._all_options.setdefault(self.section_name, {})
+        multiline_options = section_options.setdefault(curr_ml_opt, [])
+
+        _cleaned_line = line.strip().strip("\n")
+        if _cleaned_line and _cleaned_line[0] not in "#;":
+            multiline_options.append(_cleaned_line)
+
+        _option = self._curr_ml_option
+        _option["is_multiline"] = True
+        _option.setdefault("_raw_value", []).append(line)
+        _option["value"] = multiline_options
+
+
+def measure(parser_cls: Callable[[], SimpleConfigParser], content: List[str]) -> int:
+    """Return the number of bytes retained by a parser after parsing content"""
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        parser = parser_cls()
+        parser._parse_config(content)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    del parser
+    return retained
+
+
+def main() -> None:
+    print(
+        f"{'shape':>8} {'lines':>8} {'dict [KiB]':>12} {'slots [KiB]':>12} {'saved':>7}"
+    )
+    for shape, content in (
+        ("printer", generate_printer_config(LINE_COUNT)),
+        ("macro", generate_macro_config(LINE_COUNT)),
+    ):
+        legacy = measure(LegacyDictParser, content)
+        compact = measure(SimpleConfigParser, content)
+        print(
+            f"{shape:>8} {len(content):>8} {legacy / 1024:>12.1f} "
+            f"{compact / 1024:>12.1f} {1 - compact / legacy:>7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+"""
+Measure how the parse time of SimpleConfigParser grows with the size of the
+config file. A linear parser shows a roughly constant time per line.
+
+Two shapes of config files are generated:
+  - many: a lot of small gcode_macro sections (scales the section count)
+  - long: few gcode_macro sections with very long gcode blocks (scales the
+          length of a single multiline option)
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parse_scaling
+"""
+
+from __future__ import annotations
+
+import timeit
+from typing import List
+
+from benchmarks.config_generator import generate_macro_config
+from src.simple_config_parser.simple_config_parser import SimpleConfigParser
+
+LINE_COUNTS = [1_000, 10_000, 25_000, 50_000, 100_000]
+REPEAT = 3
+
+
+def bench_parse(content: List[str]) -> float:
+    """Return the best parse time in seconds for the given config content"""
+
+    def _parse() -> None:
+        SimpleConfigParser()._parse_config(content)
+
+    return min(timeit.repeat(_parse, number=1, repeat=REPEAT))
+
+
+def main() -> None:
+    print(f"{'shape':>6} {'lines':>10} {'total [ms]':>12} {'per line [us]':>14}")
+    for shape, gcode_lines in (("many", 16), ("long", 10_000)):
+        for line_count in LINE_COUNTS:
+            content = generate_macro_config(line_count, gcode_lines)
+            elapsed = bench_parse(content)
+            per_line = elapsed / len(content) * 1_000_000
+            print(
+                f"{shape:>6} {len(content):>10} "
+                f"{elapsed * 1000:>12.2f} {per_line:>14.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+from __future__ import annotations
+
+from typing import List
+
+_GCODE_TEMPLATE = [
+    "    {{% set x = params.X|default(0)|float %}}\n",
+    "    # move to the requested position\n",
+    "    G1 X{{x}} Y{j} F6000\n",
+    "\n",
+    "    {{% if printer.toolhead.homed_axes != 'xyz' %}}\n",
+    "        G28\n",
+    "    {{% endif %}}\n",
+    '    RESPOND MSG="macro {i} step {j}"\n',
+]
+
+
+def generate_macro_config(line_count: int, gcode_lines: int = 16) -> List[str]:
+    """
+    Generate the lines of a Klipper style config file consisting of gcode_macro
+    sections, each with a gcode block of gcode_lines lines. The result has at
+    least line_count lines.
+    """
+
+    lines: List[str] = ["# generated benchmark config\n", "\n"]
+    i = 0
+    while len(lines) < line_count:
+        lines.append(f"[gcode_macro MACRO_{i}]\n")
+        lines.append(f"description: Generated macro {i} # inline comment\n")
+        lines.append(f"variable_counter: {i}\n")
+        lines.append("gcode:\n")
+        for j in range(gcode_lines):
+            template = _GCODE_TEMPLATE[j % len(_GCODE_TEMPLATE)]
+            lines.append(template.format(i=i, j=j))
+        lines.append("\n")
+        i += 1
+    return lines
+
+
+def generate_printer_config(line_count: int) -> List[str]:
+    """
+    Generate the lines of a Klipper style config file consisting of sections
+    with plain options, comments and empty lines, similar to a printer.cfg.
+    The result has at least line_count lines.
+    """
+
+    lines: List[str] = ["# generated benchmark config\n", "\n"]
+    i = 0
+    while len(lines) < line_count:
+        lines.append(f"[stepper_{i}]\n")
+        lines.append("# pins of the stepper driver\n")
+        lines.append(f"step_pin: PF{i % 16}\n")
+        lines.append(f"dir_pin: !PF{(i + 1) % 16}\n")
+        lines.append(f"enable_pin: !PD{i % 8}\n")
+        lines.append("microsteps: 16 # inline comment\n")
+        lines.append(f"rotation_distance: {40 + i % 3}\n")
+        lines.append("\n")
+        lines.append("; tuning values\n")
+        lines.append(f"position_max: {200 + i % 150}\n")
+        lines.append("homing_speed: 50\n")
+        lines.append("\n")
+        i += 1
+    return lines
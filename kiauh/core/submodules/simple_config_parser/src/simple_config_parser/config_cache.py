@@ -0,0 +1,82 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .simple_config_parser import SimpleConfigParser
+
+
+class ConfigCache:
+    """
+    A cache of parsed config files with LRU eviction
+
+    A cached parser is only returned as long as the file was not changed on disk
+    since it was read, which is checked against the inode, mtime and size of the
+    file. Writing a file with SimpleConfigParser.write replaces the file, so the
+    cached entry of a written file is invalidated as well. A cached parser whose
+    internal state was changed without writing it is not returned again either.
+
+    Parsers returned by the cache are shared. Callers changing a parser are
+    expected to write it back to its file.
+    """
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Path, SimpleConfigParser] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, file: Path) -> SimpleConfigParser:
+        """
+        Return a parser of the given file, parsing the file only if there is no
+        valid cached parser for it
+        """
+
+        key = Path(file).resolve()
+        with self._lock:
+            parser = self._entries.get(key)
+            if (
+                parser is not None
+                and not parser.is_stale()
+                and not parser.is_modified()
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return parser
+
+        # the file is parsed without holding the lock, so other files can be
+        # looked up while a large file is parsed
+        parser = SimpleConfigParser()
+        parser.read(key)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = parser
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return parser
+
+    def invalidate(self, file: Path) -> None:
+        """Remove the cached parser of the given file"""
+        with self._lock:
+            self._entries.pop(Path(file).resolve(), None)
+
+    def clear(self) -> None:
+        """Remove all cached parsers"""
+        with self._lock:
+            self._entries.clear()
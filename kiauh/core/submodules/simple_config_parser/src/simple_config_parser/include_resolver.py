@@ -0,0 +1,187 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  https://github.com/dw-0/simple-config-parser                           #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .config_cache import ConfigCache
+from .simple_config_parser import SimpleConfigParser
+
+INCLUDE_PREFIX = "include "
+
+# (path, inode, mtime, size) of a file or directory the resolved config depends on
+_StatKey = Tuple[Path, int, int, int]
+
+
+class IncludeError(Exception):
+    """Raised when the includes of a config file cannot be resolved"""
+
+
+class IncludeNotFoundError(IncludeError):
+    """Raised when an included file without glob pattern does not exist"""
+
+    def __init__(self, file: Path, include: str):
+        msg = f"Include file '{include}' in '{file}' does not exist"
+        super().__init__(msg)
+
+
+class IncludeCycleError(IncludeError):
+    """Raised when a config file includes itself, directly or indirectly"""
+
+    def __init__(self, chain: List[Path]):
+        msg = f"Recursive include of config file: {' -> '.join(map(str, chain))}"
+        super().__init__(msg)
+
+
+class ResolvedConfig:
+    """
+    A config file with all of its includes resolved
+
+    - root: The config file the includes were resolved from
+    - files: All files of the include graph in the order they are first loaded
+    - graph: The files directly included by each file of the include graph
+    - merged: A parser with the merged sections and options of all files
+
+    The merged view follows the order in which Klipper loads the files. The
+    content of an included file is loaded at the position of its include section
+    and options defined later override options defined earlier. Include sections
+    are kept in the merged view as sections without options.
+    The merged parser is only meant for reading, it cannot be written.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.files: List[Path] = []
+        self.graph: Dict[Path, List[Path]] = {}
+        self.merged = SimpleConfigParser()
+        self._origins: Dict[str, List[Path]] = {}
+        self._stat_keys: List[_StatKey] = []
+
+    def has_section(self, section: str) -> bool:
+        """Return True if the section is defined in any file of the include graph"""
+        return self.merged.has_section(section)
+
+    def origins(self, section: str) -> List[Path]:
+        """Return the files defining the given section, in load order"""
+        return self._origins.get(section, [])
+
+    def is_stale(self) -> bool:
+        """
+        Return True if any file of the include graph, or any directory an include
+        glob was expanded in, was changed since the includes were resolved
+        """
+        return any(_stat_key(key[0]) != key for key in self._stat_keys)
+
+
+class IncludeResolver:
+    """
+    Resolve Klipper style [include ...] sections of config files
+
+    Include sections are resolved relative to the directory of the including
+    file and may contain glob patterns, whose matches are loaded in sorted
+    order. Each file is parsed only once through the given ConfigCache, even if
+    it is included many times or by several config files. Resolved configs are
+    cached as well, until a file of their include graph or an expanded glob
+    directory changes.
+    """
+
+    def __init__(self, cache: ConfigCache | None = None, maxsize: int = 16) -> None:
+        self.cache = cache if cache is not None else ConfigCache()
+        self.maxsize = maxsize
+        self._resolved: OrderedDict[Path, ResolvedConfig] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, file: Path) -> ResolvedConfig:
+        """Return the given config file with all of its includes resolved"""
+
+        root = Path(file).resolve()
+        with self._lock:
+            resolved = self._resolved.get(root)
+            if resolved is not None and not resolved.is_stale():
+                self._resolved.move_to_end(root)
+                return resolved
+
+        resolved = ResolvedConfig(root)
+        self._load(resolved, root, [])
+
+        with self._lock:
+            self._resolved[root] = resolved
+            self._resolved.move_to_end(root)
+            while len(self._resolved) > self.maxsize:
+                self._resolved.popitem(last=False)
+
+        return resolved
+
+    def invalidate(self, file: Path) -> None:
+        """Remove the resolved config of the given root file"""
+        with self._lock:
+            self._resolved.pop(Path(file).resolve(), None)
+
+    def _load(self, resolved: ResolvedConfig, file: Path, stack: List[Path]) -> None:
+        """Merge the given file and, recursively, the files it includes"""
+
+        if file in stack:
+            raise IncludeCycleError([*stack, file])
+
+        first_load = file not in resolved.graph
+        if first_load:
+            resolved.files.append(file)
+            resolved.graph[file] = []
+            resolved._stat_keys.append(_stat_key(file))
+
+        parser = self.cache.get(file)
+        merged = resolved.merged
+
+        for section in parser.sections():
+            if section not in merged._all_options:
+                merged._all_sections.append(section)
+                merged._all_options[section] = {}
+            origins = resolved._origins.setdefault(section, [])
+            if file not in origins:
+                origins.append(file)
+
+            if not section.startswith(INCLUDE_PREFIX):
+                merged._all_options[section].update(parser._all_options[section])
+                continue
+
+            for include in self._expand(resolved, file, section):
+                if first_load:
+                    resolved.graph[file].append(include)
+                self._load(resolved, include, [*stack, file])
+
+    def _expand(self, resolved: ResolvedConfig, file: Path, section: str) -> List[Path]:
+        """Return the files matching the include section of the given file"""
+
+        include = section[len(INCLUDE_PREFIX) :].strip()
+        pattern = os.path.join(file.parent, os.path.expanduser(include))
+        matches = sorted(glob.glob(pattern))
+
+        if glob.has_magic(pattern):
+            # files added to or removed from a directory change its mtime
+            directory = Path(pattern).parent
+            if not glob.has_magic(str(directory)):
+                resolved._stat_keys.append(_stat_key(directory))
+        elif not matches:
+            raise IncludeNotFoundError(file, include)
+
+        return [Path(match).resolve() for match in matches if os.path.isfile(match)]
+
+
+def _stat_key(path: Path) -> _StatKey:
+    """Return the stat values used to detect changes of the given path"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return path, -1, -1, -1
+    return path, stat.st_ino, stat.st_mtime_ns, stat.st_size
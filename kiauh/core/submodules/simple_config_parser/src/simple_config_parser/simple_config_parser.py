@@ -8,23 +8,57 @@
 
 from __future__ import annotations
 
+import os
 import re
+import uuid
 from pathlib import Path
-from typing import Callable, Dict, List, Match, Tuple, TypedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Match,
+    NamedTuple,
+    Set,
+    TextIO,
+    Tuple,
+    TypedDict,
+)
 
-_UNSET = object()
 
+class _Unset:
+    """Type of the sentinel marking a fallback that was not given"""
 
-class Section(TypedDict):
+
+_UNSET = _Unset()
+
+
+class LineType:
+    """
+    The type of a single line in the config file, as detected by the tokenizer.
+    These are plain int constants instead of an Enum, because the line type is
+    checked for every line of a parsed file and Enum member access is slow.
+    """
+
+    SECTION = 1
+    OPTION = 2
+    MULTILINE_OPTION = 3
+    MULTILINE_VALUE = 4
+    COMMENT = 5
+
+
+class Section(TypedDict, total=False):
     """
     A single section in the config file
 
     - _raw: The raw representation of the section name
-    - options: A list of options in the section
+    - body: The option and comment lines of the section
     """
 
     _raw: str
-    options: List[Option]
+    body: List[OptionLine | CommentLine]
 
 
 class Option(TypedDict, total=False):
@@ -36,6 +70,8 @@ class Option(TypedDict, total=False):
     - value: The value of the option
     - _raw: The raw representation of the option
     - _raw_value: The raw value of the option
+    - _removed: Whether the option was removed and only awaits compaction of the
+                section body
 
     A multinline option is an option that contains multiple lines of text following
     the option name in the next line. The value of a multiline option is a list of
@@ -47,6 +83,183 @@ class Option(TypedDict, total=False):
     value: str | List[str]
     _raw: str
     _raw_value: str | List[str]
+    _removed: bool
+
+
+class _LineRecord:
+    """
+    Base class for the compact records that store a single line of a section body.
+
+    Records use __slots__ instead of a per-instance dict, which considerably
+    reduces the memory needed per parsed line. For compatibility with the Option
+    dict they replace, records can still be accessed like a mapping. Unset
+    fields behave like missing keys.
+    """
+
+    __slots__ = ()
+    __hash__ = None  # type: ignore[assignment]
+    _keys: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self._keys:
+            raise KeyError(key)
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys and hasattr(self, key)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, _LineRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._keys:
+            return default
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a dict with the keys of an Option"""
+        return {k: getattr(self, k) for k in self._keys if hasattr(self, k)}
+
+
+class OptionLine(_LineRecord):
+    """
+    A single option line of a section body
+
+    The fields are the same as the keys of an Option. The optional fields
+    _raw_value and _removed are left unset until they are needed.
+    """
+
+    __slots__ = ("is_multiline", "option", "value", "_raw", "_raw_value", "_removed")
+    _keys = __slots__
+
+    is_multiline: bool
+    option: str
+    value: str | List[str]
+    _raw: str
+    _raw_value: List[str]
+    _removed: bool
+
+    def __init__(
+        self, option: str, value: str | List[str], raw: str, is_multiline: bool = False
+    ) -> None:
+        self.is_multiline = is_multiline
+        self.option = option
+        self.value = value
+        self._raw = raw
+
+
+class CommentLine(_LineRecord):
+    """
+    A comment or empty line of a section body
+
+    Only the raw line is stored per instance, the remaining fields of an
+    Option are constant for every comment line.
+    """
+
+    __slots__ = ("_raw",)
+    _keys = ("is_multiline", "option", "value", "_raw")
+
+    _raw: str
+
+    is_multiline = False
+    option = ""
+    value = ""
+
+    def __init__(self, raw: str) -> None:
+        self._raw = raw
+
+
+class ConfigEvent(NamedTuple):
+    """
+    A single section or option as yielded by the streaming reader
+
+    - section: The name of the section the event belongs to
+    - option: The name of the option, None if the event is a section header
+    - value: The value of the option, None if the event is a section header
+    - raw: The raw representation of the section header or the option
+
+    The value of a multiline option is a list of strings and its raw representation
+    contains the option line and all lines of the option block.
+    """
+
+    section: str
+    option: str | None
+    value: str | List[str] | None
+    raw: str
+
+
+class _SourceFile(NamedTuple):
+    """The file a parser was read from, as seen at the time of reading"""
+
+    path: Path
+    ino: int
+    mtime_ns: int
+    size: int
+    encoding: str
+
+    def is_unchanged(self) -> bool:
+        """Return True if the file was not changed since it was read"""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        # files are replaced by an atomic rename on write, so a changed inode
+        # catches writes even on file systems with a coarse mtime resolution
+        return (
+            stat.st_ino == self.ino
+            and stat.st_mtime_ns == self.mtime_ns
+            and stat.st_size == self.size
+        )
+
+
+def _write_atomic(target: Path, content: bytes) -> None:
+    """
+    Write the content to a temporary file in the directory of the target and
+    rename it to the target. Symlinks are resolved, so the file they point to
+    is replaced instead of the link. The file mode of an existing target is kept.
+    If no temporary file can be created in the directory, the target is written
+    in place instead.
+    """
+
+    target = target.resolve()
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+    try:
+        f = open(tmp, "xb")
+    except PermissionError:
+        with open(target, "wb") as f:
+            f.write(content)
+        return
+
+    try:
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if target.exists():
+            os.chmod(tmp, target.stat().st_mode & 0o7777)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 class NoSectionError(Exception):
@@ -139,12 +352,24 @@ class SimpleConfigParser:
     }
 
     def __init__(self):
-        self._config: Dict = {}
+        self._config: Dict[str, Section] = {}
         self._header: List[str] = []
         self._all_sections: List[str] = []
         self._all_options: Dict = {}
+        # per section index of option names to their entry in the section body
+        self._option_index: Dict[str, Dict[str, OptionLine]] = {}
+        # per section count of removed options still present in the section body
+        self._removed_count: Dict[str, int] = {}
         self.section_name: str = ""
         self.in_option_block: bool = False  # whether we are in a multiline option block
+        # the currently open multiline option, new value lines are appended to it
+        self._curr_ml_option: OptionLine | None = None
+        # the line number of each section line in the parsed content
+        self._section_lines: Dict[str, int] = {}
+        self._line_count: int = 0
+        # sections changed since the file was read, see write(incremental=True)
+        self._dirty_sections: Set[str] = set()
+        self._source: _SourceFile | None = None
 
     def read(self, file: Path) -> None:
         """
@@ -157,11 +382,131 @@ class SimpleConfigParser:
 
         try:
             with open(file, "r") as f:
-                self._parse_config(f.readlines())
+                stat = os.fstat(f.fileno())
+                self._parse_config(f)
+                self._source = _SourceFile(
+                    Path(file), stat.st_ino, stat.st_mtime_ns, stat.st_size, f.encoding
+                )
 
         except OSError:
             raise
 
+    def iter_events(self, f: TextIO | Iterable[str]) -> Iterator[ConfigEvent]:
+        """
+        Iterate over the sections and options of the given file object and yield
+        a ConfigEvent for each of them. Lines are read one by one and the internal
+        state is not touched, so no value can be looked up from the parser after
+        iterating. Comments and empty lines are not yielded.
+
+        An event for a multiline option is yielded once its option block ended.
+
+        :param f: A file object or any other iterable of lines
+        :return: An iterator of ConfigEvents
+        """
+
+        section = ""
+        in_option_block = False
+        ml_option: str | None = None
+        ml_value: List[str] = []
+        ml_raw: List[str] = []
+
+        for line in f:
+            line_type, match = self._classify_line(line, in_option_block)
+
+            if line_type == LineType.MULTILINE_VALUE:
+                ml_raw.append(line)
+                _cleaned_line = line.strip()
+                if _cleaned_line and _cleaned_line[0] not in "#;":
+                    ml_value.append(_cleaned_line)
+                continue
+
+            # any other line type closes a currently open option block
+            if ml_option is not None:
+                yield ConfigEvent(section, ml_option, ml_value, "".join(ml_raw))
+                ml_option = None
+            in_option_block = False
+
+            # comments, empty and invalid lines are not yielded
+            if match is None:
+                continue
+
+            if line_type == LineType.SECTION:
+                section = match.group(1).strip()
+                yield ConfigEvent(section, None, None, line)
+
+            elif line_type == LineType.OPTION:
+                option = match.group(1).strip()
+                yield ConfigEvent(section, option, self._get_option_value(match), line)
+
+            elif line_type == LineType.MULTILINE_OPTION:
+                in_option_block = True
+                ml_option = match.group(1).strip()
+                ml_value, ml_raw = [], [line]
+
+        if ml_option is not None:
+            yield ConfigEvent(section, ml_option, ml_value, "".join(ml_raw))
+
+    def find_event(
+        self, f: TextIO | Iterable[str], section: str, option: str | None = None
+    ) -> ConfigEvent | None:
+        """
+        Return the event of the given section or option from the given file object.
+        Reading stops as soon as the section or option was found, or once the
+        requested section ended without containing the option.
+
+        :param f: A file object or any other iterable of lines
+        :param section: The section to look for
+        :param option: The option to look for, if None the section header is returned
+        :return: The matching ConfigEvent or None if it was not found
+        """
+
+        for event in self._iter_section_events(f, section):
+            if event.option == option:
+                return event
+        return None
+
+    def lookup(
+        self,
+        file: Path,
+        section: str,
+        option: str,
+        fallback: str | List[str] | None | _Unset = _UNSET,
+    ) -> str | List[str] | None:
+        """
+        Return the value of the given option in the given section by reading the
+        given file only up to that option. Unlike `get`, this does not require
+        a previous call to `read` and leaves the internal state untouched.
+
+        If the key is not found and 'fallback' is provided, it is used as
+        a fallback value.
+        """
+
+        section_found = False
+        with open(file, "r") as f:
+            for event in self._iter_section_events(f, section):
+                section_found = True
+                if event.option == option:
+                    return event.value
+
+        if not isinstance(fallback, _Unset):
+            return fallback
+        if not section_found:
+            raise NoSectionError(section)
+        raise NoOptionError(option, section)
+
+    def _iter_section_events(
+        self, f: TextIO | Iterable[str], section: str
+    ) -> Iterator[ConfigEvent]:
+        """Yield the events of the given section only, stop once the section ended"""
+
+        in_section = False
+        for event in self.iter_events(f):
+            if event.section == section:
+                in_section = True
+                yield event
+            elif in_section:
+                return
+
     def _reset_state(self):
         """Reset the internal state."""
 
@@ -169,16 +514,97 @@ class SimpleConfigParser:
         self._header.clear()
         self._all_sections.clear()
         self._all_options.clear()
+        self._option_index.clear()
+        self._removed_count.clear()
         self.section_name = ""
         self.in_option_block = False
+        self._curr_ml_option = None
+        self._section_lines.clear()
+        self._line_count = 0
+        self._dirty_sections.clear()
+        self._source = None
+
+    def write(self, filename, incremental: bool = False) -> None:
+        """
+        Write the internal state to the given file
 
-    def write(self, filename):
-        """Write the internal state to the given file"""
+        The content is written to a temporary file next to the target, which
+        then replaces the target with an atomic rename. A crash during the write
+        therefore never leaves a truncated file behind.
 
-        content = self._construct_content()
+        In incremental mode, only the sections changed since the file was read
+        are constructed from the internal state. All other sections are copied
+        byte by byte from the file that was read, and writing an unchanged config
+        back to the file it was read from is skipped entirely. If the file was
+        changed on disk since it was read, the whole content is constructed.
+        """
 
-        with open(filename, "w") as f:
-            f.write(content)
+        if incremental:
+            content = self._splice_content(filename)
+            if content is None:
+                return
+        else:
+            content = self._construct_content().encode(self._encoding())
+
+        _write_atomic(Path(filename), content)
+
+    def to_string(self) -> str:
+        """Return the content of the config file as it would be written"""
+        return self._construct_content()
+
+    def _encoding(self) -> str:
+        """Return the encoding of the file that was read, utf-8 if there is none"""
+        return self._source.encoding if self._source else "utf-8"
+
+    def _splice_content(self, filename) -> bytes | None:
+        """
+        Return the content of the config file as bytes, with the byte ranges of
+        all changed sections replaced. Returns None if nothing changed and the
+        given file is the file that was read, so there is nothing to write.
+        """
+
+        source = self._source
+        if source is None or not source.is_unchanged():
+            return self._construct_content().encode(self._encoding())
+
+        same_file = Path(filename).resolve() == source.path.resolve()
+        if same_file and not self.is_modified():
+            return None
+
+        # both text mode and bytes.splitlines() split on \n, \r and \r\n, so the
+        # line numbers of the parsed content match the lines in the file
+        lines = source.path.read_bytes().splitlines(keepends=True)
+        if len(lines) != self._line_count:
+            return self._construct_content().encode(source.encoding)
+
+        starts = list(self._section_lines.values())
+        ends = dict(zip(self._section_lines, starts[1:] + [len(lines)]))
+        header_end = starts[0] if starts else len(lines)
+
+        content: List[bytes] = [b"".join(lines[:header_end])]
+        for section in self._config:
+            if section in self._dirty_sections or section not in ends:
+                sec_content = self._construct_section_content(section)
+                content.append(sec_content.encode(source.encoding))
+            else:
+                start = self._section_lines[section]
+                content.append(b"".join(lines[start : ends[section]]))
+
+        return b"".join(content)
+
+    def is_modified(self) -> bool:
+        """Return True if the internal state was changed since the file was read"""
+
+        if self._dirty_sections or len(self._config) != len(self._section_lines):
+            return True
+        return any(section not in self._section_lines for section in self._config)
+
+    def is_stale(self) -> bool:
+        """
+        Return True if the file that was read was changed on disk since reading,
+        or if no file was read at all
+        """
+        return self._source is None or not self._source.is_unchanged()
 
     def _construct_content(self) -> str:
         """
@@ -197,30 +623,108 @@ class SimpleConfigParser:
         if self._header is not None:
             content.extend(self._header)
         for section in self._config:
-            content.append(self._config[section]["_raw"])
-
-            if (sec_body := self._config[section].get("body")) is not None:
-                for option in sec_body:
-                    content.extend(option["_raw"])
-                    if option["is_multiline"]:
-                        content.extend(option["_raw_value"])
+            content.append(self._construct_section_content(section))
         content: str = "".join(content)
 
         return content
 
+    def _construct_section_content(self, section: str) -> str:
+        """Construct the content of a single section, including the section line"""
+
+        content: List[str] = [self._config[section]["_raw"]]
+        if (sec_body := self._config[section].get("body")) is not None:
+            for option in sec_body:
+                if option.get("_removed"):
+                    continue
+                content.append(option["_raw"])
+                if option["is_multiline"]:
+                    content.extend(option["_raw_value"])
+
+        return "".join(content)
+
     def sections(self) -> List[str]:
         """Return a list of section names"""
 
         return self._all_sections
 
-    def add_section(self, section: str) -> None:
-        """Add a new section to the internal state"""
+    def add_section(
+        self,
+        section: str,
+        *,
+        top: bool = False,
+        before: str | None = None,
+        after: str | None = None,
+    ) -> None:
+        """
+        Add a new section to the internal state
+
+        By default, the section is added at the end of the file. At most one of
+        the following positions can be given instead:
+        - top: Add the section before the first section, below the file header
+        - before: Add the section right before the given section
+        - after: Add the section right after the given section and its options
+        """
 
         if section in self._all_sections:
             raise DuplicateSectionError(section)
-        self._all_sections.append(section)
+        if sum((top, before is not None, after is not None)) > 1:
+            raise ValueError("Only one of top, before or after can be given")
+
+        for anchor in (before, after):
+            if anchor is not None and anchor not in self._all_options:
+                raise NoSectionError(anchor)
+
+        if top:
+            index = 0
+        elif before is not None:
+            index = self._all_sections.index(before)
+        elif after is not None:
+            index = self._all_sections.index(after) + 1
+        else:
+            index = len(self._all_sections)
+
         self._all_options[section] = {}
-        self._config[section] = {"_raw": f"\n[{section}]\n", "body": []}
+        self._option_index[section] = {}
+        self._dirty_sections.add(section)
+
+        if index == len(self._all_sections):
+            self._all_sections.append(section)
+            self._config[section] = {"_raw": f"\n[{section}]\n", "body": []}
+            return
+
+        # separate the new section from the surrounding content by empty lines,
+        # the same way sections of a config file usually are
+        prev_line = self._last_line_before(index)
+        _raw = f"[{section}]\n"
+        if prev_line is not None and prev_line.strip():
+            _raw = f"\n{_raw}"
+
+        sections = list(self._config.items())
+        sections.insert(index, (section, {"_raw": _raw, "body": [CommentLine("\n")]}))
+        self._config.clear()
+        self._config.update(sections)
+        self._all_sections.insert(index, section)
+
+    def _last_line_before(self, index: int) -> str | None:
+        """
+        Return the last raw line of the content preceding the section at the given
+        index, or None if there is no content before it
+        """
+
+        if index == 0:
+            return self._header[-1] if self._header else None
+
+        sec = self._config[self._all_sections[index - 1]]
+        body: List[OptionLine | CommentLine] = sec["body"]
+        for option in reversed(body):
+            if isinstance(option, CommentLine):
+                return option._raw
+            if option.get("_removed"):
+                continue
+            if option.is_multiline and option.get("_raw_value"):
+                return option._raw_value[-1]
+            return option._raw
+        return sec["_raw"]
 
     def remove_section(self, section: str) -> None:
         """Remove the given section"""
@@ -230,6 +734,9 @@ class SimpleConfigParser:
 
         self._all_sections.pop(self._all_sections.index(section))
         self._all_options.pop(section)
+        self._option_index.pop(section, None)
+        self._removed_count.pop(section, None)
+        self._dirty_sections.discard(section)
         self._config.pop(section)
 
     def options(self, section) -> List[str]:
@@ -352,33 +859,29 @@ class SimpleConfigParser:
 
         # the option does not exist yet
         if option not in self._all_options.get(section):
-            _option: Option = {
-                "is_multiline": _multiline,
-                "option": option,
-                "value": _value,
-                "_raw": _raw,
-            }
+            _option = OptionLine(option, _value, _raw, _multiline)
             if _raw_value is not None:
-                _option["_raw_value"] = _raw_value
+                _option._raw_value = _raw_value
             self._config[section]["body"].insert(0, _option)
+            self._option_index.setdefault(section, {})[option] = _option
 
         # the option exists and we need to update it
         else:
-            for _option in self._config[section]["body"]:
-                if _option["option"] == option:
-                    if multiline:
-                        _option["_raw"] = _raw
-                    else:
-                        # we preserve inline comments by replacing the old value with the new one
-                        _option["_raw"] = _option["_raw"].replace(
-                            _option["value"], _value
-                        )
-                    _option["value"] = _value
-                    if _raw_value is not None:
-                        _option["_raw_value"] = _raw_value
-                    break
+            _option = self._option_index[section][option]
+            # setting the current value again leaves the section unchanged
+            if not multiline and not _option.is_multiline and _option.value == _value:
+                return
+            if multiline:
+                _option._raw = _raw
+            else:
+                # we preserve inline comments by replacing the old value with the new one
+                _option._raw = _option._raw.replace(_option.value, _value)
+            _option.value = _value
+            if _raw_value is not None:
+                _option._raw_value = _raw_value
 
         self._all_options[section][option] = _value
+        self._dirty_sections.add(section)
 
     def remove_option(self, section: str, option: str) -> None:
         """Remove the given option from the given section"""
@@ -389,11 +892,21 @@ class SimpleConfigParser:
         if option not in self._all_options.get(section):
             raise NoOptionError(option, section)
 
-        for _option in self._config[section]["body"]:
-            if _option["option"] == option:
-                del self._all_options[section][option]
-                self._config[section]["body"].remove(_option)
-                break
+        del self._all_options[section][option]
+        self._dirty_sections.add(section)
+
+        # the option is only flagged as removed, so removing it does not require
+        # a scan of the section body. the body is compacted once half of its
+        # entries are removed, which keeps the cost of bulk removals linear.
+        _option = self._option_index[section].pop(option)
+        _option._removed = True
+        removed_count = self._removed_count.get(section, 0) + 1
+        self._removed_count[section] = removed_count
+
+        body = self._config[section]["body"]
+        if removed_count * 2 >= len(body):
+            body[:] = [o for o in body if not o.get("_removed")]
+            self._removed_count[section] = 0
 
     def has_section(self, section: str) -> bool:
         """Return True if the given section exists, False otherwise"""
@@ -442,41 +955,93 @@ class SimpleConfigParser:
 
         return True
 
-    def _parse_config(self, content: List[str]) -> None:
+    def _classify_line(
+        self, line: str, in_option_block: bool
+    ) -> Tuple[int | None, Match[str] | None]:
+        """
+        Classify the given line in a single pass and return its type together with
+        the regex match, so the handlers don't need to match the line again.
+
+        The first character of the line decides which regexes can match at all:
+        only a line starting with a square bracket can be a section, and only a line
+        starting with a non-whitespace character other than a separator can be an
+        option. The precedence is the same as checking each line type in order:
+        section, option, multiline option, multiline value, comment or empty line.
+
+        :param line: The line to classify
+        :param in_option_block: Whether the line follows a multiline option
+        :return: The line type and its match, or (None, None) if the line is invalid
+        """
+
+        first_char = line[:1]
+
+        if first_char == "[":
+            match = self._SECTION_RE.match(line)
+            if match is not None:
+                return LineType.SECTION, match
+
+        if first_char and not first_char.isspace() and first_char not in ":=":
+            match = self._OPTION_RE.match(line)
+            # if there is no value, it's not a regular option but a multiline option
+            if match is not None and match.group(2).strip():
+                return LineType.OPTION, match
+
+            match = self._MLOPTION_RE.match(line)
+            if match is not None:
+                return LineType.MULTILINE_OPTION, match
+
+        if in_option_block:
+            return LineType.MULTILINE_VALUE, None
+
+        # the comment regex also matches lines that only contain whitespace
+        if self._COMMENT_RE.match(line) is not None:
+            return LineType.COMMENT, None
+
+        return None, None
+
+    def _parse_config(self, content: Iterable[str]) -> None:
         """Parse the given content and store the result in the internal state"""
 
         _curr_multi_opt = ""
+        lineno = -1
+
+        for lineno, line in enumerate(content):
+            line_type, match = self._classify_line(line, self.in_option_block)
 
-        # THE ORDER MATTERS, DO NOT REORDER THE CONDITIONS!
-        for line in content:
-            if self._is_section(line):
-                self._parse_section(line)
+            if line_type == LineType.SECTION:
+                self._parse_section(line, match)
+                self._section_lines[self.section_name] = lineno
 
-            elif self._is_option(line):
-                self._parse_option(line)
+            elif line_type == LineType.OPTION:
+                self._parse_option(line, match)
 
-            # if it's not a regular option with the value inline,
-            # it might be a might be a multiline option block
-            elif self._is_multiline_option(line):
+            elif line_type == LineType.MULTILINE_OPTION:
                 self.in_option_block = True
-                _curr_multi_opt = self._OPTION_RE.match(line).group(1).strip()
-                self._add_option_to_section_body(_curr_multi_opt, "", line)
+                _curr_multi_opt = match.group(1).strip()
+                self._curr_ml_option = self._add_option_line(_curr_multi_opt, "", line)
 
-            elif self.in_option_block:
+            elif line_type == LineType.MULTILINE_VALUE:
                 self._parse_multiline_option(_curr_multi_opt, line)
 
-            # if it's nothing from above, it's probably a comment or an empty line
-            elif self._is_comment(line) or self._is_empty_line(line):
+            elif line_type == LineType.COMMENT:
                 self._parse_comment(line)
 
-    def _parse_section(self, line: str) -> None:
-        """Parse a section line and store the result in the internal state"""
+        self._line_count = lineno + 1
+
+    def _parse_section(self, line: str, match: Match[str] | None = None) -> None:
+        """
+        Parse a section line and store the result in the internal state.
+        If the match of the section regex is already known, it can be passed
+        in to avoid matching the line again.
+        """
 
-        match: Match[str] | None = self._SECTION_RE.match(line)
+        if match is None:
+            match = self._SECTION_RE.match(line)
         if not match:
             return
 
         self.in_option_block = False
+        self._curr_ml_option = None
 
         section_name: str = match.group(1).strip()
         self._store_internal_state_section(section_name, line)
@@ -484,24 +1049,39 @@ class SimpleConfigParser:
     def _store_internal_state_section(self, section: str, raw_value: str) -> None:
         """Store the given section and its raw value in the internal state"""
 
-        if section in self._all_sections:
+        # _all_options holds the same keys as _all_sections, but offers O(1) lookups
+        if section in self._all_options:
             raise DuplicateSectionError(section)
 
         self.section_name = section
         self._all_sections.append(section)
         self._all_options[section] = {}
+        self._option_index[section] = {}
         self._config[section]: Section = {"_raw": raw_value, "body": []}
 
-    def _parse_option(self, line: str) -> None:
-        """Parse an option line and store the result in the internal state"""
+    def _parse_option(self, line: str, match: Match[str] | None = None) -> None:
+        """
+        Parse an option line and store the result in the internal state.
+        If the match of the option regex is already known, it can be passed
+        in to avoid matching the line again.
+        """
 
         self.in_option_block = False
+        self._curr_ml_option = None
 
-        match: Match[str] | None = self._OPTION_RE.match(line)
+        if match is None:
+            match = self._OPTION_RE.match(line)
         if not match:
             return
 
         option: str = match.group(1).strip()
+        value: str = self._get_option_value(match)
+
+        self._store_internal_state_option(option, value, line)
+
+    def _get_option_value(self, match: Match[str]) -> str:
+        """Return the value of a matched option line without its inline comment"""
+
         value: str = match.group(2).strip()
 
         if ";" in value:
@@ -511,7 +1091,7 @@ class SimpleConfigParser:
             i = value.index("#")
             value = value[:i].strip()
 
-        self._store_internal_state_option(option, value, line)
+        return value
 
     def _store_internal_state_option(
         self, option: str, value: str, raw_value: str
@@ -527,24 +1107,37 @@ class SimpleConfigParser:
         self._add_option_to_section_body(option, value, raw_value)
 
     def _parse_multiline_option(self, curr_ml_opt: str, line: str) -> None:
-        """Parse a multiline option line and store the result in the internal state"""
+        """
+        Parse a multiline option line and store the result in the internal state
+
+        The line is appended in place to the currently open multiline option, so
+        parsing a block of n lines is linear in n. The option is looked up in the
+        option index if there is no open option handle for the given option name.
+        """
 
         section_options = self._all_options.setdefault(self.section_name, {})
         multiline_options = section_options.setdefault(curr_ml_opt, [])
 
+        # a non-empty line is a comment if it starts with a comment marker,
+        # which is equivalent to matching it against _COMMENT_RE
         _cleaned_line = line.strip().strip("\n")
-        if _cleaned_line and not self._is_comment(line):
+        if _cleaned_line and _cleaned_line[0] not in "#;":
             multiline_options.append(_cleaned_line)
 
         # add the option to the internal multiline option value state
-        self._ensure_section_body_exists()
-        for _option in self._config[self.section_name]["body"]:
-            if _option.get("option") == curr_ml_opt:
-                _option.update(
-                    is_multiline=True,
-                    _raw_value=_option.get("_raw_value", []) + [line],
-                    value=multiline_options,
-                )
+        _option = self._curr_ml_option
+        if _option is None or _option.option != curr_ml_opt:
+            _option = self._option_index.get(self.section_name, {}).get(curr_ml_opt)
+            if _option is None:
+                return
+            self._curr_ml_option = _option
+
+        _option.is_multiline = True
+        _option.value = multiline_options
+        try:
+            _option._raw_value.append(line)
+        except AttributeError:
+            _option._raw_value = [line]
 
     def _parse_comment(self, line: str) -> None:
         """
@@ -556,6 +1149,7 @@ class SimpleConfigParser:
         """
 
         self.in_option_block = False
+        self._curr_ml_option = None
 
         if not self.section_name:
             self._header.append(line)
@@ -572,17 +1166,28 @@ class SimpleConfigParser:
 
     def _add_option_to_section_body(
         self, option: str, value: str, line: str, is_multiline: bool = False
-    ) -> None:
-        """Add a raw option line to the internal state"""
+    ) -> OptionLine | CommentLine:
+        """Add a raw option line to the internal state and return the new option"""
+
+        # comments and empty lines have no option name and are not indexed
+        if option or value or is_multiline:
+            return self._add_option_line(option, value, line, is_multiline)
+
+        self._ensure_section_body_exists()
+        comment = CommentLine(line)
+        self._config[self.section_name]["body"].append(comment)
+        return comment
+
+    def _add_option_line(
+        self, option: str, value: str, line: str, is_multiline: bool = False
+    ) -> OptionLine:
+        """Add an option line to the internal state and return the new option"""
 
         self._ensure_section_body_exists()
 
-        new_option: Option = {
-            "is_multiline": is_multiline,
-            "option": option,
-            "value": value,
-            "_raw": line,
-        }
+        new_option = OptionLine(option, value, line, is_multiline)
+        if option:
+            self._option_index.setdefault(self.section_name, {})[option] = new_option
+        self._config[self.section_name]["body"].append(new_option)
 
-        option_body = self._config[self.section_name]["body"]
-        option_body.append(new_option)
+        return new_option
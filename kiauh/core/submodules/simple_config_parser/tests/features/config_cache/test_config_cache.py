@@ -0,0 +1,85 @@
+import pytest
+
+from src.simple_config_parser.config_cache import ConfigCache
+
+CONTENT = "[server]\nhost: 0.0.0.0\nport: 7125\n"
+
+
+@pytest.fixture
+def cache():
+    return ConfigCache(maxsize=2)
+
+
+@pytest.fixture
+def cfg_file(tmp_path):
+    file = tmp_path.joinpath("moonraker.conf")
+    file.write_text(CONTENT)
+    return file
+
+
+class TestConfigCache:
+    def test_get_returns_cached_parser(self, cache, cfg_file):
+        parser = cache.get(cfg_file)
+
+        assert cache.get(cfg_file) is parser
+        assert parser.getint("server", "port") == 7125
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_get_reparses_changed_file(self, cache, cfg_file):
+        parser = cache.get(cfg_file)
+        cfg_file.write_text(CONTENT.replace("7125", "7126"))
+
+        new_parser = cache.get(cfg_file)
+
+        assert new_parser is not parser
+        assert new_parser.getint("server", "port") == 7126
+
+    def test_get_reparses_written_file(self, cache, cfg_file):
+        parser = cache.get(cfg_file)
+        parser.set("server", "port", "7126")
+        parser.write(cfg_file, incremental=True)
+
+        new_parser = cache.get(cfg_file)
+
+        assert new_parser is not parser
+        assert new_parser.getint("server", "port") == 7126
+
+    def test_get_does_not_return_modified_parser(self, cache, cfg_file):
+        parser = cache.get(cfg_file)
+        parser.add_section("update_manager")
+
+        new_parser = cache.get(cfg_file)
+
+        assert new_parser is not parser
+        assert not new_parser.has_section("update_manager")
+
+    def test_set_same_value_keeps_parser_cached(self, cache, cfg_file):
+        parser = cache.get(cfg_file)
+        parser.set("server", "port", "7125")
+
+        assert parser.is_modified() is False
+        assert cache.get(cfg_file) is parser
+
+    def test_lru_eviction(self, cache, tmp_path):
+        files = []
+        for i in range(3):
+            file = tmp_path.joinpath(f"printer_{i}.cfg")
+            file.write_text(CONTENT)
+            files.append(file)
+
+        first = cache.get(files[0])
+        cache.get(files[1])
+        assert cache.get(files[0]) is first
+        cache.get(files[2])
+
+        assert len(cache) == 2
+        assert cache.get(files[0]) is first
+        cache.get(files[1])
+        assert cache.misses == 4  # files[1] was evicted and parsed again
+
+    def test_invalidate(self, cache, cfg_file):
+        parser = cache.get(cfg_file)
+        cache.invalidate(cfg_file)
+
+        assert len(cache) == 0
+        assert cache.get(cfg_file) is not parser
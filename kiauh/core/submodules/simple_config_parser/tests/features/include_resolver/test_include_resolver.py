@@ -0,0 +1,112 @@
+import pytest
+
+from src.simple_config_parser.config_cache import ConfigCache
+from src.simple_config_parser.include_resolver import (
+    IncludeCycleError,
+    IncludeNotFoundError,
+    IncludeResolver,
+)
+
+
+@pytest.fixture
+def cache():
+    return ConfigCache()
+
+
+@pytest.fixture
+def resolver(cache):
+    return IncludeResolver(cache)
+
+
+@pytest.fixture
+def cfg_dir(tmp_path):
+    tmp_path.joinpath("printer.cfg").write_text(
+        "[include mainsail.cfg]\n"
+        "[include macros/*.cfg]\n"
+        "[printer]\n"
+        "kinematics: cartesian\n"
+        "max_velocity: 300\n"
+    )
+    tmp_path.joinpath("mainsail.cfg").write_text(
+        "[include macros/common.cfg]\n[virtual_sdcard]\npath: ~/gcodes\n"
+    )
+    tmp_path.joinpath("macros").mkdir()
+    tmp_path.joinpath("macros/common.cfg").write_text(
+        "[printer]\nmax_velocity: 200\n[gcode_macro A]\ngcode:\n    G28\n"
+    )
+    tmp_path.joinpath("macros/extra.cfg").write_text("[gcode_macro B]\ngcode: M84\n")
+    return tmp_path
+
+
+class TestIncludeResolver:
+    def test_resolve_include_graph(self, resolver, cfg_dir):
+        resolved = resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+
+        printer_cfg = cfg_dir.joinpath("printer.cfg").resolve()
+        mainsail_cfg = cfg_dir.joinpath("mainsail.cfg").resolve()
+        common_cfg = cfg_dir.joinpath("macros/common.cfg").resolve()
+        extra_cfg = cfg_dir.joinpath("macros/extra.cfg").resolve()
+
+        assert resolved.files == [printer_cfg, mainsail_cfg, common_cfg, extra_cfg]
+        assert resolved.graph == {
+            printer_cfg: [mainsail_cfg, common_cfg, extra_cfg],
+            mainsail_cfg: [common_cfg],
+            common_cfg: [],
+            extra_cfg: [],
+        }
+
+    def test_merged_view(self, resolver, cfg_dir):
+        resolved = resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+        merged = resolved.merged
+
+        assert resolved.has_section("gcode_macro A")
+        assert resolved.has_section("include mainsail.cfg")
+        assert merged.get("gcode_macro A", "gcode") == ["G28"]
+        assert merged.get("virtual_sdcard", "path") == "~/gcodes"
+        # options defined after the include override the included ones
+        assert merged.getint("printer", "max_velocity") == 300
+        assert merged.get("printer", "kinematics") == "cartesian"
+        assert resolved.origins("printer") == [
+            cfg_dir.joinpath("macros/common.cfg").resolve(),
+            cfg_dir.joinpath("printer.cfg").resolve(),
+        ]
+
+    def test_each_file_is_parsed_once(self, resolver, cache, cfg_dir):
+        resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+        assert cache.misses == 4
+
+        resolver.invalidate(cfg_dir.joinpath("printer.cfg"))
+        resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+        assert cache.misses == 4
+
+    def test_resolve_is_cached_until_files_change(self, resolver, cfg_dir):
+        resolved = resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+        assert resolver.resolve(cfg_dir.joinpath("printer.cfg")) is resolved
+
+        cfg_dir.joinpath("mainsail.cfg").write_text("[virtual_sdcard]\npath: /tmp\n")
+        new_resolved = resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+
+        assert new_resolved is not resolved
+        assert new_resolved.merged.get("virtual_sdcard", "path") == "/tmp"
+
+    def test_resolve_detects_new_glob_match(self, resolver, cfg_dir):
+        resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+        cfg_dir.joinpath("macros/new.cfg").write_text("[gcode_macro C]\ngcode: M84\n")
+
+        resolved = resolver.resolve(cfg_dir.joinpath("printer.cfg"))
+
+        assert resolved.has_section("gcode_macro C")
+
+    def test_missing_include(self, resolver, tmp_path):
+        cfg_file = tmp_path.joinpath("printer.cfg")
+        cfg_file.write_text("[include missing.cfg]\n[include missing_*.cfg]\n")
+
+        with pytest.raises(IncludeNotFoundError):
+            resolver.resolve(cfg_file)
+
+    def test_include_cycle(self, resolver, tmp_path):
+        tmp_path.joinpath("a.cfg").write_text("[include b.cfg]\n")
+        tmp_path.joinpath("b.cfg").write_text("[include a.cfg]\n")
+
+        with pytest.raises(IncludeCycleError):
+            resolver.resolve(tmp_path.joinpath("a.cfg"))
@@ -1,8 +1,10 @@
 import pytest
 
 from src.simple_config_parser.simple_config_parser import (
+    CommentLine,
     DuplicateOptionError,
     DuplicateSectionError,
+    OptionLine,
     SimpleConfigParser,
 )
 
@@ -41,6 +43,7 @@ class TestInternalStateChanges:
     def test_duplicate_section_error(self, parser):
         section_name = "dummy_section"
         parser._all_sections = [section_name]
+        parser._all_options = {section_name: {}}
 
         with pytest.raises(DuplicateSectionError) as excinfo:
             parser._store_internal_state_section(section_name, section_name)
@@ -82,3 +85,87 @@ class TestInternalStateChanges:
             parser._store_internal_state_option(option_name, value, value)
             message = f"Option '{option_name}' in section '{parser.section_name}' is defined more than once"
             assert message in str(excinfo.value)
+
+    def test_parse_multiline_option_block(self, parser):
+        content = [
+            "[gcode_macro TEST]\n",
+            "gcode:\n",
+            "    G28\n",
+            "    # a comment\n",
+            "    G1 X10\n",
+            "[section2]\n",
+            "option: value\n",
+        ]
+        parser._parse_config(content)
+
+        option = parser._config["gcode_macro TEST"]["body"][0]
+        assert option["is_multiline"] is True
+        assert option["value"] == ["G28", "G1 X10"]
+        assert option["_raw_value"] == content[2:5]
+        assert parser._all_options["gcode_macro TEST"]["gcode"] == ["G28", "G1 X10"]
+        assert parser._curr_ml_option is None
+        assert parser._all_options["section2"] == {"option": "value"}
+
+    def test_parse_config_builds_option_index(self, parser):
+        content = [
+            "[section1]\n",
+            "# a comment\n",
+            "option1: value1\n",
+            "gcode:\n",
+            "    G28\n",
+        ]
+        parser._parse_config(content)
+
+        body = parser._config["section1"]["body"]
+        assert parser._option_index["section1"] == {
+            "option1": body[1],
+            "gcode": body[2],
+        }
+
+    def test_parse_config_uses_compact_line_records(self, parser):
+        content = [
+            "[section1]\n",
+            "# a comment\n",
+            "\n",
+            "option1: value1\n",
+        ]
+        parser._parse_config(content)
+
+        comment, empty, option = parser._config["section1"]["body"]
+        assert isinstance(comment, CommentLine)
+        assert isinstance(empty, CommentLine)
+        assert isinstance(option, OptionLine)
+        assert not hasattr(comment, "__dict__")
+        assert not hasattr(option, "__dict__")
+        assert comment._raw is content[1]
+        assert comment == {
+            "is_multiline": False,
+            "option": "",
+            "value": "",
+            "_raw": "# a comment\n",
+        }
+
+    def test_line_record_mapping_access(self):
+        option = OptionLine("option1", "value1", "option1: value1\n")
+
+        assert option["value"] == "value1"
+        assert option.get("_raw_value") is None
+        assert "_raw_value" not in option
+        with pytest.raises(KeyError):
+            option["_raw_value"]
+        with pytest.raises(KeyError):
+            option["unknown"] = "value"
+
+        option["_raw_value"] = ["value1\n"]
+        assert "_raw_value" in option
+        assert option.to_dict() == {
+            "is_multiline": False,
+            "option": "option1",
+            "value": "value1",
+            "_raw": "option1: value1\n",
+            "_raw_value": ["value1\n"],
+        }
+
+        comment = CommentLine("# comment\n")
+        with pytest.raises(KeyError):
+            comment["option"] = "option1"
@@ -0,0 +1,24 @@
+from src.simple_config_parser.simple_config_parser import LineType
+
+# (line, in_option_block, expected line type)
+testcases = [
+    ("[example_section]\n", False, LineType.SECTION),
+    ("[gcode_macro CANCEL_PRINT] # comment\n", True, LineType.SECTION),
+    ("option: value\n", False, LineType.OPTION),
+    ("option: value\n", True, LineType.OPTION),
+    ("description: inline macro :-)\n", False, LineType.OPTION),
+    ("[not_a_section: value\n", False, LineType.OPTION),
+    ("#option: value\n", False, LineType.OPTION),
+    ("gcode:\n", False, LineType.MULTILINE_OPTION),
+    ("gcode: # inline comment\n", True, LineType.OPTION),
+    ("option :\n", False, LineType.MULTILINE_OPTION),
+    ("    G28\n", True, LineType.MULTILINE_VALUE),
+    ("    # comment in option block\n", True, LineType.MULTILINE_VALUE),
+    ("\n", True, LineType.MULTILINE_VALUE),
+    ("# a comment\n", False, LineType.COMMENT),
+    ("  ; indented comment\n", False, LineType.COMMENT),
+    ("\n", False, LineType.COMMENT),
+    ("   \n", False, LineType.COMMENT),
+    ("    G28\n", False, None),
+    ("invalid_option == value\n", False, None),
+]
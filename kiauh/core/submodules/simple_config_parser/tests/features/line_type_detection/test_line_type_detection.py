@@ -1,4 +1,5 @@
 import pytest
+from data.case_classify_line import testcases as case_classify_line
 from data.case_line_is_comment import testcases as case_line_is_comment
 from data.case_line_is_empty import testcases as case_line_is_empty
 from data.case_line_is_multiline_option import (
@@ -35,3 +36,8 @@ class TestLineTypeDetection:
     @pytest.mark.parametrize("given, expected", [*case_line_is_empty])
     def test_line_is_empty(self, parser, given, expected):
         assert parser._is_empty_line(given) is expected
+
+    @pytest.mark.parametrize("given, in_option_block, expected", [*case_classify_line])
+    def test_classify_line(self, parser, given, in_option_block, expected):
+        line_type, _ = parser._classify_line(given, in_option_block)
+        assert line_type == expected
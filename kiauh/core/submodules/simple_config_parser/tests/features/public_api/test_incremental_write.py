@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from src.simple_config_parser.simple_config_parser import SimpleConfigParser
+
+CONTENT = (
+    b"# header comment\r\n"
+    b"[server]\r\n"
+    b"host: 0.0.0.0\r\n"
+    b"port: 7125 # inline comment\r\n"
+    b"\r\n"
+    b"[authorization]\n"
+    b"trusted_clients:\n"
+    b"    10.0.0.0/8\n"
+    b"    127.0.0.0/8\n"
+    b"[update_manager]\n"
+    b"channel: dev\n"
+)
+
+
+@pytest.fixture
+def parser():
+    return SimpleConfigParser()
+
+
+@pytest.fixture
+def cfg_file(tmp_path):
+    file = tmp_path.joinpath("moonraker.conf")
+    file.write_bytes(CONTENT)
+    return file
+
+
+class TestIncrementalWrite:
+    def test_write_unchanged_skips_write(self, parser, cfg_file):
+        parser.read(cfg_file)
+        inode = cfg_file.stat().st_ino
+
+        parser.write(cfg_file, incremental=True)
+
+        assert cfg_file.stat().st_ino == inode
+        assert cfg_file.read_bytes() == CONTENT
+
+    def test_write_splices_changed_section(self, parser, cfg_file):
+        parser.read(cfg_file)
+        parser.set("update_manager", "channel", "stable")
+
+        parser.write(cfg_file, incremental=True)
+
+        # the untouched sections keep their original line endings
+        assert cfg_file.read_bytes() == CONTENT.replace(b"dev", b"stable")
+
+    def test_write_added_and_removed_sections(self, parser, cfg_file):
+        parser.read(cfg_file)
+        parser.remove_section("authorization")
+        parser.add_section("octoprint_compat")
+
+        parser.write(cfg_file, incremental=True)
+
+        expected = (
+            CONTENT[: CONTENT.index(b"[authorization]")]
+            + b"[update_manager]\nchannel: dev\n"
+            + b"\n[octoprint_compat]\n"
+        )
+        assert cfg_file.read_bytes() == expected
+
+    def test_write_matches_full_write(self, parser, cfg_file, tmp_path):
+        parser.read(cfg_file)
+        parser.set("server", "port", "7126")
+        parser.remove_option("authorization", "trusted_clients")
+
+        full = tmp_path.joinpath("full.conf")
+        parser.write(full)
+        parser.write(cfg_file, incremental=True)
+
+        assert cfg_file.read_bytes().replace(b"\r\n", b"\n") == full.read_bytes()
+
+    def test_write_file_changed_on_disk(self, parser, cfg_file):
+        parser.read(cfg_file)
+        parser.set("update_manager", "channel", "stable")
+        cfg_file.write_bytes(b"[other]\n")
+
+        parser.write(cfg_file, incremental=True)
+
+        assert cfg_file.read_bytes() == parser._construct_content().encode()
+
+    def test_write_is_atomic(self, parser, cfg_file, tmp_path):
+        os.chmod(cfg_file, 0o640)
+        link = tmp_path.joinpath("link.conf")
+        link.symlink_to(cfg_file)
+        parser.read(link)
+        parser.set("update_manager", "channel", "stable")
+
+        parser.write(link)
+
+        assert link.is_symlink()
+        assert cfg_file.stat().st_mode & 0o777 == 0o640
+        assert b"channel: stable\n" in cfg_file.read_bytes()
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "link.conf",
+            "moonraker.conf",
+        ]
+
+    def test_write_section_added_at_top(self, parser, cfg_file):
+        parser.read(cfg_file)
+        parser.add_section("include mainsail.cfg", top=True)
+
+        parser.write(cfg_file, incremental=True)
+
+        header = b"# header comment\r\n"
+        expected = header + b"\n[include mainsail.cfg]\n\n" + CONTENT[len(header) :]
+        assert cfg_file.read_bytes() == expected
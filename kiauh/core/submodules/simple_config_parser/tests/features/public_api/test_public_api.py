@@ -37,6 +37,43 @@ class TestPublicAPI:
 
         assert parser._all_sections == [section]
 
+    @pytest.mark.parametrize(
+        "position, expected",
+        [
+            ({"top": True}, ["new", "section1", "section2"]),
+            ({"before": "section2"}, ["section1", "new", "section2"]),
+            ({"after": "section1"}, ["section1", "new", "section2"]),
+            ({"after": "section2"}, ["section1", "section2", "new"]),
+        ],
+    )
+    def test_add_section_at_position(self, parser, position, expected):
+        parser._parse_config(
+            ["# header\n", "[section1]\n", "option1: value1\n", "\n", "[section2]\n"]
+        )
+        parser.add_section("new", **position)
+        parser.set("new", "option", "value")
+
+        assert parser.sections() == expected
+        assert list(parser._config) == expected
+        assert "[new]\noption: value\n" in parser._construct_content()
+
+    def test_add_section_at_top_content(self, parser):
+        parser._parse_config(["# header\n", "[section1]\n", "option1: value1\n"])
+        parser.add_section("include mainsail.cfg", top=True)
+
+        assert parser._construct_content() == (
+            "# header\n\n[include mainsail.cfg]\n\n[section1]\noption1: value1\n"
+        )
+
+    def test_add_section_at_invalid_position(self, parser):
+        parser.add_section("section1")
+
+        with pytest.raises(NoSectionError):
+            parser.add_section("new", before="section2")
+        with pytest.raises(ValueError):
+            parser.add_section("new", top=True, after="section1")
+        assert parser.sections() == ["section1"]
+
     @pytest.mark.parametrize("section", ["section1", "section2", "section three"])
     def test_remove_section(self, parser, section):
         parser.add_section(section)
@@ -194,3 +231,52 @@ class TestPublicAPI:
 
         option = parser.getboolean("section1", "option1")
         assert isinstance(option, bool) is True
+
+    def test_set_existing_option_uses_index(self, parser):
+        parser.add_section("section1")
+        for i in range(10):
+            parser.set("section1", f"option{i}", f"value{i}")
+        parser.set("section1", "option3", "new_value")
+
+        option = parser._option_index["section1"]["option3"]
+        assert option["value"] == "new_value"
+        assert option["_raw"] == "option3: new_value\n"
+        assert option in parser._config["section1"]["body"]
+
+    def test_remove_option_keeps_index_consistent(self, parser):
+        parser.add_section("section1")
+        for i in range(10):
+            parser.set("section1", f"option{i}", f"value{i}")
+        for i in range(0, 10, 3):
+            parser.remove_option("section1", f"option{i}")
+
+        remaining = [f"option{i}" for i in range(10) if i % 3 != 0]
+        assert sorted(parser._option_index["section1"]) == remaining
+        assert sorted(parser.options("section1")) == remaining
+
+        content = parser._construct_content()
+        for i in range(10):
+            assert (f"option{i}: value{i}\n" in content) is (i % 3 != 0)
+
+    def test_remove_option_compacts_section_body(self, parser):
+        parser.add_section("section1")
+        for i in range(4):
+            parser.set("section1", f"option{i}", f"value{i}")
+
+        parser.remove_option("section1", "option0")
+        assert len(parser._config["section1"]["body"]) == 4
+        assert parser._config["section1"]["body"][-1]["_removed"] is True
+
+        parser.remove_option("section1", "option1")
+        body = parser._config["section1"]["body"]
+        assert [o["option"] for o in body] == ["option3", "option2"]
+        assert parser._removed_count["section1"] == 0
+
+    def test_set_option_after_remove(self, parser):
+        parser.add_section("section1")
+        parser.set("section1", "option1", "value1")
+        parser.remove_option("section1", "option1")
+        parser.set("section1", "option1", "value2")
+
+        assert parser.get("section1", "option1") == "value2"
+        assert parser._construct_content() == "\n[section1]\noption1: value2\n"
@@ -0,0 +1,138 @@
+from io import StringIO
+
+import pytest
+
+from src.simple_config_parser.simple_config_parser import (
+    ConfigEvent,
+    NoOptionError,
+    NoSectionError,
+    SimpleConfigParser,
+)
+
+CONTENT = (
+    "# header comment\n"
+    "[server]\n"
+    "host: 0.0.0.0\n"
+    "port: 7125 # inline comment\n"
+    "\n"
+    "[authorization]\n"
+    "trusted_clients:\n"
+    "    10.0.0.0/8\n"
+    "    # a comment\n"
+    "    127.0.0.0/8\n"
+    "cors_domains:\n"
+    "    *.lan\n"
+    "[update_manager]\n"
+    "channel: dev\n"
+)
+
+
+class ExhaustibleLines:
+    """Iterable of lines that records how many lines were consumed"""
+
+    def __init__(self, content: str):
+        self.lines = content.splitlines(keepends=True)
+        self.consumed = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.consumed += 1
+            yield line
+
+
+@pytest.fixture
+def parser():
+    return SimpleConfigParser()
+
+
+@pytest.fixture
+def cfg_file(tmp_path):
+    file = tmp_path.joinpath("moonraker.conf")
+    file.write_text(CONTENT)
+    return file
+
+
+class TestStreamingAPI:
+    def test_iter_events(self, parser):
+        events = list(parser.iter_events(StringIO(CONTENT)))
+
+        assert events == [
+            ConfigEvent("server", None, None, "[server]\n"),
+            ConfigEvent("server", "host", "0.0.0.0", "host: 0.0.0.0\n"),
+            ConfigEvent("server", "port", "7125", "port: 7125 # inline comment\n"),
+            ConfigEvent("authorization", None, None, "[authorization]\n"),
+            ConfigEvent(
+                "authorization",
+                "trusted_clients",
+                ["10.0.0.0/8", "127.0.0.0/8"],
+                "trusted_clients:\n    10.0.0.0/8\n    # a comment\n    127.0.0.0/8\n",
+            ),
+            ConfigEvent(
+                "authorization", "cors_domains", ["*.lan"], "cors_domains:\n    *.lan\n"
+            ),
+            ConfigEvent("update_manager", None, None, "[update_manager]\n"),
+            ConfigEvent("update_manager", "channel", "dev", "channel: dev\n"),
+        ]
+
+    def test_iter_events_does_not_change_state(self, parser):
+        list(parser.iter_events(StringIO(CONTENT)))
+
+        assert parser.sections() == []
+        assert parser._config == {}
+
+    def test_iter_events_matches_read(self, parser, cfg_file):
+        parser.read(cfg_file)
+
+        for event in SimpleConfigParser().iter_events(StringIO(CONTENT)):
+            if event.option is None:
+                assert parser.has_section(event.section)
+            else:
+                assert parser.get(event.section, event.option) == event.value
+
+    @pytest.mark.parametrize(
+        "section, option, expected",
+        [
+            ("server", None, "[server]\n"),
+            ("server", "port", "port: 7125 # inline comment\n"),
+            ("authorization", "cors_domains", "cors_domains:\n    *.lan\n"),
+        ],
+    )
+    def test_find_event(self, parser, section, option, expected):
+        event = parser.find_event(StringIO(CONTENT), section, option)
+
+        assert event.raw == expected
+
+    def test_find_event_stops_early(self, parser):
+        lines = ExhaustibleLines(CONTENT)
+        event = parser.find_event(lines, "server", "host")
+
+        assert event.value == "0.0.0.0"
+        assert lines.consumed == 3
+
+    def test_find_event_stops_after_section(self, parser):
+        lines = ExhaustibleLines(CONTENT)
+
+        assert parser.find_event(lines, "server", "missing") is None
+        assert lines.consumed == 6
+
+    def test_find_event_of_non_existing_section(self, parser):
+        assert parser.find_event(StringIO(CONTENT), "missing") is None
+
+    def test_lookup(self, parser, cfg_file):
+        assert parser.lookup(cfg_file, "server", "port") == "7125"
+        assert parser.lookup(cfg_file, "authorization", "trusted_clients") == [
+            "10.0.0.0/8",
+            "127.0.0.0/8",
+        ]
+
+    def test_lookup_fallback(self, parser, cfg_file):
+        assert parser.lookup(cfg_file, "server", "missing", None) is None
+        assert parser.lookup(cfg_file, "missing", "port", "fallback") == "fallback"
+
+    def test_lookup_of_non_existing_section(self, parser, cfg_file):
+        with pytest.raises(NoSectionError):
+            parser.lookup(cfg_file, "missing", "port")
+
+    def test_lookup_of_non_existing_option(self, parser, cfg_file):
+        with pytest.raises(NoOptionError):
+            parser.lookup(cfg_file, "server", "missing")
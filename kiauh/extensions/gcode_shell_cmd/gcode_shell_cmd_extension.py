@@ -127,5 +127,5 @@ class GcodeShellCmdExtension(BaseExtension):
                 Logger.print_info("Section already defined! Skipping ...")
                 continue
             scp.add_section(section)
-            scp.write(cfg_file)
+            scp.write(cfg_file, incremental=True)
             Logger.print_ok("Done!")
@@ -40,11 +40,10 @@ from utils.git_utils import git_clone_wrapper, git_pull_wrapper
 from utils.input_utils import get_confirm, get_selection_input, get_string_input
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
-    cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
+    systemd_transaction,
 )
 
 
@@ -98,33 +97,36 @@ class ObicoExtension(BaseExtension):
             # ask the user for the obico server url
             self._get_server_url()
 
-            # create obico instances
-            for moonraker in mr_instances:
-                instance = MoonrakerObico(suffix=moonraker.suffix)
-                instance.create()
+            # create obico instances, systemd is reloaded once for all of them
+            obico_list: List[MoonrakerObico] = []
+            with systemd_transaction():
+                for moonraker in mr_instances:
+                    instance = MoonrakerObico(suffix=moonraker.suffix)
+                    instance.create()
 
-                cmd_sysctl_service(instance.service_file_path.name, "enable")
+                    # create obico config
+                    self._create_obico_cfg(instance, moonraker)
 
-                # create obico config
-                self._create_obico_cfg(instance, moonraker)
+                    # create obico macros
+                    self._create_obico_macros_cfg(moonraker)
 
-                # create obico macros
-                self._create_obico_macros_cfg(moonraker)
+                    # create obico update manager
+                    self._create_obico_update_manager_cfg(moonraker)
 
-                # create obico update manager
-                self._create_obico_update_manager_cfg(moonraker)
-
-                cmd_sysctl_service(instance.service_file_path.name, "start")
-
-            cmd_sysctl_manage("daemon-reload")
+                    obico_list.append(instance)
 
             # add to klippers config
             self._patch_printer_cfg(kl_instances)
-            InstanceManager.restart_all(kl_instances)
 
             # add to moonraker update manager
             self._patch_moonraker_conf(mr_instances)
+
+            # klipper and moonraker load the patched configs before obico is
+            # started, each step is a single call for all instances
+            InstanceManager.restart_all(kl_instances)
             InstanceManager.restart_all(mr_instances)
+            InstanceManager.enable_all(obico_list)
+            InstanceManager.start_all(obico_list)
 
             # check linking of / ask for linking instances
             self._check_and_opt_link_instances()
@@ -289,7 +291,7 @@ class ObicoExtension(BaseExtension):
             "path",
             obico.base.log_dir.joinpath(obico.log_file_name).as_posix(),
         )
-        scp.write(obico.cfg_file)
+        scp.write(obico.cfg_file, incremental=True)
 
     def _patch_printer_cfg(self, klipper: List[Klipper]) -> None:
         add_config_section(
@@ -342,11 +344,13 @@ class ObicoExtension(BaseExtension):
             Logger.print_info("No Obico instances found. Skipped ...")
             return
 
-        for instance in instance_list:
-            Logger.print_status(
-                f"Removing instance {instance.service_file_path.stem} ..."
-            )
-            InstanceManager.remove(instance)
+        # systemd is reloaded once after all instances were removed
+        with systemd_transaction():
+            for instance in instance_list:
+                Logger.print_status(
+                    f"Removing instance {instance.service_file_path.stem} ..."
+                )
+                InstanceManager.remove(instance)
 
     def _remove_obico_dir(self) -> None:
         Logger.print_status("Removing Obico for Klipper directory ...")
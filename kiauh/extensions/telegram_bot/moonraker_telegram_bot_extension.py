@@ -27,11 +27,10 @@ from utils.git_utils import git_clone_wrapper, git_pull_wrapper
 from utils.input_utils import get_confirm
 from utils.instance_utils import get_instances
 from utils.sys_utils import (
-    cmd_sysctl_manage,
-    cmd_sysctl_service,
     create_python_venv,
     install_python_requirements,
     parse_packages_from_file,
+    systemd_transaction,
 )
 
 
@@ -77,38 +76,40 @@ class TelegramBotExtension(BaseExtension):
             git_clone_wrapper(TG_BOT_REPO, TG_BOT_DIR)
             self._install_dependencies()
 
-            # create and start services / create bot configs
+            # create services / create bot configs, systemd is reloaded once
+            # for all of them
             show_config_dialog = False
+            tb_list: List[MoonrakerTelegramBot] = []
             tb_names = [mr_i.suffix for mr_i in mr_instances]
-            for name in tb_names:
-                instance = MoonrakerTelegramBot(suffix=name)
-                instance.create()
-
-                cmd_sysctl_service(instance.service_file_path.name, "enable")
-
-                if create_example_cfg:
-                    Logger.print_status(
-                        f"Creating Telegram Bot config in {instance.base.cfg_dir} ..."
-                    )
-                    template = TG_BOT_DIR.joinpath("scripts/base_install_template")
-                    target_file = instance.cfg_file
-                    if not target_file.exists():
-                        show_config_dialog = True
-                        run(["cp", template, target_file], check=True)
-                    else:
-                        Logger.print_info(
-                            f"Telegram Bot config in {instance.base.cfg_dir} already exists! Skipped ..."
+            with systemd_transaction():
+                for name in tb_names:
+                    instance = MoonrakerTelegramBot(suffix=name)
+                    instance.create()
+
+                    if create_example_cfg:
+                        Logger.print_status(
+                            f"Creating Telegram Bot config in {instance.base.cfg_dir} ..."
                         )
-
-                cmd_sysctl_service(instance.service_file_path.name, "start")
-
-            cmd_sysctl_manage("daemon-reload")
+                        template = TG_BOT_DIR.joinpath("scripts/base_install_template")
+                        target_file = instance.cfg_file
+                        if not target_file.exists():
+                            show_config_dialog = True
+                            run(["cp", template, target_file], check=True)
+                        else:
+                            Logger.print_info(
+                                f"Telegram Bot config in {instance.base.cfg_dir} already exists! Skipped ..."
+                            )
+
+                    tb_list.append(instance)
 
             # add to moonraker update manager
             self._patch_bot_update_manager(mr_instances)
 
-            # restart moonraker
+            # moonraker loads the patched config before the bots are started,
+            # each step is a single call for all instances
             InstanceManager.restart_all(mr_instances)
+            InstanceManager.enable_all(tb_list)
+            InstanceManager.start_all(tb_list)
 
             if show_config_dialog:
                 Logger.print_dialog(
@@ -186,11 +187,13 @@ class TelegramBotExtension(BaseExtension):
         self,
         instance_list: List[MoonrakerTelegramBot],
     ) -> None:
-        for instance in instance_list:
-            Logger.print_status(
-                f"Removing instance {instance.service_file_path.stem} ..."
-            )
-            InstanceManager.remove(instance)
+        # systemd is reloaded once after all instances were removed
+        with systemd_transaction():
+            for instance in instance_list:
+                Logger.print_status(
+                    f"Removing instance {instance.service_file_path.stem} ..."
+                )
+                InstanceManager.remove(instance)
 
     def _remove_bot_dir(self) -> None:
         if not TG_BOT_DIR.exists():
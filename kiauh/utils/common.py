@@ -23,9 +23,8 @@ from core.constants import (
 from core.logger import DialogType, Logger
 from core.types import ComponentStatus, StatusCode
 from utils.git_utils import (
-    get_local_commit,
     get_local_tags,
-    get_remote_commit,
+    get_repo_commits,
     get_repo_name,
 )
 from utils.instance_utils import get_instances
@@ -125,13 +124,14 @@ def get_install_status(
         status = 1  # incomplete
 
     org, repo = get_repo_name(repo_dir)
+    local, remote = get_repo_commits(repo_dir)
     return ComponentStatus(
         status=status,
         instances=instances,
         owner=org,
         repo=repo,
-        local=get_local_commit(repo_dir),
-        remote=get_remote_commit(repo_dir),
+        local=local,
+        remote=remote,
     )
 
 
@@ -8,82 +8,258 @@
 # ======================================================================= #
 from __future__ import annotations
 
-import tempfile
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
 from pathlib import Path
 from typing import List, Tuple
 
 from core.instance_type import InstanceType
 from core.logger import Logger
+from core.submodules.simple_config_parser.src.simple_config_parser.config_cache import (
+    ConfigCache,
+)
+from core.submodules.simple_config_parser.src.simple_config_parser.include_resolver import (
+    IncludeError,
+    IncludeResolver,
+)
 from core.submodules.simple_config_parser.src.simple_config_parser.simple_config_parser import (
     SimpleConfigParser,
 )
 
 ConfigOption = Tuple[str, str]
 
+# parsed config files shared across the process, so that repeated operations on
+# the configs of many instances do not parse unchanged files again
+CONFIG_CACHE = ConfigCache(maxsize=64)
+INCLUDE_RESOLVER = IncludeResolver(CONFIG_CACHE)
+# the maximum number of config files patched concurrently
+PATCH_MAX_WORKERS = 8
+
 
 def add_config_section(
     section: str,
     instances: List[InstanceType],
     options: List[ConfigOption] | None = None,
+    skip_if_included: bool = False,
 ) -> None:
-    for instance in instances:
-        cfg_file = instance.cfg_file
-        Logger.print_status(f"Add section '[{section}]' to '{cfg_file}' ...")
+    plan = ConfigPatchPlan().add_section(section, options, skip_if_included)
+    _apply_and_log(plan, instances, f"Add section '[{section}]' to")
 
-        if not Path(cfg_file).exists():
-            Logger.print_warn(f"'{cfg_file}' not found!")
-            continue
 
-        scp = SimpleConfigParser()
-        scp.read(cfg_file)
-        if scp.has_section(section):
-            Logger.print_info("Section already exist. Skipped ...")
-            continue
+def add_config_section_at_top(section: str, instances: List[InstanceType]) -> None:
+    plan = ConfigPatchPlan().add_section_at_top(section)
+    _apply_and_log(plan, instances, f"Add section '[{section}]' to")
+
 
-        scp.add_section(section)
+def remove_config_section(section: str, instances: List[InstanceType]) -> None:
+    plan = ConfigPatchPlan().remove_section(section)
+    _apply_and_log(plan, instances, f"Remove section '[{section}]' from")
 
-        if options is not None:
-            for option in reversed(options):
-                scp.set(section, option[0], option[1])
 
-        scp.write(cfg_file)
+class PatchAction(Enum):
+    ADD_SECTION = "add_section"
+    ADD_SECTION_AT_TOP = "add_section_at_top"
+    REMOVE_SECTION = "remove_section"
+    SET_OPTION = "set_option"
+    REMOVE_OPTION = "remove_option"
 
 
-def add_config_section_at_top(section: str, instances: List[InstanceType]) -> None:
-    # TODO: this could be implemented natively in SimpleConfigParser
-    for instance in instances:
-        tmp_cfg = tempfile.NamedTemporaryFile(mode="w", delete=False)
-        tmp_cfg_path = Path(tmp_cfg.name)
-        scp = SimpleConfigParser()
-        scp.read(tmp_cfg_path)
-        scp.add_section(section)
-        scp.write(tmp_cfg_path)
-        tmp_cfg.close()
-
-        cfg_file = instance.cfg_file
-        with open(cfg_file, "r") as org:
-            org_content = org.readlines()
-        with open(tmp_cfg_path, "a") as tmp:
-            tmp.writelines(org_content)
-
-        cfg_file.unlink()
-        tmp_cfg_path.rename(cfg_file)
+class PatchStatus(Enum):
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not found"
+    FAILED = "failed"
 
 
-def remove_config_section(section: str, instances: List[InstanceType]) -> None:
-    for instance in instances:
-        cfg_file = instance.cfg_file
-        Logger.print_status(f"Remove section '[{section}]' from '{cfg_file}' ...")
+@dataclass(frozen=True)
+class ConfigEdit:
+    action: PatchAction
+    section: str
+    options: Tuple[ConfigOption, ...] = ()
+    skip_if_included: bool = False
+
+
+@dataclass
+class PatchResult:
+    cfg_file: Path
+    status: PatchStatus
+    messages: List[str] = field(default_factory=list)
+    diff: str = ""
+    error: Exception | None = None
+
+
+@dataclass
+class ConfigPatchPlan:
+    """
+    A list of section and option edits, declared once and applied to any number
+    of config files. The files are patched concurrently, each file is read and
+    written at most once.
+    """
+
+    edits: List[ConfigEdit] = field(default_factory=list)
+
+    def add_section(
+        self,
+        section: str,
+        options: List[ConfigOption] | None = None,
+        skip_if_included: bool = False,
+    ) -> ConfigPatchPlan:
+        """
+        Add a section with the given options, skipped if already defined. With
+        skip_if_included, it is also skipped if defined in an included file.
+        """
+        opts = tuple(options or ())
+        edit = ConfigEdit(PatchAction.ADD_SECTION, section, opts, skip_if_included)
+        self.edits.append(edit)
+        return self
+
+    def add_section_at_top(self, section: str) -> ConfigPatchPlan:
+        """Add a section above all other sections, skipped if already defined"""
+        self.edits.append(ConfigEdit(PatchAction.ADD_SECTION_AT_TOP, section))
+        return self
+
+    def remove_section(self, section: str) -> ConfigPatchPlan:
+        """Remove a section, skipped if not defined"""
+        self.edits.append(ConfigEdit(PatchAction.REMOVE_SECTION, section))
+        return self
+
+    def set_option(self, section: str, option: str, value: str) -> ConfigPatchPlan:
+        """Set an option of an existing section"""
+        opts = ((option, value),)
+        self.edits.append(ConfigEdit(PatchAction.SET_OPTION, section, opts))
+        return self
+
+    def remove_option(self, section: str, option: str) -> ConfigPatchPlan:
+        """Remove an option, skipped if not defined"""
+        opts = ((option, ""),)
+        self.edits.append(ConfigEdit(PatchAction.REMOVE_OPTION, section, opts))
+        return self
+
+    def apply(
+        self,
+        cfg_files: List[Path],
+        dry_run: bool = False,
+        max_workers: int = PATCH_MAX_WORKERS,
+    ) -> List[PatchResult]:
+        """
+        Apply all edits to each of the given config files
+        :param cfg_files: The config files to patch
+        :param dry_run: Only compute a unified diff of the changes for each file,
+            without writing any file
+        :param max_workers: The maximum number of files patched concurrently
+        :return: A result for each config file, in the order of the given files
+        """
+        if not cfg_files:
+            return []
+
+        workers = max(1, min(max_workers, len(cfg_files)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda f: self._patch(f, dry_run), cfg_files))
+
+    def _patch(self, cfg_file: Path, dry_run: bool) -> PatchResult:
+        result = PatchResult(cfg_file, PatchStatus.UNCHANGED)
 
         if not Path(cfg_file).exists():
-            Logger.print_warn(f"'{cfg_file}' not found!")
-            continue
+            result.status = PatchStatus.NOT_FOUND
+            return result
+
+        try:
+            scp = CONFIG_CACHE.get(cfg_file)
+            before = scp.to_string() if dry_run else ""
+
+            for edit in self.edits:
+                if (msg := self._apply_edit(scp, cfg_file, edit)) is not None:
+                    result.messages.append(msg)
+
+            if not scp.is_modified():
+                return result
+
+            result.status = PatchStatus.CHANGED
+            if dry_run:
+                result.diff = "".join(
+                    difflib.unified_diff(
+                        before.splitlines(keepends=True),
+                        scp.to_string().splitlines(keepends=True),
+                        fromfile=str(cfg_file),
+                        tofile=str(cfg_file),
+                    )
+                )
+                # the cached parser must not keep the changes that were not written
+                CONFIG_CACHE.invalidate(cfg_file)
+            else:
+                scp.write(cfg_file, incremental=True)
+
+        except Exception as e:
+            CONFIG_CACHE.invalidate(cfg_file)
+            result.status = PatchStatus.FAILED
+            result.error = e
+
+        return result
+
+    def _apply_edit(
+        self, scp: SimpleConfigParser, cfg_file: Path, edit: ConfigEdit
+    ) -> str | None:
+        """Apply a single edit and return a message if the edit was skipped"""
+        section = edit.section
+
+        if edit.action == PatchAction.ADD_SECTION:
+            if scp.has_section(section):
+                return "Section already exist. Skipped ..."
+            if edit.skip_if_included and _is_section_included(cfg_file, section):
+                return "Section already exist in an included file. Skipped ..."
+            scp.add_section(section)
+            # options are inserted at the top of the section, so they are set in
+            # reverse order to keep the declared order in the file
+            for option, value in reversed(edit.options):
+                scp.set(section, option, value)
+
+        elif edit.action == PatchAction.ADD_SECTION_AT_TOP:
+            if scp.has_section(section):
+                return "Section already exist. Skipped ..."
+            scp.add_section(section, top=True)
+
+        elif edit.action == PatchAction.REMOVE_SECTION:
+            if not scp.has_section(section):
+                return "Section does not exist. Skipped ..."
+            scp.remove_section(section)
+
+        elif edit.action == PatchAction.SET_OPTION:
+            if not scp.has_section(section):
+                return f"Section '[{section}]' does not exist. Skipped ..."
+            for option, value in edit.options:
+                scp.set(section, option, value)
+
+        elif edit.action == PatchAction.REMOVE_OPTION:
+            option = edit.options[0][0]
+            if not scp.has_option(section, option):
+                return f"Option '{option}' does not exist. Skipped ..."
+            scp.remove_option(section, option)
+
+        return None
+
+
+def _is_section_included(cfg_file: Path, section: str) -> bool:
+    """Check if a section is defined in any of the files included by a config file"""
+    try:
+        return INCLUDE_RESOLVER.resolve(cfg_file).has_section(section)
+    except IncludeError:
+        return False
+
+
+def _apply_and_log(
+    plan: ConfigPatchPlan, instances: List[InstanceType], status_msg: str
+) -> None:
+    results = plan.apply([instance.cfg_file for instance in instances])
 
-        scp = SimpleConfigParser()
-        scp.read(cfg_file)
-        if not scp.has_section(section):
-            Logger.print_info("Section does not exist. Skipped ...")
-            continue
+    for result in results:
+        Logger.print_status(f"{status_msg} '{result.cfg_file}' ...")
+        if result.status == PatchStatus.NOT_FOUND:
+            Logger.print_warn(f"'{result.cfg_file}' not found!")
+        for msg in result.messages:
+            Logger.print_info(msg)
 
-        scp.remove_section(section)
-        scp.write(cfg_file)
+    for result in results:
+        if result.error is not None:
+            raise result.error
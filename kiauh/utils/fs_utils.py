@@ -12,13 +12,16 @@ from __future__ import annotations
 
 import re
 import shutil
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, check_output, run
-from typing import List
+from typing import Dict, List, Tuple
 from zipfile import ZipFile
 
 from core.decorators import deprecated
 from core.logger import Logger
+from utils.privileged_ops import PRIVILEGED_OPS
 
 
 def check_file_exist(file_path: Path, sudo=False) -> bool:
@@ -44,9 +47,10 @@ def check_file_exist(file_path: Path, sudo=False) -> bool:
 
 def create_symlink(source: Path, target: Path, sudo=False) -> None:
     try:
-        cmd = ["ln", "-sf", source.as_posix(), target.as_posix()]
         if sudo:
-            cmd.insert(0, "sudo")
+            PRIVILEGED_OPS.symlink(source, target)
+            return
+        cmd = ["ln", "-sf", source.as_posix(), target.as_posix()]
         run(cmd, stderr=PIPE, check=True)
     except CalledProcessError as e:
         Logger.print_error(f"Failed to create symlink: {e}")
@@ -55,8 +59,7 @@ def create_symlink(source: Path, target: Path, sudo=False) -> None:
 
 def remove_with_sudo(file: Path) -> None:
     try:
-        cmd = ["sudo", "rm", "-rf", file.as_posix()]
-        run(cmd, stderr=PIPE, check=True)
+        PRIVILEGED_OPS.remove(file)
     except CalledProcessError as e:
         Logger.print_error(f"Failed to remove {file}: {e}")
         raise
@@ -120,20 +123,66 @@ def create_folders(dirs: List[Path]) -> None:
         raise
 
 
+@dataclass(frozen=True)
+class UnitFileInfo:
+    path: Path
+    env_file: Path | None = None
+    data_dir: Path | None = None
+    exec_start: str | None = None
+
+
+# parsed unit files by path, together with the mtime and size they were parsed at
+_UNIT_FILE_CACHE: Dict[Path, Tuple[Tuple[int, int], UnitFileInfo]] = {}
+_UNIT_FILE_CACHE_LOCK = threading.Lock()
+_ENV_FILE_PATTERN = re.compile(r"^EnvironmentFile=(.+)(/systemd/.+\.env)")
+
+
+def get_unit_file_info(unit_file: Path) -> UnitFileInfo | None:
+    """
+    Helper function to read the metadata of a systemd unit file |
+    The file is only read again if its mtime or size changed since the last call.
+    :param unit_file: the path of the unit file
+    :return: the metadata of the unit file, None if the file does not exist
+    """
+    try:
+        stat = unit_file.stat()
+    except OSError:
+        return None
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _UNIT_FILE_CACHE_LOCK:
+        cached = _UNIT_FILE_CACHE.get(unit_file)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    env_file = data_dir = exec_start = None
+    with open(unit_file, "r") as f:
+        for line in f:
+            if line.startswith("EnvironmentFile="):
+                if env_file is None:
+                    env_file = Path(line[len("EnvironmentFile=") :].strip())
+                if data_dir is None and (match := _ENV_FILE_PATTERN.search(line)):
+                    data_dir = Path(match.group(1))
+            elif exec_start is None and line.startswith("ExecStart="):
+                exec_start = line[len("ExecStart=") :].strip()
+
+    info = UnitFileInfo(unit_file, env_file, data_dir, exec_start)
+    with _UNIT_FILE_CACHE_LOCK:
+        _UNIT_FILE_CACHE[unit_file] = (key, info)
+
+    return info
+
+
 def get_data_dir(instance_type: type, suffix: str) -> Path:
     from utils.sys_utils import get_service_file_path
 
     # if the service file exists, we read the data dir path from it
     # this also ensures compatibility with pre v6.0.0 instances
     service_file_path: Path = get_service_file_path(instance_type, suffix)
-    if service_file_path and service_file_path.exists():
-        with open(service_file_path, "r") as service_file:
-            lines = service_file.readlines()
-            for line in lines:
-                pattern = r"^EnvironmentFile=(.+)(/systemd/.+\.env)"
-                match = re.search(pattern, line)
-                if match:
-                    return Path(match.group(1))
+    if service_file_path:
+        info = get_unit_file_info(service_file_path)
+        if info is not None and info.data_dir is not None:
+            return info.data_dir
 
     if suffix != "":
         # this is the new data dir naming scheme introduced in v6.0.0
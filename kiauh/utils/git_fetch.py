@@ -0,0 +1,164 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from subprocess import PIPE, TimeoutExpired, run
+from typing import Dict, List
+
+from utils.git_refs import GitRefError, GitRefReader
+
+# the maximum number of repositories fetched concurrently
+FETCH_MAX_WORKERS = 4
+# seconds a single fetch may take before it is killed
+FETCH_TIMEOUT = 30.0
+# seconds after a fetch during which a repository is not fetched again
+FETCH_MIN_INTERVAL = 300.0
+
+
+@dataclass
+class FetchResult:
+    """
+    The result of fetching a repository
+
+    - repo: The repository
+    - fetched: False if the fetch was skipped, as it was fetched recently
+    - error: The reason the fetch failed, None on success
+    - duration: The seconds the fetch took
+    """
+
+    repo: Path
+    fetched: bool
+    error: str | None = None
+    duration: float = 0.0
+
+
+def get_last_fetch(repo: Path) -> float | None:
+    """
+    Helper method to get the time a repository was last fetched. Git updates
+    FETCH_HEAD on every fetch, regardless of whether it was run by KIAUH,
+    Moonraker's update manager or manually. |
+    :param repo: repository to get the time of the last fetch of
+    :return: Seconds since the epoch or None if it was never fetched
+    """
+    try:
+        fetch_head: Path = GitRefReader(repo).git_dir.joinpath("FETCH_HEAD")
+        return fetch_head.stat().st_mtime
+    except (GitRefError, OSError):
+        return None
+
+
+class GitFetchScheduler:
+    """
+    Fetch the remote-tracking branches of several repositories concurrently
+
+    Each repository only fetches the remote branch its checked out branch
+    tracks. Repositories fetched within the minimum interval are skipped, so
+    that opening a menu repeatedly does not hit the network each time. A fetch
+    never changes the kind of a clone: partial clones are fetched with the
+    given filter, shallow clones keep their shallow boundary and receive all
+    new commits, so that the new tip can still be described by its tag.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = FETCH_MAX_WORKERS,
+        timeout: float = FETCH_TIMEOUT,
+        min_interval: float = FETCH_MIN_INTERVAL,
+        filter_spec: str | None = "blob:none",
+    ) -> None:
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.filter_spec = filter_spec
+        self.repos: List[Path] = []
+
+    def add(self, *repos: Path) -> GitFetchScheduler:
+        """Add repositories, those which are no git repository are ignored"""
+        for repo in repos:
+            if repo not in self.repos and repo.joinpath(".git").exists():
+                self.repos.append(repo)
+        return self
+
+    def run(self, force: bool = False) -> Dict[Path, FetchResult]:
+        """
+        Fetch all repositories and wait until all fetches finished or timed out
+        :param force: fetch all repositories, even if fetched recently
+        :return: the result of each repository
+        """
+        if not self.repos:
+            return {}
+
+        workers = max(1, min(self.max_workers, len(self.repos)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda r: self._fetch(r, force), self.repos)
+            return {result.repo: result for result in results}
+
+    def _fetch(self, repo: Path, force: bool) -> FetchResult:
+        last_fetch = get_last_fetch(repo)
+        if (
+            not force
+            and last_fetch is not None
+            and time.time() - last_fetch < self.min_interval
+        ):
+            return FetchResult(repo, fetched=False)
+
+        try:
+            cmd = self._get_fetch_cmd(repo)
+        except GitRefError as e:
+            return FetchResult(repo, fetched=False, error=str(e))
+
+        start = time.monotonic()
+        try:
+            # never wait for credentials of a private or moved repository
+            env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+            result = run(cmd, stdout=PIPE, stderr=PIPE, env=env, timeout=self.timeout)
+        except TimeoutExpired:
+            timeout = f"no response after {self.timeout:g}s"
+            return FetchResult(repo, True, timeout, time.monotonic() - start)
+        except OSError as e:
+            return FetchResult(repo, True, str(e), time.monotonic() - start)
+
+        error: str | None = None
+        if result.returncode != 0:
+            lines = result.stderr.decode(errors="replace").strip().splitlines()
+            error = lines[-1] if lines else f"exit code {result.returncode}"
+        return FetchResult(repo, True, error, time.monotonic() - start)
+
+    def _get_fetch_cmd(self, repo: Path) -> List[str]:
+        reader = GitRefReader(repo)
+        config = reader.get_config()
+        # no depth is given for shallow clones, a depth would cut the history
+        # of the new tip down to that depth instead of keeping the boundary
+        cmd = ["git", "-C", repo.as_posix(), "fetch", "--quiet"]
+
+        branch = reader.get_branch()
+        remote = config.get(f"branch.{branch}.remote", "origin") if branch else None
+        is_partial = remote is not None and (
+            config.get(f"remote.{remote}.promisor") == "true"
+            or config.get("extensions.partialclone") == remote
+        )
+        if self.filter_spec is not None and is_partial:
+            cmd.append(f"--filter={self.filter_spec}")
+
+        if branch is None or remote is None or remote == ".":
+            # detached HEAD or local upstream, fetch the default remote
+            return cmd
+
+        merge = config.get(f"branch.{branch}.merge", f"refs/heads/{branch}")
+        upstream = reader.get_upstream_ref(branch)
+        if not merge.startswith("refs/heads/") or upstream is None:
+            return [*cmd, remote, merge]
+        # git only follows the tags pointing into the fetched history if the
+        # refspec stores the branch, so it is fetched into its tracking ref
+        return [*cmd, remote, f"+{merge}:{upstream}"]
@@ -0,0 +1,186 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import heapq
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from subprocess import DEVNULL, CalledProcessError, check_output
+from typing import Dict, Iterable, List, Set, Tuple
+
+from utils.git_refs import GitRefError, GitRefReader
+
+# the number of tagged commits considered as nearest tag, same as git describe
+DESCRIBE_MAX_CANDIDATES = 10
+
+# hash, abbreviated hash, committer date, parents and ref names of each commit
+_LOG_FORMAT = "%H%x09%h%x09%ct%x09%P%x09%D"
+
+
+@dataclass
+class CommitGraph:
+    """
+    The history of one or more commits of a repository
+
+    - parents: The parent SHAs of each commit
+    - dates: The committer date of each commit, in seconds since the epoch
+    - abbrevs: The abbreviated SHA of each commit, as printed by git
+    - tags: The names of the tags pointing to each commit, annotated tags peeled
+    """
+
+    parents: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    dates: Dict[str, int] = field(default_factory=dict)
+    abbrevs: Dict[str, str] = field(default_factory=dict)
+    tags: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, repo: Path, revs: Iterable[str]) -> CommitGraph:
+        """Read the history of the given commits with a single 'git log'"""
+        cmd = ["git", "-C", repo.as_posix(), "log", f"--format={_LOG_FORMAT}"]
+        output = check_output([*cmd, *revs, "--"], stderr=DEVNULL, text=True)
+
+        graph = cls()
+        for line in output.splitlines():
+            sha, abbrev, date, parents, refs = line.split("\t", 4)
+            graph.parents[sha] = tuple(parents.split())
+            graph.dates[sha] = int(date)
+            graph.abbrevs[sha] = abbrev
+            tags = [
+                r[len("tag: ") :] for r in refs.split(", ") if r.startswith("tag: ")
+            ]
+            if tags:
+                graph.tags[sha] = tags
+        return graph
+
+    def ancestors(self, sha: str) -> Set[str]:
+        """Return the commit and all commits reachable from it"""
+        seen: Set[str] = set()
+        stack = [sha]
+        while stack:
+            current = stack.pop()
+            if current in seen or current not in self.parents:
+                continue
+            seen.add(current)
+            stack.extend(self.parents[current])
+        return seen
+
+    def describe(self, sha: str) -> str | None:
+        """
+        Describe a commit like 'git describe --tags --always', cut to the tag
+        and the distance, e.g. "v0.12.0-42"
+        """
+        if sha not in self.parents:
+            return None
+        if sha in self.tags:
+            return self.tags[sha][0]
+
+        # like git, tagged commits are found by walking the history from
+        # newest to oldest commit date and the first candidates found are used
+        candidates: List[str] = []
+        queue = [(-self.dates[sha], sha)]
+        queued = {sha}
+        while queue and len(candidates) < DESCRIBE_MAX_CANDIDATES:
+            _, current = heapq.heappop(queue)
+            if current in self.tags:
+                candidates.append(current)
+            for parent in self.parents.get(current, ()):
+                if parent in self.parents and parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(queue, (-self.dates[parent], parent))
+
+        if not candidates:
+            return self.abbrevs[sha]
+
+        # the distance to a tag is the number of commits reachable from the
+        # described commit but not from the tag, the first one found wins ties
+        history = self.ancestors(sha)
+        distances = {c: len(history - self.ancestors(c)) for c in candidates}
+        best = min(candidates, key=lambda c: distances[c])
+        return f"{self.tags[best][0]}-{distances[best]}"
+
+
+class DescribeEngine:
+    """
+    Describe commits by their nearest tag without running 'git describe' once
+    per commit
+
+    The history of all commits requested together is read in a single walk,
+    and each result is memoized by the SHA of the commit. The memoized results
+    of a repository are dropped as soon as its tags change, so describing the
+    same commits again costs no git process at all.
+    """
+
+    def __init__(self) -> None:
+        # memoized results by repository, with the tags they were computed for
+        self._memo: Dict[Path, Tuple[Tuple[Tuple[str, str], ...], Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, repo: Path, shas: List[str]) -> Dict[str, str | None]:
+        """
+        Describe the given commits of a repository |
+        :param repo: repository the commits belong to
+        :param shas: full SHAs of the commits to describe
+        :return: the description of each commit, None if it can not be described
+        """
+        try:
+            tags = self._read_tags(repo)
+        except GitRefError:
+            return {sha: None for sha in shas}
+
+        with self._lock:
+            memo_tags, memo = self._memo.get(repo, (tags, {}))
+            if memo_tags != tags:
+                memo = {}
+            results: Dict[str, str | None] = {s: memo[s] for s in shas if s in memo}
+
+        missing = [sha for sha in dict.fromkeys(shas) if sha not in results]
+        if not missing:
+            return results
+
+        try:
+            graph = CommitGraph.load(repo, missing)
+        except (CalledProcessError, ValueError):
+            results.update({sha: None for sha in missing})
+            return results
+
+        computed = {sha: graph.describe(sha) for sha in missing}
+        results.update(computed)
+        with self._lock:
+            memo_tags, memo = self._memo.get(repo, (tags, {}))
+            if memo_tags != tags:
+                memo = {}
+            memo.update({sha: d for sha, d in computed.items() if d is not None})
+            self._memo[repo] = (tags, memo)
+        return results
+
+    def clear(self) -> None:
+        """Drop all memoized results"""
+        with self._lock:
+            self._memo.clear()
+
+    @staticmethod
+    def _read_tags(repo: Path) -> Tuple[Tuple[str, str], ...]:
+        """Return the name and target of each tag, to detect changed tags"""
+        reader = GitRefReader(repo)
+        tags = {
+            ref: sha
+            for ref, sha in reader.get_packed_refs().items()
+            if ref.startswith("refs/tags/")
+        }
+        tags_dir = reader.common_dir.joinpath("refs", "tags")
+        if tags_dir.is_dir():
+            for path in tags_dir.rglob("*"):
+                if path.is_file():
+                    ref = path.relative_to(reader.common_dir).as_posix()
+                    tags[ref] = reader.resolve(ref) or ""
+        return tuple(sorted(tags.items()))
+
+
+DESCRIBE_ENGINE = DescribeEngine()
@@ -0,0 +1,241 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+# symbolic refs pointing to symbolic refs are followed up to this depth
+_MAX_SYMREF_DEPTH = 5
+_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+_SECTION_PATTERN = re.compile(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+
+class GitRefError(Exception):
+    """Raised when the git directory or a ref of a repository can not be read"""
+
+
+# parsed files by path, with the (mtime_ns, size) of the parsed file
+_PACKED_REFS_CACHE: Dict[Path, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_CONFIG_CACHE: Dict[Path, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+class GitRefReader:
+    """
+    Read the HEAD, refs and config of a local repository without running git
+
+    Only the plain files of the git directory are read: HEAD, the loose refs
+    below refs/, packed-refs and config. Parsed packed-refs and config files
+    are cached until they change, so that reading the refs of a repository
+    repeatedly only costs a few stat calls.
+    """
+
+    def __init__(self, repo: Path) -> None:
+        self.repo = repo
+        self.git_dir = self._find_git_dir(repo)
+        # linked worktrees share the refs and config of the main repository
+        self.common_dir = self.git_dir
+        commondir = self.git_dir.joinpath("commondir")
+        if commondir.is_file():
+            path = Path(commondir.read_text().strip())
+            if not path.is_absolute():
+                path = self.git_dir.joinpath(path)
+            self.common_dir = path.resolve()
+
+    def get_branch(self) -> str | None:
+        """Return the name of the checked out branch, None if HEAD is detached"""
+        head = self._read_ref_file(self.git_dir.joinpath("HEAD"))
+        if head is None:
+            raise GitRefError(f"Unable to read HEAD of {self.repo}")
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/") :]
+        return None
+
+    def resolve(self, ref: str) -> str | None:
+        """
+        Resolve a full ref name, like 'HEAD' or 'refs/remotes/origin/master',
+        to the SHA of the commit it points to |
+        :param ref: the full ref name
+        :return: the SHA or None if the ref does not exist
+        """
+        for _ in range(_MAX_SYMREF_DEPTH):
+            value = self._read_loose_ref(ref)
+            if value is None:
+                value = self.get_packed_refs().get(ref)
+            if value is None:
+                return None
+            if not value.startswith("ref: "):
+                return value if _SHA_PATTERN.match(value) else None
+            ref = value[len("ref: ") :].strip()
+        return None
+
+    def get_upstream_ref(self, branch: str | None = None) -> str | None:
+        """
+        Return the full name of the remote-tracking ref the given branch, or the
+        checked out branch, is set to track. A branch without configured
+        upstream is assumed to track the branch of the same name on origin. |
+        :param branch: the branch name, None for the checked out branch
+        :return: the ref name or None if HEAD is detached
+        """
+        branch = branch if branch is not None else self.get_branch()
+        if branch is None:
+            return None
+
+        config = self.get_config()
+        remote = config.get(f"branch.{branch}.remote", "origin")
+        merge = config.get(f"branch.{branch}.merge", f"refs/heads/{branch}")
+        if remote == ".":
+            # the branch tracks another local branch
+            return merge
+        if merge.startswith("refs/heads/"):
+            merge = merge[len("refs/heads/") :]
+        return f"refs/remotes/{remote}/{merge}"
+
+    def get_remote_url(self, remote: str = "origin") -> str | None:
+        """Return the URL of the given remote, None if it is not configured"""
+        return self.get_config().get(f"remote.{remote}.url")
+
+    def get_config(self) -> Dict[str, str]:
+        """
+        Return the values of the repository config, by key in the form
+        '<section>.<subsection>.<name>' as printed by 'git config --list'.
+        Sections and names are lower case, subsections keep their case.
+        """
+        return _read_cached(
+            self.common_dir.joinpath("config"), _CONFIG_CACHE, _parse_config
+        )
+
+    def _read_loose_ref(self, ref: str) -> str | None:
+        # HEAD and other pseudo refs are specific to a worktree
+        base = self.git_dir if "/" not in ref else self.common_dir
+        return self._read_ref_file(base.joinpath(ref))
+
+    def get_packed_refs(self) -> Dict[str, str]:
+        """Return the SHA of each ref in packed-refs, by full ref name"""
+        return _read_cached(
+            self.common_dir.joinpath("packed-refs"),
+            _PACKED_REFS_CACHE,
+            _parse_packed_refs,
+        )
+
+    @staticmethod
+    def _read_ref_file(path: Path) -> str | None:
+        try:
+            return path.read_text().strip()
+        except (OSError, UnicodeDecodeError):
+            # a ref that does not exist, or a directory of refs
+            return None
+
+    @staticmethod
+    def _find_git_dir(repo: Path) -> Path:
+        git_dir = repo.joinpath(".git")
+        if git_dir.is_dir():
+            return git_dir
+        if git_dir.is_file():
+            # submodules and linked worktrees point to their git directory
+            content = git_dir.read_text().strip()
+            if content.startswith("gitdir:"):
+                path = Path(content[len("gitdir:") :].strip())
+                if not path.is_absolute():
+                    path = repo.joinpath(path)
+                return path.resolve()
+        raise GitRefError(f"{repo} is not a git repository")
+
+
+def _read_cached(
+    path: Path,
+    cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, str]]],
+    parse: Callable[[str], Dict[str, str]],
+) -> Dict[str, str]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return {}
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _CACHE_LOCK:
+        cached = cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    try:
+        parsed = parse(path.read_text())
+    except (OSError, UnicodeDecodeError) as e:
+        raise GitRefError(f"Unable to read {path}: {e}")
+
+    with _CACHE_LOCK:
+        cache[path] = (key, parsed)
+    return parsed
+
+
+def _parse_packed_refs(content: str) -> Dict[str, str]:
+    refs: Dict[str, str] = {}
+    for line in content.splitlines():
+        # skip the header and the peeled commits of annotated tags
+        if not line or line.startswith(("#", "^")):
+            continue
+        sha, _, ref = line.partition(" ")
+        if ref:
+            refs[ref.strip()] = sha
+    return refs
+
+
+def _parse_config(content: str) -> Dict[str, str]:
+    values: Dict[str, str] = {}
+    section = ""
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+
+        if line.startswith("["):
+            match = _SECTION_PATTERN.match(line)
+            if match is None:
+                section = ""
+                continue
+            name, subsection = match.group(1).lower(), match.group(2)
+            if subsection is not None:
+                subsection = re.sub(r"\\(.)", r"\1", subsection)
+                section = f"{name}.{subsection}"
+            else:
+                section = name
+            # a value may follow the section header on the same line
+            line = line[match.end() :].strip()
+            if not line or line.startswith(("#", ";")):
+                continue
+
+        if not section:
+            continue
+        key, sep, value = line.partition("=")
+        key = key.strip().lower()
+        # a key without value is a boolean set to true
+        values[f"{section}.{key}"] = _parse_config_value(value) if sep else "true"
+    return values
+
+
+def _parse_config_value(value: str) -> str:
+    chars = []
+    quoted = False
+    escaped = False
+    for char in value.strip():
+        if escaped:
+            chars.append({"n": "\n", "t": "\t", "b": "\b"}.get(char, char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            chars.append(char)
+    return "".join(chars).strip()
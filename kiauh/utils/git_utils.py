@@ -7,11 +7,13 @@ from http.client import HTTPResponse
 from json import JSONDecodeError
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, check_output, run
-from typing import List, Type
+from typing import List, Tuple, Type
 
 from core.instance_manager.instance_manager import InstanceManager
 from core.instance_type import InstanceType
 from core.logger import Logger
+from utils.git_history import DESCRIBE_ENGINE
+from utils.git_refs import GitRefError, GitRefReader
 from utils.input_utils import get_confirm, get_number_input
 from utils.instance_utils import get_instances
 
@@ -80,15 +82,34 @@ def get_repo_name(repo: Path) -> tuple[str, str] | None:
         return "-", "-"
 
     try:
-        cmd = ["git", "-C", repo.as_posix(), "config", "--get", "remote.origin.url"]
-        result: str = check_output(cmd, stderr=DEVNULL).decode(encoding="utf-8")
-        substrings: List[str] = result.strip().split("/")[-2:]
-        return substrings[0], substrings[1]
-
-        # return "/".join(substrings).replace(".git", "")
-    except CalledProcessError:
+        url = GitRefReader(repo).get_remote_url()
+    except GitRefError:
+        return None
+    if url is None:
         return None
 
+    substrings: List[str] = url.strip().split("/")[-2:]
+    return substrings[0], substrings[1]
+
+
+def get_repo_ref_paths(repo: Path) -> List[Path]:
+    """
+    Helper method to get the files and directories of a repository that change
+    whenever its HEAD or one of its refs changes, e.g. on checkout, commit,
+    pull or fetch |
+    :param repo: repository to get the paths of
+    :return: List of paths, which do not need to exist
+    """
+    git_dir = repo.joinpath(".git")
+    return [
+        git_dir.joinpath("HEAD"),
+        git_dir.joinpath("packed-refs"),
+        git_dir.joinpath("FETCH_HEAD"),
+        git_dir.joinpath("refs", "heads"),
+        git_dir.joinpath("refs", "tags"),
+        git_dir.joinpath("refs", "remotes", "origin"),
+    ]
+
 
 def get_local_tags(repo_path: Path, _filter: str | None = None) -> List[str]:
     """
@@ -202,27 +223,58 @@ def compare_semver_tags(tag1: str, tag2: str) -> bool:
 
 
 def get_local_commit(repo: Path) -> str | None:
-    if not repo.exists() or not repo.joinpath(".git").exists():
-        return None
-
-    try:
-        cmd = f"cd {repo} && git describe HEAD --always --tags | cut -d '-' -f 1,2"
-        return check_output(cmd, shell=True, text=True).strip()
-    except CalledProcessError:
-        return None
+    return get_repo_commits(repo)[0]
 
 
 def get_remote_commit(repo: Path) -> str | None:
+    return get_repo_commits(repo)[1]
+
+
+def get_repo_commits(repo: Path) -> Tuple[str | None, str | None]:
+    """
+    Helper method to describe the checked out commit of a repository and the
+    commit of the remote branch it tracks, both from a single history walk |
+    :param repo: repository to describe the commits of
+    :return: Tuple of the local and the remote description, None if unknown
+    """
     if not repo.exists() or not repo.joinpath(".git").exists():
-        return None
+        return None, None
 
     try:
-        # get locally checked out branch
-        branch_cmd = f"cd {repo} && git branch | grep -E '\*'"
-        branch = check_output(branch_cmd, shell=True, text=True)
-        branch = branch.split("*")[-1].strip()
-        cmd = f"cd {repo} && git describe 'origin/{branch}' --always --tags | cut -d '-' -f 1,2"
-        return check_output(cmd, shell=True, text=True).strip()
+        # the remote-tracking ref of the locally checked out branch
+        reader = GitRefReader(repo)
+        local = reader.resolve("HEAD")
+        upstream = reader.get_upstream_ref()
+        remote = reader.resolve(upstream) if upstream is not None else None
+    except GitRefError:
+        return git_describe(repo, "HEAD"), None
+
+    shas = [sha for sha in (local, remote) if sha is not None]
+    described = DESCRIBE_ENGINE.describe(repo, shas)
+
+    # fall back to git describe if the engine could not walk the history
+    local_desc = described.get(local) if local is not None else None
+    if local_desc is None:
+        local_desc = git_describe(repo, local or "HEAD")
+    remote_desc = described.get(remote) if remote is not None else None
+    if remote_desc is None and remote is not None:
+        remote_desc = git_describe(repo, remote)
+    return local_desc, remote_desc
+
+
+def git_describe(repo: Path, rev: str) -> str | None:
+    """
+    Helper method to describe a commit by its nearest tag and the number of
+    commits since that tag, e.g. "v0.12.0-42", or by its abbreviated SHA if no
+    tag is reachable |
+    :param repo: repository the commit belongs to
+    :param rev: SHA or name of the commit to describe
+    :return: String in form of "<tag>-<distance>", "<tag>", "<sha>" or None
+    """
+    try:
+        cmd = ["git", "-C", repo.as_posix(), "describe", rev, "--always", "--tags"]
+        result = check_output(cmd, stderr=DEVNULL, text=True).strip()
+        return "-".join(result.split("-")[:2])
     except CalledProcessError:
         return None
 
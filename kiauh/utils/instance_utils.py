@@ -9,12 +9,168 @@
 from __future__ import annotations
 
 import re
+import threading
+import time
 from pathlib import Path
-from typing import List
+from subprocess import CalledProcessError
+from typing import Dict, List, Set
 
 from core.constants import SYSTEMD
 from core.instance_manager.base_instance import SUFFIX_BLACKLIST
 from core.instance_type import InstanceType
+from utils.sys_utils import UnitState
+
+# seconds the unit states of the status table are reused before querying again
+UNIT_STATUS_TTL = 2.0
+
+
+class ServiceRegistry:
+    """
+    An index of the systemd service files of all component instances
+
+    The systemd directory is scanned once and the service files are indexed by
+    component name and instance suffix on first use. The index is rebuilt only
+    when the mtime of the directory changes, which happens whenever a service
+    file is created, removed or renamed.
+    """
+
+    def __init__(self, directory: Path = SYSTEMD) -> None:
+        self.directory = directory
+        self._mtime_ns: int | None = None
+        self._service_names: List[str] = []
+        self._index: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def get_suffixes(self, name: str) -> List[str]:
+        """
+        Return the sorted instance suffixes of all service files of a component
+        :param name: The kebab-case name of the component, e.g. "moonraker"
+        :return: The suffixes, an empty string for an instance without suffix
+        """
+        with self._lock:
+            self._refresh()
+            suffixes = self._index.get(name)
+            if suffixes is None:
+                suffixes = self._index[name] = self._find_suffixes(name)
+            return list(suffixes)
+
+    def get_service_names(self) -> List[str]:
+        """Return the names of all service files of component instances"""
+        with self._lock:
+            self._refresh()
+            return list(self._service_names)
+
+    def invalidate(self) -> None:
+        """Force a rescan of the systemd directory on the next lookup"""
+        with self._lock:
+            self._mtime_ns = None
+
+    def _refresh(self) -> None:
+        mtime_ns = self.directory.stat().st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return
+
+        self._service_names = [
+            service.name
+            for service in self.directory.iterdir()
+            if service.name.endswith(".service")
+            and not any(s in service.name for s in SUFFIX_BLACKLIST)
+        ]
+        self._index.clear()
+        self._mtime_ns = mtime_ns
+
+    def _find_suffixes(self, name: str) -> List[str]:
+        pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.service$")
+        suffixes = [
+            get_instance_suffix(name, Path(service))
+            for service in self._service_names
+            if pattern.search(service)
+        ]
+
+        def _sort_suffix(suffix: str):
+            return f"{int(suffix):04}" if suffix.isdigit() else suffix
+
+        return sorted(suffixes, key=_sort_suffix)
+
+
+SERVICE_REGISTRY = ServiceRegistry()
+
+
+class UnitStatusTable:
+    """
+    The live state of the systemd units of all component instances
+
+    The states of all units known to the service registry are fetched together,
+    with a single query of the systemd backend, and reused for a short time. This
+    allows menus to show the state of every listed instance without querying
+    systemd once per instance. The table is refreshed on the first lookup after
+    the TTL expired, the set of service files changed or invalidate was called.
+    """
+
+    def __init__(
+        self, registry: ServiceRegistry = SERVICE_REGISTRY, ttl: float = UNIT_STATUS_TTL
+    ) -> None:
+        self.registry = registry
+        self.ttl = ttl
+        # the result of the last query, None if it failed
+        self._states: Dict[str, UnitState] | None = None
+        self._queried: Set[str] = set()
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+
+    def get_states(self) -> Dict[str, UnitState]:
+        """
+        Return the state of all units of component instances, by unit name.
+        If the state cannot be queried, an empty table is returned.
+        """
+        states = self._get_states()
+        return states if states is not None else {}
+
+    def get_state(self, instance: InstanceType) -> UnitState | None:
+        """Return the state of the unit of the given instance, if known"""
+        return self.get_states().get(instance.service_file_path.name)
+
+    def count_active(self, instances: List[InstanceType]) -> int | None:
+        """
+        Return how many of the given instances have an active unit, or None if
+        the state of any of their units is unknown
+        """
+        states = self._get_states()
+        names = [instance.service_file_path.name for instance in instances]
+        if states is None or any(name not in states for name in names):
+            return None
+        return sum(1 for name in names if states[name].active_state == "active")
+
+    def _get_states(self) -> Dict[str, UnitState] | None:
+        from core.instance_manager.systemd_backend import (
+            SystemdBusError,
+            get_systemd_backend,
+        )
+
+        names = self.registry.get_service_names()
+        with self._lock:
+            now = time.monotonic()
+            # a failed or partial query is not repeated before the TTL expired
+            if (
+                self._fetched_at is None
+                or now - self._fetched_at > self.ttl
+                or set(names) != self._queried
+            ):
+                try:
+                    self._states = get_systemd_backend().get_unit_states(names)
+                except (CalledProcessError, OSError, SystemdBusError):
+                    self._states = None
+                self._queried = set(names)
+                self._fetched_at = now
+            return dict(self._states) if self._states is not None else None
+
+    def invalidate(self) -> None:
+        """Force a new query of the unit states on the next lookup"""
+        with self._lock:
+            self._fetched_at = None
+
+
+UNIT_STATUS = UnitStatusTable()
 
 
 def get_instances(instance_type: type) -> List[InstanceType]:
@@ -24,28 +180,8 @@ def get_instances(instance_type: type) -> List[InstanceType]:
         raise ValueError("instance_type must be a class")
 
     name = convert_camelcase_to_kebabcase(instance_type.__name__)
-    pattern = re.compile(f"^{name}(-[0-9a-zA-Z]+)?.service$")
-
-    service_list = [
-        Path(SYSTEMD, service)
-        for service in SYSTEMD.iterdir()
-        if pattern.search(service.name)
-        and not any(s in service.name for s in SUFFIX_BLACKLIST)
-    ]
-
-    instance_list = [
-        instance_type(get_instance_suffix(name, service)) for service in service_list
-    ]
-
-    def _sort_instance_list(suffix: int | str | None):
-        if suffix is None:
-            return
-        elif isinstance(suffix, str) and suffix.isdigit():
-            return f"{int(suffix):04}"
-        else:
-            return suffix
 
-    return sorted(instance_list, key=lambda x: _sort_instance_list(x.suffix))
+    return [instance_type(suffix) for suffix in SERVICE_REGISTRY.get_suffixes(name)]
 
 
 def get_instance_suffix(name: str, file_path: Path) -> str:
@@ -0,0 +1,96 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+
+# This script runs as root in a separate process, started through sudo by
+# utils.privileged_ops. It must only depend on the standard library.
+#
+# Each line read from stdin is a JSON object describing one file operation:
+#   {"id": 1, "op": "write", "path": "...", "content": "...", "mode": 420}
+#   {"id": 2, "op": "copy", "src": "...", "dst": "..."}
+#   {"id": 3, "op": "symlink", "src": "...", "dst": "..."}
+#   {"id": 4, "op": "remove", "path": "..."}
+# For each operation, one JSON line with its result is written to stdout:
+#   {"id": 1, "ok": true} or {"id": 1, "ok": false, "error": "..."}
+# The script exits when stdin is closed.
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict
+
+
+def write(path: str, content: str, mode: int = 0o644) -> None:
+    # the content is written to a temporary file that replaces the target
+    # file, so a unit file is never seen half written
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".kiauh-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def copy(src: str, dst: str) -> None:
+    shutil.copy(src, dst)
+
+
+def symlink(src: str, dst: str) -> None:
+    # same semantics as 'ln -sf'
+    if os.path.isdir(dst) and not os.path.islink(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    os.symlink(src, dst)
+
+
+def remove(path: str) -> None:
+    # same semantics as 'rm -rf'
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.unlink(path)
+
+
+OPERATIONS = {
+    "write": lambda op: write(op["path"], op["content"], op.get("mode", 0o644)),
+    "copy": lambda op: copy(op["src"], op["dst"]),
+    "symlink": lambda op: symlink(op["src"], op["dst"]),
+    "remove": lambda op: remove(op["path"]),
+}
+
+
+def main() -> None:
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        result: Dict[str, Any] = {"id": None, "ok": True}
+        try:
+            op = json.loads(line)
+            result["id"] = op.get("id")
+            handler = OPERATIONS.get(op.get("op"))
+            if handler is None:
+                raise ValueError(f"Unknown operation {op.get('op')!r}")
+            handler(op)
+        except KeyError as e:
+            result.update(ok=False, error=f"Invalid operation, missing {e}")
+        except (OSError, ValueError) as e:
+            result.update(ok=False, error=str(e))
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import atexit
+import json
+import sys
+import threading
+from pathlib import Path
+from subprocess import PIPE, CalledProcessError, Popen
+from typing import Any, Dict, List
+
+HELPER_SCRIPT = Path(__file__).parent.joinpath("privileged_helper.py")
+
+
+class PrivilegedOpError(CalledProcessError):
+    """Raised when a file operation of the privileged helper failed"""
+
+    def __init__(self, op: str, args: List[str], error: str) -> None:
+        super().__init__(1, [op, *args], stderr=error.encode())
+        self.error = error
+
+    def __str__(self) -> str:
+        return f"Failed to {self.cmd[0]} {' '.join(self.cmd[1:])}: {self.error}"
+
+
+class PrivilegedFileOps:
+    """
+    File operations executed with root privileges by one long-lived helper
+
+    The helper is started through sudo on the first operation and kept running
+    until the process exits. Operations are sent to it as newline-delimited
+    JSON and each result is streamed back, so that sudo is only started once
+    instead of once per file.
+    """
+
+    def __init__(self, command: List[str] | None = None) -> None:
+        self.command = command or ["sudo", sys.executable, HELPER_SCRIPT.as_posix()]
+        self._process: Popen | None = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def write_file(self, path: Path, content: str, mode: int = 0o644) -> None:
+        """Create or replace a file with the given content"""
+        self._execute("write", path=path.as_posix(), content=content, mode=mode)
+
+    def copy(self, src: Path, dst: Path) -> None:
+        """Copy a file, like 'cp'"""
+        self._execute("copy", src=Path(src).as_posix(), dst=Path(dst).as_posix())
+
+    def symlink(self, src: Path, dst: Path) -> None:
+        """Create or replace a symlink, like 'ln -sf'"""
+        self._execute("symlink", src=Path(src).as_posix(), dst=Path(dst).as_posix())
+
+    def remove(self, path: Path) -> None:
+        """Remove a file or directory, like 'rm -rf'"""
+        self._execute("remove", path=Path(path).as_posix())
+
+    def close(self) -> None:
+        """Stop the helper, it is started again by the next operation"""
+        with self._lock:
+            if self._process is None:
+                return
+            process, self._process = self._process, None
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait()
+            if process.stdout is not None:
+                process.stdout.close()
+
+    def _execute(self, op: str, **kwargs: Any) -> None:
+        args = [str(v) for k, v in kwargs.items() if k in ("src", "dst", "path")]
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, "op": op, **kwargs}
+            try:
+                result = self._send(request)
+            except (OSError, ValueError) as e:
+                # the helper died, could not be started or is out of sync,
+                # it is restarted on the next operation
+                if self._process is not None:
+                    self._process.kill()
+                    self._process.wait()
+                self._process = None
+                raise PrivilegedOpError(op, args, f"privileged helper failed: {e}")
+
+        if not result.get("ok"):
+            raise PrivilegedOpError(op, args, result.get("error", "unknown error"))
+
+    def _send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self._process is None or self._process.poll() is not None:
+            self._process = Popen(
+                self.command, stdin=PIPE, stdout=PIPE, text=True, bufsize=1
+            )
+
+        stdin, stdout = self._process.stdin, self._process.stdout
+        if stdin is None or stdout is None:
+            raise OSError("no pipes to the helper")
+
+        stdin.write(json.dumps(request) + "\n")
+        stdin.flush()
+        line = stdout.readline()
+        if not line:
+            raise OSError(f"exited with code {self._process.wait()}")
+
+        result: Dict[str, Any] = json.loads(line)
+        if result.get("id") != request["id"]:
+            raise ValueError(f"unexpected result for operation {result.get('id')}")
+        return result
+
+
+PRIVILEGED_OPS = PrivilegedFileOps()
+atexit.register(PRIVILEGED_OPS.close)
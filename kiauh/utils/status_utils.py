@@ -0,0 +1,400 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.constants import KIAUH_DATA_DIR
+from core.types import ComponentStatus
+
+# the maximum number of status probes run concurrently
+STATUS_MAX_WORKERS = 6
+# seconds a single status probe may run before its result is given up
+STATUS_PROBE_TIMEOUT = 15.0
+# seconds between two checks of the running probes for a timeout
+_POLL_INTERVAL = 0.1
+
+# the file the status snapshots are persisted in between sessions
+STATUS_SNAPSHOT_FILE = KIAUH_DATA_DIR.joinpath("status-snapshot.json")
+# seconds a status snapshot is used if none of its watched paths changed
+SNAPSHOT_TTL = 300.0
+# seconds between two runs of the background refresher
+SNAPSHOT_REFRESH_INTERVAL = 10.0
+
+
+class StatusProbeTimeout(TimeoutError):
+    """Raised in place of the result of a status probe that did not finish in time"""
+
+
+@dataclass
+class _ProbeRun:
+    started: float | None = None
+
+
+# the runs of all probes not finished yet, by probe name and function, shared
+# by all collectors, so that a probe is never run twice at the same time
+_running: Dict[Tuple[str, str], Tuple[Future, _ProbeRun]] = {}
+# reentrant, a probe done already calls _forget_run in the submitting thread
+_running_lock = threading.RLock()
+
+
+class StatusCollector:
+    """
+    Run the status probes of a menu, like get_klipper_status, concurrently
+
+    Each probe runs on a bounded worker pool and its result is passed to a
+    callback in the calling thread as soon as it is available, so that the menu
+    can be filled in while the remaining probes still run. A probe running
+    longer than the timeout is given up, its thread is left to finish in the
+    background and its result is discarded. Exclusive probes, like the ones
+    holding the apt lock, are never given up but waited for. A probe whose
+    previous run is still in progress is not started again, the collector
+    waits for the result of that run instead.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = STATUS_MAX_WORKERS,
+        timeout: float = STATUS_PROBE_TIMEOUT,
+    ) -> None:
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.probes: List[Tuple[str, Callable, Tuple[Any, ...]]] = []
+        self._timeouts: Dict[str, float | None] = {}
+
+    def add(
+        self,
+        name: str,
+        probe: Callable,
+        *args: Any,
+        timeout: float | None = None,
+        exclusive: bool = False,
+    ) -> StatusCollector:
+        """
+        Add a probe, which is called with the given arguments. A timeout given
+        for the probe replaces the timeout of the collector, an exclusive probe
+        has no timeout.
+        """
+        self.probes.append((name, probe, args))
+        if exclusive:
+            self._timeouts[name] = None
+        else:
+            self._timeouts[name] = timeout if timeout is not None else self.timeout
+        return self
+
+    def collect(self, on_result: Callable[[str, Any], None]) -> Dict[str, Exception]:
+        """
+        Run all probes and pass the result of each one to the callback
+        :param on_result: called with the name and result of each finished probe
+        :return: the probes that failed or timed out, mapped to their error
+        """
+        errors: Dict[str, Exception] = {}
+        if not self.probes:
+            return errors
+
+        workers = max(1, min(self.max_workers, len(self.probes)))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        runs: Dict[Future, _ProbeRun] = {}
+        futures: Dict[Future, str] = {}
+        submitted: List[Future] = []
+        with _running_lock:
+            for name, probe, args in self.probes:
+                key = (name, getattr(probe, "__qualname__", repr(probe)))
+                entry = _running.get(key)
+                if entry is None or entry[0].done():
+                    run = _ProbeRun()
+                    future = executor.submit(self._run, run, probe, args)
+                    _running[key] = (future, run)
+                    future.add_done_callback(partial(_forget_run, key))
+                    submitted.append(future)
+                else:
+                    future, run = entry
+                runs[future] = run
+                futures[future] = name
+
+        pending = set(futures)
+        timed_out: List[Future] = []
+        try:
+            while pending:
+                done, pending = wait(
+                    pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    name = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors[name] = e
+                        continue
+                    on_result(name, result)
+
+                now = time.monotonic()
+                for future in list(pending):
+                    name = futures[future]
+                    started = runs[future].started
+                    timeout = self._timeouts[name]
+                    if timeout is None or started is None:
+                        continue
+                    if now - started > timeout:
+                        pending.discard(future)
+                        timed_out.append(future)
+                        errors[name] = StatusProbeTimeout(
+                            f"no result after {timeout:g}s"
+                        )
+
+                # probes still queued will never start if every worker is
+                # blocked by a probe that was given up
+                blocked = [f for f in timed_out if f in submitted and not f.done()]
+                if len(blocked) >= workers:
+                    for future in pending:
+                        errors[futures[future]] = StatusProbeTimeout(
+                            "no worker available"
+                        )
+                    break
+        finally:
+            for future in pending:
+                if future in submitted:
+                    future.cancel()
+            executor.shutdown(wait=False)
+
+        return errors
+
+    def _run(self, run: _ProbeRun, probe: Callable, args: Tuple[Any, ...]) -> Any:
+        run.started = time.monotonic()
+        return probe(*args)
+
+
+def _forget_run(key: Tuple[str, str], future: Future) -> None:
+    with _running_lock:
+        if key in _running and _running[key][0] is future:
+            del _running[key]
+
+
+@dataclass
+class _SnapshotProbe:
+    probe: Callable
+    args: Tuple[Any, ...]
+    ttl: float
+    watch: List[Path]
+
+
+@dataclass
+class StatusSnapshot:
+    """
+    The result of a status probe
+
+    - value: The result, either a ComponentStatus or a JSON serializable value
+    - fetched_at: The time the probe finished, in seconds since the epoch
+    - fingerprint: The mtime of each watched path when the probe was started
+    """
+
+    value: Any
+    fetched_at: float
+    fingerprint: List[int] = field(default_factory=list)
+
+
+class StatusSnapshotStore:
+    """
+    The last results of the status probes of a menu
+
+    Each probe is registered with a TTL and the paths its result depends on,
+    like the HEAD and refs of a repository. A snapshot is used until its TTL
+    expired or the mtime of one of its paths changed, only then the probe runs
+    again. Snapshots are kept in memory and persisted to a file, so that a new
+    session can use the snapshots of the previous one. A background refresher
+    can keep the snapshots current while the menu waits for input.
+    """
+
+    def __init__(self, file: Path | None = STATUS_SNAPSHOT_FILE) -> None:
+        self.file = file
+        self.probes: Dict[str, _SnapshotProbe] = {}
+        self._snapshots: Dict[str, StatusSnapshot] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresher: threading.Thread | None = None
+        self._refresher_errors: Dict[str, Exception] = {}
+        self._stop = threading.Event()
+        self._load()
+
+    def register(
+        self,
+        name: str,
+        probe: Callable,
+        *args: Any,
+        ttl: float = SNAPSHOT_TTL,
+        watch: List[Path] | None = None,
+    ) -> StatusSnapshotStore:
+        """Register a probe, which is called with the given arguments"""
+        self.probes[name] = _SnapshotProbe(probe, args, ttl, list(watch or []))
+        return self
+
+    def get(self, name: str) -> Any:
+        """Return the value of the last snapshot of a probe, even if outdated"""
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+        return snapshot.value if snapshot is not None else None
+
+    def values(self) -> Dict[str, Any]:
+        """Return the value of the last snapshot of each probe, by probe name"""
+        with self._lock:
+            return {name: s.value for name, s in self._snapshots.items()}
+
+    def is_fresh(self, name: str) -> bool:
+        """Return True if the snapshot of a probe can be used without refresh"""
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+        return snapshot is not None and self._is_fresh(name, snapshot)
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Force a refresh of the given or all probes on the next refresh"""
+        with self._lock:
+            if name is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(name, None)
+
+    def refresh(self, force: bool = False) -> Dict[str, Exception]:
+        """
+        Run the probes of all outdated snapshots concurrently and persist the
+        new snapshots
+        :param force: run all probes, regardless of their snapshots
+        :return: the probes that failed or timed out, mapped to their error
+        """
+        with self._refresh_lock:
+            stale = [name for name in self.probes if force or not self.is_fresh(name)]
+            if not stale:
+                return {}
+
+            collector = StatusCollector()
+            fingerprints: Dict[str, List[int]] = {}
+            for name in stale:
+                probe = self.probes[name]
+                # taken before the probe runs, so that a change while the
+                # probe is running outdates the snapshot
+                fingerprints[name] = _fingerprint(probe.watch)
+                collector.add(name, probe.probe, *probe.args)
+
+            def on_result(name: str, value: Any) -> None:
+                snapshot = StatusSnapshot(value, time.time(), fingerprints[name])
+                with self._lock:
+                    self._snapshots[name] = snapshot
+
+            errors = collector.collect(on_result)
+            self._save()
+            return errors
+
+    def start_refresher(self, interval: float = SNAPSHOT_REFRESH_INTERVAL) -> None:
+        """Start a daemon thread refreshing outdated snapshots periodically"""
+        if (
+            self._refresher is not None
+            and self._refresher.is_alive()
+            and not self._stop.is_set()
+        ):
+            return
+
+        # each refresher has its own stop event, so that a stopped refresher
+        # still finishing a refresh is not resumed by starting a new one
+        stop = self._stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(interval):
+                try:
+                    errors = self.refresh()
+                except Exception as e:
+                    errors = {"refresher": e}
+                # kept for the next menu redraw, which reports them
+                with self._lock:
+                    self._refresher_errors = errors
+
+        self._refresher = threading.Thread(
+            target=run, name="status-refresher", daemon=True
+        )
+        self._refresher.start()
+
+    def stop_refresher(self) -> None:
+        """Stop the background refresher"""
+        self._stop.set()
+
+    def pop_refresher_errors(self) -> Dict[str, Exception]:
+        """Return and clear the errors of the last background refresh"""
+        with self._lock:
+            errors, self._refresher_errors = self._refresher_errors, {}
+        return errors
+
+    def _is_fresh(self, name: str, snapshot: StatusSnapshot) -> bool:
+        probe = self.probes.get(name)
+        if probe is None:
+            return False
+        if time.time() - snapshot.fetched_at > probe.ttl:
+            return False
+        return snapshot.fingerprint == _fingerprint(probe.watch)
+
+    def _load(self) -> None:
+        if self.file is None or not self.file.is_file():
+            return
+        try:
+            with open(self.file, "r") as f:
+                data = json.load(f)
+            for name, entry in data.items():
+                value = entry["value"]
+                if entry.get("type") == "component":
+                    value = ComponentStatus(**value)
+                self._snapshots[name] = StatusSnapshot(
+                    value, entry["fetched_at"], entry["fingerprint"]
+                )
+        except (OSError, ValueError, KeyError, TypeError):
+            # an unreadable snapshot file is replaced on the next refresh
+            self._snapshots.clear()
+
+    def _save(self) -> None:
+        if self.file is None:
+            return
+
+        with self._lock:
+            data = {}
+            for name, snapshot in self._snapshots.items():
+                is_component = isinstance(snapshot.value, ComponentStatus)
+                value = asdict(snapshot.value) if is_component else snapshot.value
+                data[name] = {
+                    "type": "component" if is_component else "value",
+                    "value": value,
+                    "fetched_at": snapshot.fetched_at,
+                    "fingerprint": snapshot.fingerprint,
+                }
+
+        try:
+            content = json.dumps(data)
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.file.parent, prefix=".status-")
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp, self.file)
+        except (OSError, TypeError, ValueError):
+            # the snapshots are only a cache, they are fetched again next session
+            pass
+
+
+def _fingerprint(paths: List[Path]) -> List[int]:
+    """Return the mtime of each path, -1 for a path that does not exist"""
+    fingerprint = []
+    for path in paths:
+        try:
+            fingerprint.append(path.stat().st_mtime_ns)
+        except OSError:
+            fingerprint.append(-1)
+    return fingerprint
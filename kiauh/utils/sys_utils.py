@@ -14,17 +14,21 @@ import select
 import shutil
 import socket
 import sys
+import threading
 import time
 import urllib.error
 import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
 from subprocess import DEVNULL, PIPE, CalledProcessError, Popen, check_output, run
-from typing import List, Literal, Set
+from typing import Dict, Iterator, List, Literal, Set
 
 from core.constants import SYSTEMD
 from core.logger import Logger
 from utils.fs_utils import check_file_exist, remove_with_sudo
 from utils.input_utils import get_confirm
+from utils.privileged_ops import PRIVILEGED_OPS
 
 SysCtlServiceAction = Literal[
     "start",
@@ -39,10 +43,51 @@ SysCtlServiceAction = Literal[
 SysCtlManageAction = Literal["daemon-reload", "reset-failed"]
 
 
+# the states a unit is expected to be in after a successful action, checked
+# against its ActiveState, or its UnitFileState for the enable/mask actions
+_EXPECTED_ACTIVE_STATES: Dict[str, Set[str]] = {
+    "start": {"active", "activating", "reloading"},
+    "restart": {"active", "activating", "reloading"},
+    "reload": {"active", "activating", "reloading"},
+    "stop": {"inactive", "failed"},
+}
+_EXPECTED_UNIT_FILE_STATES: Dict[str, Set[str]] = {
+    "enable": {"enabled", "enabled-runtime", "static", "alias", "indirect"},
+    "disable": {"disabled", "static", "indirect"},
+    "mask": {"masked", "masked-runtime"},
+    "unmask": {"enabled", "enabled-runtime", "disabled", "static", "indirect"},
+}
+_UNPROVABLE_ACTIONS: Set[str] = {"start", "restart", "reload"}
+UNIT_STATE_PROPERTIES = "Id,LoadState,ActiveState,SubState,MainPID,UnitFileState"
+
+
 class VenvCreationFailedException(Exception):
     pass
 
 
+class SysCtlServiceError(CalledProcessError):
+    """Raised when a batched systemctl action failed for at least one unit"""
+
+    def __init__(self, action: str, failed: Dict[str, str]) -> None:
+        super().__init__(1, ["systemctl", action, *failed])
+        self.action = action
+        self.failed = failed
+
+    def __str__(self) -> str:
+        units = "; ".join(f"{u}: {msg}" for u, msg in self.failed.items())
+        return f"Failed to {self.action} {units}"
+
+
+@dataclass(frozen=True)
+class UnitState:
+    name: str
+    load_state: str = ""
+    active_state: str = ""
+    sub_state: str = ""
+    main_pid: int = 0
+    unit_file_state: str = ""
+
+
 def kill(opt_err_msg: str = "") -> None:
     """
     Kills the application |
@@ -404,7 +449,195 @@ def cmd_sysctl_service(name: str, action: SysCtlServiceAction) -> None:
         raise
 
 
+def cmd_sysctl_services(
+    names: List[str], action: SysCtlServiceAction
+) -> Dict[str, str]:
+    """
+    Helper method to execute an action for several systemd services with a single
+    systemctl call. Afterward, the state of each unit is verified. |
+    :param names: the service names
+    :param action: Either "start", "stop", "restart" or any other service action
+    :return: the units the action failed for, mapped to an error message
+    """
+    if not names:
+        return {}
+
+    Logger.print_status(f"{action.capitalize()} {', '.join(names)} ...")
+    result = run(["sudo", "systemctl", action, *names], stderr=PIPE)
+    stderr = result.stderr.decode().strip()
+
+    try:
+        states = get_unit_states(names)
+    except CalledProcessError:
+        states = {}
+
+    failed = verify_unit_states(names, action, states)
+    if result.returncode != 0:
+        # an active unit may have been active before a failed start or restart
+        # already, only the states reached by stopping or changing the unit file
+        # prove that the action succeeded
+        for name in names:
+            proven = action not in _UNPROVABLE_ACTIONS and name in states
+            if not proven or name in failed:
+                failed[name] = stderr or f"exit code {result.returncode}"
+
+    for name in names:
+        if name in failed:
+            Logger.print_error(f"Failed to {action} {name}: {failed[name]}")
+
+    if not failed:
+        Logger.print_ok("OK!")
+
+    return failed
+
+
+def verify_unit_states(
+    names: List[str], action: SysCtlServiceAction, states: Dict[str, UnitState]
+) -> Dict[str, str]:
+    """
+    Helper method to verify that several systemd units reached the state
+    expected after the given action. Units without state are skipped. |
+    :param names: the unit names
+    :param action: the action executed for the units
+    :param states: the state of each unit, by unit name
+    :return: the units not in the expected state, mapped to an error message
+    """
+    failed: Dict[str, str] = {}
+    for name in names:
+        state = states.get(name)
+        if state is None:
+            continue
+        if state.load_state == "not-found":
+            failed[name] = "unit not found"
+        elif action in _EXPECTED_ACTIVE_STATES:
+            if state.active_state not in _EXPECTED_ACTIVE_STATES[action]:
+                failed[name] = f"unit is {state.active_state} ({state.sub_state})"
+        elif action in _EXPECTED_UNIT_FILE_STATES:
+            if state.unit_file_state not in _EXPECTED_UNIT_FILE_STATES[action]:
+                failed[name] = f"unit file is {state.unit_file_state or 'missing'}"
+
+    return failed
+
+
+def get_unit_states(names: List[str]) -> Dict[str, UnitState]:
+    """
+    Helper method to query the state of several systemd units with a single
+    systemctl call. |
+    :param names: the unit names
+    :return: the state of each unit, by unit name
+    """
+    if not names:
+        return {}
+
+    cmd = ["systemctl", "show", f"--property={UNIT_STATE_PROPERTIES}", "--", *names]
+    result = run(cmd, stdout=PIPE, stderr=PIPE, check=True, text=True)
+
+    return parse_unit_states(names, result.stdout)
+
+
+def parse_unit_states(names: List[str], output: str) -> Dict[str, UnitState]:
+    """
+    Parse the output of 'systemctl show' for several units. The properties of
+    each unit are printed as a block of key=value lines, in the order the units
+    were passed, and the blocks are separated by empty lines. |
+    :param names: the unit names, in the order they were passed to systemctl
+    :param output: the output of systemctl
+    :return: the state of each unit, by unit name
+    """
+    blocks = [b for b in output.strip().split("\n\n") if b.strip()]
+
+    states: Dict[str, UnitState] = {}
+    for name, block in zip(names, blocks):
+        props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        try:
+            main_pid = int(props.get("MainPID", "0"))
+        except ValueError:
+            main_pid = 0
+        states[name] = UnitState(
+            name=name,
+            load_state=props.get("LoadState", ""),
+            active_state=props.get("ActiveState", ""),
+            sub_state=props.get("SubState", ""),
+            main_pid=main_pid,
+            unit_file_state=props.get("UnitFileState", ""),
+        )
+
+    return states
+
+
+@dataclass
+class SystemdTransaction:
+    """
+    The manage actions deferred while a systemd transaction is open, until the
+    transaction is committed
+    """
+
+    actions: List[SysCtlManageAction] = field(default_factory=list)
+
+    def defer(self, action: SysCtlManageAction) -> None:
+        if action not in self.actions:
+            self.actions.append(action)
+
+    def commit(self) -> None:
+        # same order as in remove_system_service, reload first, then reset failed units
+        for action in ("daemon-reload", "reset-failed"):
+            if action in self.actions:
+                _run_sysctl_manage(action)
+
+
+_transaction: SystemdTransaction | None = None
+_transaction_lock = threading.RLock()
+
+
+@contextmanager
+def systemd_transaction() -> Iterator[SystemdTransaction]:
+    """
+    Context manager to defer the systemd manage actions of a series of unit file
+    changes. Within the context, each action requested through cmd_sysctl_manage
+    is recorded once and all of them are run a single time when the context is
+    left, even if an exception was raised. A nested context joins the outer one.
+    :return: the transaction collecting the deferred actions
+    """
+    global _transaction
+    with _transaction_lock:
+        outer = _transaction
+        transaction = outer if outer is not None else SystemdTransaction()
+        _transaction = transaction
+
+    if outer is not None:
+        yield transaction
+        return
+
+    try:
+        yield transaction
+    finally:
+        with _transaction_lock:
+            _transaction = None
+        transaction.commit()
+
+
+def _record_unit_file_change() -> None:
+    """Defer a daemon-reload for a changed unit file to the open transaction"""
+    with _transaction_lock:
+        if _transaction is not None:
+            _transaction.defer("daemon-reload")
+
+
 def cmd_sysctl_manage(action: SysCtlManageAction) -> None:
+    """
+    Helper method to run a systemd manage action. If a systemd transaction is
+    open, the action is deferred until the transaction is committed. |
+    :param action: Either "daemon-reload" or "reset-failed"
+    :return: None
+    """
+    with _transaction_lock:
+        if _transaction is not None:
+            _transaction.defer(action)
+            return
+    _run_sysctl_manage(action)
+
+
+def _run_sysctl_manage(action: SysCtlManageAction) -> None:
     try:
         run(["sudo", "systemctl", action], stderr=PIPE, check=True)
     except CalledProcessError as e:
@@ -463,12 +696,8 @@ def create_service_file(name: str, content: str) -> None:
     :return: None
     """
     try:
-        run(
-            ["sudo", "tee", SYSTEMD.joinpath(name)],
-            input=content.encode(),
-            stdout=DEVNULL,
-            check=True,
-        )
+        PRIVILEGED_OPS.write_file(SYSTEMD.joinpath(name), content)
+        _record_unit_file_change()
         Logger.print_ok(f"Service file created: {SYSTEMD.joinpath(name)}")
     except CalledProcessError as e:
         Logger.print_error(f"Error creating service file: {e}")
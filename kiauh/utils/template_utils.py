@@ -0,0 +1,112 @@
+# ======================================================================= #
+#  Copyright (C) 2020 - 2024 Dominik Willner <th33xitus@gmail.com>        #
+#                                                                         #
+#  This file is part of KIAUH - Klipper Installation And Update Helper    #
+#  https://github.com/dw-0/kiauh                                          #
+#                                                                         #
+#  This file may be distributed under the terms of the GNU GPLv3 license  #
+# ======================================================================= #
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from core.logger import Logger
+
+# a placeholder is an upper case name enclosed in percent signs, e.g. %USER%
+PLACEHOLDER_PATTERN = re.compile(r"%([A-Z][A-Z0-9_]*)%")
+
+
+class UnresolvedPlaceholderError(ValueError):
+    """Raised when a template is rendered without a value for each placeholder"""
+
+    def __init__(self, source: Path, names: List[str]) -> None:
+        placeholders = ", ".join(f"%{name}%" for name in names)
+        super().__init__(f"Unresolved placeholders in {source}: {placeholders}")
+        self.source = source
+        self.names = names
+
+
+@dataclass(frozen=True)
+class Template:
+    """
+    A template split into its literal text and its placeholders
+
+    - source: The template file
+    - literals: The text between the placeholders, one more than placeholders
+    - placeholders: The placeholder names, in order of appearance
+    """
+
+    source: Path
+    literals: Tuple[str, ...]
+    placeholders: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, source: Path, content: str) -> Template:
+        # splitting on a pattern with one group alternates literal and name
+        parts = PLACEHOLDER_PATTERN.split(content)
+        return cls(source, tuple(parts[0::2]), tuple(parts[1::2]))
+
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Replace all placeholders with their values in a single pass. Values are
+        inserted as they are, placeholders contained in a value are not replaced.
+        """
+        missing = [
+            name for name in dict.fromkeys(self.placeholders) if name not in values
+        ]
+        if missing:
+            raise UnresolvedPlaceholderError(self.source, missing)
+
+        chunks = [self.literals[0]]
+        for name, literal in zip(self.placeholders, self.literals[1:]):
+            chunks.append(values[name])
+            chunks.append(literal)
+        return "".join(chunks)
+
+
+# compiled templates by path, with the (mtime_ns, size) of the compiled file
+_TEMPLATE_CACHE: Dict[Path, Tuple[Tuple[int, int], Template]] = {}
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+
+def load_template(template: Path) -> Template:
+    """
+    Load and compile a template file. Each file is read once, the compiled
+    template is reused until the file changes. |
+    :param template: the template file
+    :return: the compiled template
+    """
+    try:
+        stat = template.stat()
+    except FileNotFoundError:
+        Logger.print_error(f"Unable to open {template} - File not found")
+        raise
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _TEMPLATE_CACHE_LOCK:
+        cached = _TEMPLATE_CACHE.get(template)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    with open(template, "r") as template_file:
+        compiled = Template.compile(template, template_file.read())
+
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE[template] = (key, compiled)
+    return compiled
+
+
+def render_template(template: Path, **values: str) -> str:
+    """
+    Render a template file, replacing each %PLACEHOLDER% by the value passed as
+    keyword argument of the same name. Values not used by the template are
+    ignored. |
+    :param template: the template file
+    :param values: the value of each placeholder
+    :return: the rendered content
+    """
+    return load_template(template).render(values)
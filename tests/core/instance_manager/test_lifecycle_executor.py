@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+from components.klipper.klipper import Klipper
+from components.moonraker.moonraker import Moonraker
+from core.instance_manager.lifecycle_executor import (
+    LifecycleError,
+    LifecycleExecutor,
+)
+from extensions.obico.moonraker_obico import MoonrakerObico
+
+
+class Recorder:
+    """Collects the keys of the tasks in the order they ran"""
+
+    def __init__(self) -> None:
+        self.order = []
+        self._lock = threading.Lock()
+
+    def task(self, key, error=None):
+        def action():
+            with self._lock:
+                self.order.append(key)
+            if error is not None:
+                raise error
+
+        return action
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+def add_printer(executor, recorder, suffix, failing=()):
+    """Add the tasks of one printer, the bot first and Klipper last"""
+    for cls in (MoonrakerObico, Moonraker, Klipper):
+        instance = cls(suffix)
+        key = instance.service_file_path.name
+        error = RuntimeError(f"{key} broke") if cls in failing else None
+        executor.add_instance(instance, recorder.task(key, error))
+
+
+class TestLifecycleExecutor:
+    def test_instances_run_in_startup_order_per_printer(self, recorder):
+        executor = LifecycleExecutor()
+        add_printer(executor, recorder, "a")
+        add_printer(executor, recorder, "b")
+
+        executor.run()
+
+        assert len(recorder.order) == 6
+        for suffix in ("a", "b"):
+            order = [k for k in recorder.order if k.endswith(f"-{suffix}.service")]
+            assert order == [
+                f"klipper-{suffix}.service",
+                f"moonraker-{suffix}.service",
+                f"moonraker-obico-{suffix}.service",
+            ]
+
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        executor = LifecycleExecutor(max_workers=2)
+        executor.add("a", barrier.wait).add("b", barrier.wait)
+
+        # the barrier is only passed if both tasks wait at the same time
+        executor.run()
+
+    def test_explicit_dependencies(self, recorder):
+        executor = LifecycleExecutor()
+        executor.add("c", recorder.task("c"), depends_on=["b"])
+        executor.add("b", recorder.task("b"), depends_on=["a"])
+        executor.add("a", recorder.task("a"))
+
+        executor.run()
+
+        assert recorder.order == ["a", "b", "c"]
+
+    def test_failed_task_skips_dependents_only(self, recorder):
+        executor = LifecycleExecutor()
+        add_printer(executor, recorder, "a", failing=[Klipper])
+        add_printer(executor, recorder, "b")
+
+        with pytest.raises(LifecycleError) as e:
+            executor.run()
+
+        assert list(e.value.failed) == ["klipper-a.service"]
+        assert sorted(e.value.skipped) == [
+            "moonraker-a.service",
+            "moonraker-obico-a.service",
+        ]
+        assert "moonraker-a.service" not in recorder.order
+        assert "moonraker-obico-b.service" in recorder.order
+
+    def test_error_aggregates_all_failures(self, recorder):
+        executor = LifecycleExecutor()
+        add_printer(executor, recorder, "a", failing=[Moonraker])
+        add_printer(executor, recorder, "b", failing=[MoonrakerObico])
+
+        with pytest.raises(LifecycleError) as e:
+            executor.run()
+
+        assert set(e.value.failed) == {
+            "moonraker-a.service",
+            "moonraker-obico-b.service",
+        }
+        assert e.value.skipped == ["moonraker-obico-a.service"]
+        assert "moonraker-a.service: moonraker-a.service broke" in str(e.value)
+        assert str(e.value).endswith("(skipped: moonraker-obico-a.service)")
+
+    def test_unknown_dependency_is_rejected_before_running(self, recorder):
+        executor = LifecycleExecutor()
+        executor.add("a", recorder.task("a"))
+        executor.add("b", recorder.task("b"), depends_on=["missing"])
+
+        with pytest.raises(ValueError, match="unknown tasks: missing"):
+            executor.run()
+        assert recorder.order == []
+
+    def test_cyclic_dependencies_are_rejected_before_running(self, recorder):
+        executor = LifecycleExecutor()
+        executor.add("a", recorder.task("a"))
+        executor.add("b", recorder.task("b"), depends_on=["c"])
+        executor.add("c", recorder.task("c"), depends_on=["b"])
+
+        with pytest.raises(
+            ValueError, match="Cyclic lifecycle task dependencies: b, c"
+        ):
+            executor.run()
+        assert recorder.order == []
+
+    def test_duplicate_task_is_rejected(self, recorder):
+        executor = LifecycleExecutor().add("a", recorder.task("a"))
+
+        with pytest.raises(ValueError, match="Duplicate lifecycle task 'a'"):
+            executor.add("a", recorder.task("a"))
+
+    def test_skip_dependents_removes_transitive_dependents(self):
+        pending = {"b": {"a"}, "c": {"b"}, "d": {"x"}, "e": {"a", "d"}}
+
+        skipped = LifecycleExecutor._skip_dependents("a", pending)
+
+        assert sorted(skipped) == ["b", "c", "e"]
+        assert pending == {"d": {"x"}}
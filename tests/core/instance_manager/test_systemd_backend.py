@@ -0,0 +1,374 @@
+import threading
+from pathlib import Path
+from subprocess import CalledProcessError
+from types import SimpleNamespace
+from typing import Any, Dict, List, Set, Tuple
+
+import pytest
+from core.instance_manager.systemd_backend import (
+    JOB_RESULT_DONE,
+    DBusBackend,
+    SubprocessBackend,
+    SystemdBus,
+    SystemdBusError,
+    _get_unit_path,
+    set_systemd_backend,
+)
+from utils.sys_utils import SysCtlServiceError, UnitState
+
+ACCESS_DENIED = "org.freedesktop.DBus.Error.AccessDenied"
+NO_SUCH_UNIT = "org.freedesktop.systemd1.NoSuchUnit"
+NO_REPLY = "org.freedesktop.DBus.Error.NoReply"
+UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
+SERVICE_INTERFACE = "org.freedesktop.systemd1.Service"
+
+
+class FakeSystemdBus(SystemdBus):
+    """
+    An in-memory SystemdBus
+
+    - units: The known units, by name, with their properties by interface
+    - signals: The JobRemoved signals not yet received on the connection
+    - calls: All method calls in the order they were made
+    - failing_units: Units whose jobs finish with the result "failed"
+    - hanging_units: Units whose jobs never finish
+    - denied: If set, every state changing call raises an access denied error
+    - errors: Methods that raise the given error name on every call
+    """
+
+    def __init__(self, units: List[str] | None = None) -> None:
+        super().__init__()
+        self.units: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.signals: List[Tuple[str, str]] = []
+        self.calls: List[Tuple[Any, ...]] = []
+        self.failing_units: Set[str] = set()
+        self.hanging_units: Set[str] = set()
+        self.denied = False
+        self.errors: Dict[str, str] = {}
+        for name in units or []:
+            self.add_unit(name)
+
+    def add_unit(self, name: str, active: bool = False, enabled: bool = False) -> None:
+        self.units[name] = {
+            UNIT_INTERFACE: {
+                "Id": name,
+                "LoadState": "loaded",
+                "ActiveState": "active" if active else "inactive",
+                "SubState": "running" if active else "dead",
+                "UnitFileState": "enabled" if enabled else "disabled",
+            },
+            SERVICE_INTERFACE: {"MainPID": 1000 + len(self.units) if active else 0},
+        }
+
+    def finish_job(self, job: str, result: str = JOB_RESULT_DONE) -> None:
+        with self._lock:
+            self.signals.append((job, result))
+
+    def start_unit(self, name: str) -> str:
+        return self._queue_job("StartUnit", name, "active", "running")
+
+    def stop_unit(self, name: str) -> str:
+        return self._queue_job("StopUnit", name, "inactive", "dead")
+
+    def restart_unit(self, name: str) -> str:
+        return self._queue_job("RestartUnit", name, "active", "running")
+
+    def reload_unit(self, name: str) -> str:
+        return self._queue_job("ReloadUnit", name, "active", "running")
+
+    def wait_for_jobs(self, jobs: List[str], timeout: float) -> Dict[str, str]:
+        with self._lock:
+            self.calls.append(("WaitForJobs", tuple(jobs)))
+        return super().wait_for_jobs(jobs, timeout)
+
+    def enable_unit_files(self, names: List[str]) -> None:
+        self._set_unit_file_state("EnableUnitFiles", names, "enabled")
+
+    def disable_unit_files(self, names: List[str]) -> None:
+        self._set_unit_file_state("DisableUnitFiles", names, "disabled")
+
+    def mask_unit_files(self, names: List[str]) -> None:
+        self._set_unit_file_state("MaskUnitFiles", names, "masked")
+
+    def unmask_unit_files(self, names: List[str]) -> None:
+        self._set_unit_file_state("UnmaskUnitFiles", names, "disabled")
+
+    def reload(self) -> None:
+        self._check("Reload", write=True)
+        self.calls.append(("Reload",))
+
+    def get_unit_properties(self, name: str) -> Dict[str, Any]:
+        self._check("GetUnitProperties")
+        self.calls.append(("GetUnitProperties", name))
+        if name not in self.units:
+            # an unknown unit has no Service interface
+            return {
+                "Id": name,
+                "LoadState": "not-found",
+                "ActiveState": "inactive",
+                "SubState": "dead",
+                "UnitFileState": "",
+            }
+        # like GetAll with an empty interface name
+        props: Dict[str, Any] = {}
+        for interface_props in self.units[name].values():
+            props.update(interface_props)
+        return props
+
+    def _queue_job(self, method: str, name: str, active: str, sub: str) -> str:
+        with self._lock:
+            self._check(method, write=True)
+            self.calls.append((method, name))
+            if name not in self.units:
+                raise SystemdBusError(NO_SUCH_UNIT, f"Unit {name} not found.")
+
+            job = self._add_job(f"/org/freedesktop/systemd1/job/{len(self.calls)}")
+            if name in self.hanging_units:
+                return job
+            unit = self.units[name][UNIT_INTERFACE]
+            service = self.units[name][SERVICE_INTERFACE]
+            if name in self.failing_units:
+                unit.update(ActiveState="failed", SubState="failed")
+                service["MainPID"] = 0
+                self.signals.append((job, "failed"))
+            else:
+                unit.update(ActiveState=active, SubState=sub)
+                service["MainPID"] = 1000 + len(self.calls) if active == "active" else 0
+                self.signals.append((job, JOB_RESULT_DONE))
+            return job
+
+    def _receive_job_results(self) -> List[Tuple[str, str]]:
+        # signals of all jobs arrive on the one connection, no matter which
+        # thread reads it
+        signals, self.signals = self.signals, []
+        return signals
+
+    def _set_unit_file_state(self, method: str, names: List[str], state: str) -> None:
+        self._check(method, write=True)
+        self.calls.append((method, tuple(names)))
+        for name in names:
+            if name not in self.units:
+                raise SystemdBusError(NO_SUCH_UNIT, f"Unit file {name} not found.")
+            self.units[name][UNIT_INTERFACE]["UnitFileState"] = state
+
+    def _check(self, method: str, write: bool = False) -> None:
+        if write and self.denied:
+            raise SystemdBusError(ACCESS_DENIED, f"{method} not allowed")
+        if method in self.errors:
+            raise SystemdBusError(self.errors[method], f"{method} failed")
+
+
+class RecordingBackend(SubprocessBackend):
+    """A subprocess backend recording its calls instead of running systemctl"""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, Tuple[str, ...]]] = []
+
+    def run_action(self, names, action):
+        self.calls.append((action, tuple(names)))
+        return {}
+
+    def get_unit_states(self, names):
+        self.calls.append(("show", tuple(names)))
+        return {name: UnitState(name, "loaded", "active", "running") for name in names}
+
+
+UNITS = ["klipper-1.service", "klipper-2.service"]
+
+
+@pytest.fixture
+def bus():
+    return FakeSystemdBus(UNITS)
+
+
+@pytest.fixture
+def fallback():
+    return RecordingBackend()
+
+
+@pytest.fixture
+def backend(bus, fallback):
+    return DBusBackend(bus, fallback, job_timeout=0.5)
+
+
+@pytest.fixture
+def shared_backend(backend):
+    set_systemd_backend(backend)
+    yield backend
+    set_systemd_backend(None)
+
+
+class TestSystemdBus:
+    def test_result_received_by_another_thread_is_kept(self, bus):
+        jobs = [bus.restart_unit(unit) for unit in UNITS]
+        results: Dict[str, Dict[str, str]] = {}
+
+        def wait(job):
+            results[job] = bus.wait_for_jobs([job], timeout=5)
+
+        # the first thread to read the connection receives both signals
+        threads = [threading.Thread(target=wait, args=(job,)) for job in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert results == {job: {job: JOB_RESULT_DONE} for job in jobs}
+        assert bus._jobs == {}
+
+    def test_waiting_thread_does_not_block_other_calls(self, bus):
+        bus.hanging_units.add(UNITS[0])
+        hanging = bus.restart_unit(UNITS[0])
+        results: Dict[str, str] = {}
+        waiter = threading.Thread(
+            target=lambda: results.update(bus.wait_for_jobs([hanging], timeout=5))
+        )
+        waiter.start()
+
+        job = bus.restart_unit(UNITS[1])
+        assert bus.wait_for_jobs([job], timeout=1) == {job: JOB_RESULT_DONE}
+        assert waiter.is_alive()
+
+        bus.finish_job(hanging)
+        waiter.join(timeout=5)
+        assert results == {hanging: JOB_RESULT_DONE}
+
+    def test_signals_of_unknown_jobs_are_dropped(self, bus):
+        bus.finish_job("/org/freedesktop/systemd1/job/1")
+        job = bus.start_unit(UNITS[0])
+
+        assert bus.wait_for_jobs([job], timeout=1) == {job: JOB_RESULT_DONE}
+        assert bus._jobs == {}
+
+    def test_timed_out_job_is_forgotten(self, bus):
+        bus.hanging_units.add(UNITS[0])
+        job = bus.start_unit(UNITS[0])
+
+        assert bus.wait_for_jobs([job], timeout=0.1) == {}
+        bus.finish_job(job)
+        assert bus.wait_for_jobs([], timeout=0) == {}
+        assert bus._jobs == {}
+
+    def test_unit_path_is_escaped_like_systemd(self):
+        assert _get_unit_path("klipper-1.service") == (
+            "/org/freedesktop/systemd1/unit/klipper_2d1_2eservice"
+        )
+        assert _get_unit_path("") == "/org/freedesktop/systemd1/unit/_"
+
+
+class TestDBusBackend:
+    def test_start_waits_for_all_jobs(self, backend, bus):
+        assert backend.run_action(UNITS, "start") == {}
+
+        methods = [call[0] for call in bus.calls]
+        assert methods[:3] == ["StartUnit", "StartUnit", "WaitForJobs"]
+        assert len(bus.calls[2][1]) == 2
+        assert all(
+            bus.units[u][UNIT_INTERFACE]["ActiveState"] == "active" for u in UNITS
+        )
+
+    def test_failed_job_only_fails_its_unit(self, backend, bus):
+        bus.failing_units.add(UNITS[1])
+
+        failed = backend.run_action(UNITS, "start")
+
+        assert list(failed) == [UNITS[1]]
+        assert failed[UNITS[1]] == "unit is failed (failed)"
+
+    def test_job_without_result_fails_after_timeout(self, backend, bus):
+        bus.add_unit("moonraker.service")
+        bus.hanging_units.add("moonraker.service")
+
+        failed = backend.run_action([UNITS[0], "moonraker.service"], "start")
+
+        assert list(failed) == ["moonraker.service"]
+
+    def test_unknown_unit_fails_and_others_still_run(self, backend, bus):
+        failed = backend.run_action(["missing.service", UNITS[0]], "start")
+
+        assert failed == {"missing.service": "unit not found"}
+        assert bus.units[UNITS[0]][UNIT_INTERFACE]["ActiveState"] == "active"
+
+    def test_enable_reloads_systemd(self, backend, bus):
+        assert backend.run_action(UNITS, "enable") == {}
+
+        assert bus.calls[:2] == [("EnableUnitFiles", tuple(UNITS)), ("Reload",)]
+        assert all(
+            bus.units[u][UNIT_INTERFACE]["UnitFileState"] == "enabled" for u in UNITS
+        )
+
+    def test_bus_error_fails_all_units_instead_of_raising(self, backend, bus):
+        bus.errors["Reload"] = NO_REPLY
+
+        failed = backend.run_action(UNITS, "enable")
+
+        assert set(failed) == set(UNITS)
+        assert failed[UNITS[0]] == f"{NO_REPLY}: Reload failed"
+
+    def test_access_denied_falls_back_for_all_following_actions(
+        self, backend, bus, fallback
+    ):
+        bus.denied = True
+
+        assert backend.run_action(UNITS, "start") == {}
+        assert backend.write_denied is True
+        bus.calls.clear()
+        assert backend.run_action(UNITS, "stop") == {}
+
+        assert fallback.calls == [("start", tuple(UNITS)), ("stop", tuple(UNITS))]
+        assert bus.calls == []
+
+    def test_get_unit_states_parses_properties(self, backend, bus):
+        bus.add_unit("moonraker.service", active=True, enabled=True)
+
+        states = backend.get_unit_states(["moonraker.service", "missing.service"])
+
+        assert states["moonraker.service"] == UnitState(
+            name="moonraker.service",
+            load_state="loaded",
+            active_state="active",
+            sub_state="running",
+            main_pid=1002,
+            unit_file_state="enabled",
+        )
+        assert states["missing.service"].load_state == "not-found"
+        assert states["missing.service"].main_pid == 0
+
+    def test_get_unit_states_falls_back_on_bus_error(self, backend, bus, fallback):
+        bus.errors["GetUnitProperties"] = NO_REPLY
+
+        states = backend.get_unit_states(UNITS)
+
+        assert fallback.calls == [("show", tuple(UNITS))]
+        assert states[UNITS[0]].active_state == "active"
+
+    def test_bus_error_is_a_called_process_error(self):
+        error = SystemdBusError(NO_REPLY, "no reply")
+
+        assert isinstance(error, CalledProcessError)
+        assert error.stderr.decode() == f"{NO_REPLY}: no reply"
+        assert str(error) == f"{NO_REPLY}: no reply"
+
+
+class TestInstanceManagerOnDBus:
+    @pytest.fixture
+    def klipper(self):
+        return SimpleNamespace(service_file_path=Path(UNITS[0]))
+
+    def test_enable_reports_bus_error_without_raising(
+        self, shared_backend, bus, klipper
+    ):
+        from core.instance_manager.instance_manager import InstanceManager
+
+        bus.errors["EnableUnitFiles"] = NO_REPLY
+
+        InstanceManager.enable(klipper)
+
+    def test_start_raises_sysctl_service_error(self, shared_backend, bus, klipper):
+        from core.instance_manager.instance_manager import InstanceManager
+
+        bus.failing_units.add(UNITS[0])
+
+        with pytest.raises(SysCtlServiceError) as e:
+            InstanceManager.start(klipper)
+        assert list(e.value.failed) == [UNITS[0]]
@@ -0,0 +1,123 @@
+import pytest
+from utils.config_utils import ConfigPatchPlan, PatchStatus
+
+PRINTER_CFG = "[printer]\nkinematics: cartesian\n\n[include mainsail.cfg]\n"
+MAINSAIL_CFG = "[pause_resume]\n"
+
+
+@pytest.fixture
+def printer_cfgs(tmp_path):
+    files = []
+    for name in ("printer_1", "printer_2"):
+        cfg_dir = tmp_path.joinpath(name)
+        cfg_dir.mkdir()
+        cfg_dir.joinpath("mainsail.cfg").write_text(MAINSAIL_CFG)
+        cfg_file = cfg_dir.joinpath("printer.cfg")
+        cfg_file.write_text(PRINTER_CFG)
+        files.append(cfg_file)
+    return files
+
+
+class TestConfigPatchPlan:
+    def test_apply_reports_result_per_file_in_order(self, printer_cfgs, tmp_path):
+        printer_cfgs[1].write_text(PRINTER_CFG + "\n[update_manager]\n")
+        missing = tmp_path.joinpath("printer_3", "printer.cfg")
+        plan = ConfigPatchPlan().add_section("update_manager")
+
+        results = plan.apply([printer_cfgs[0], missing, printer_cfgs[1]])
+
+        assert [r.cfg_file for r in results] == [
+            printer_cfgs[0],
+            missing,
+            printer_cfgs[1],
+        ]
+        assert [r.status for r in results] == [
+            PatchStatus.CHANGED,
+            PatchStatus.NOT_FOUND,
+            PatchStatus.UNCHANGED,
+        ]
+        assert results[2].messages == ["Section already exist. Skipped ..."]
+        assert "[update_manager]" in printer_cfgs[0].read_text()
+
+    def test_apply_adds_options_in_declared_order(self, printer_cfgs):
+        options = [("type", "git_repo"), ("path", "~/klipper")]
+        ConfigPatchPlan().add_section("update_manager", options).apply(printer_cfgs)
+
+        content = printer_cfgs[0].read_text()
+        assert content.index("type: git_repo") < content.index("path: ~/klipper")
+
+    def test_apply_reports_failed_file_and_patches_others(self, printer_cfgs):
+        broken = printer_cfgs[1].parent
+        plan = ConfigPatchPlan().remove_section("printer")
+
+        results = plan.apply([broken, printer_cfgs[0]])
+
+        assert results[0].status == PatchStatus.FAILED
+        assert isinstance(results[0].error, OSError)
+        assert results[1].status == PatchStatus.CHANGED
+        assert "[printer]" not in printer_cfgs[0].read_text()
+
+    def test_apply_reports_skipped_option_edits(self, printer_cfgs):
+        plan = (
+            ConfigPatchPlan()
+            .set_option("server", "port", "7125")
+            .remove_option("printer", "max_velocity")
+            .set_option("printer", "max_accel", "3000")
+        )
+
+        result = plan.apply(printer_cfgs[:1])[0]
+
+        assert result.status == PatchStatus.CHANGED
+        assert result.messages == [
+            "Section '[server]' does not exist. Skipped ...",
+            "Option 'max_velocity' does not exist. Skipped ...",
+        ]
+        assert "max_accel: 3000" in printer_cfgs[0].read_text()
+
+    def test_dry_run_returns_diff_without_writing(self, printer_cfgs):
+        plan = ConfigPatchPlan().add_section("update_manager")
+
+        results = plan.apply(printer_cfgs, dry_run=True)
+
+        for result in results:
+            assert result.status == PatchStatus.CHANGED
+            assert "+[update_manager]\n" in result.diff
+            assert result.diff.startswith(f"--- {result.cfg_file}\n")
+            assert result.cfg_file.read_text() == PRINTER_CFG
+
+    def test_dry_run_does_not_leak_changes_into_later_apply(self, printer_cfgs):
+        ConfigPatchPlan().add_section("update_manager").apply(
+            printer_cfgs, dry_run=True
+        )
+
+        results = ConfigPatchPlan().remove_section("printer").apply(printer_cfgs)
+
+        assert results[0].status == PatchStatus.CHANGED
+        assert "[update_manager]" not in printer_cfgs[0].read_text()
+
+    def test_dry_run_of_unchanged_file_has_no_diff(self, printer_cfgs):
+        plan = ConfigPatchPlan().remove_section("update_manager")
+
+        result = plan.apply(printer_cfgs[:1], dry_run=True)[0]
+
+        assert result.status == PatchStatus.UNCHANGED
+        assert result.diff == ""
+
+    def test_add_section_ignores_included_files_by_default(self, printer_cfgs):
+        plan = ConfigPatchPlan().add_section("pause_resume")
+
+        result = plan.apply(printer_cfgs[:1])[0]
+
+        assert result.status == PatchStatus.CHANGED
+        assert "[pause_resume]" in printer_cfgs[0].read_text()
+
+    def test_add_section_skip_if_included(self, printer_cfgs):
+        plan = ConfigPatchPlan().add_section("pause_resume", skip_if_included=True)
+
+        result = plan.apply(printer_cfgs[:1])[0]
+
+        assert result.status == PatchStatus.UNCHANGED
+        assert result.messages == [
+            "Section already exist in an included file. Skipped ..."
+        ]
+        assert printer_cfgs[0].read_text() == PRINTER_CFG
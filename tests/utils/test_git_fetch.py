@@ -0,0 +1,124 @@
+import os
+import subprocess
+
+import pytest
+from utils.git_fetch import GitFetchScheduler, get_last_fetch
+
+
+@pytest.fixture(autouse=True)
+def git_env(tmp_path, monkeypatch):
+    # isolate the fixture repositories from the global and system git config
+    monkeypatch.setenv("HOME", tmp_path.as_posix())
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for var in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{var}_NAME", "kiauh")
+        monkeypatch.setenv(f"{var}_EMAIL", "kiauh@localhost")
+
+
+def git(repo, *args):
+    result = subprocess.run(
+        ["git", "-C", repo.as_posix(), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=os.environ,
+    )
+    return result.stdout.strip()
+
+
+def commit(repo, message):
+    git(repo, "commit", "--allow-empty", "-q", "-m", message)
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    upstream = tmp_path.joinpath("upstream")
+    upstream.mkdir()
+    git(upstream, "init", "-q", "-b", "master")
+    git(upstream, "config", "uploadpack.allowFilter", "true")
+    commit(upstream, "initial")
+    git(upstream, "tag", "-a", "-m", "release", "v1.0.0")
+    commit(upstream, "second")
+    commit(upstream, "third")
+    return upstream
+
+
+REFSPEC = "+refs/heads/master:refs/remotes/origin/master"
+
+
+def clone(upstream, target, *args):
+    url = f"file://{upstream.as_posix()}"
+    git(upstream.parent, "clone", "-q", *args, url, target.as_posix())
+    return target
+
+
+class TestGitFetchScheduler:
+    def test_shallow_clone_keeps_boundary_and_gets_new_tag(self, upstream, tmp_path):
+        repo = clone(upstream, tmp_path.joinpath("shallow"), "--depth=1")
+        commit(upstream, "fourth")
+        git(upstream, "tag", "-a", "-m", "release", "v2.0.0")
+        commit(upstream, "fifth")
+
+        result = GitFetchScheduler().add(repo).run(force=True)[repo]
+
+        assert result.fetched and result.error is None
+        assert repo.joinpath(".git", "shallow").is_file()
+        # the commit of the shallow clone and the three new ones
+        assert git(repo, "rev-list", "--count", "origin/master") == "3"
+        assert git(repo, "describe", "--tags", "origin/master").startswith("v2.0.0-1-g")
+
+    def test_full_clone_fetches_tracked_branch(self, upstream, tmp_path):
+        repo = clone(upstream, tmp_path.joinpath("full"))
+        commit(upstream, "fourth")
+        git(upstream, "tag", "v2.0.0")
+
+        results = GitFetchScheduler().add(repo).run(force=True)
+
+        assert results[repo].error is None
+        assert git(repo, "rev-parse", "origin/master") == git(
+            upstream, "rev-parse", "HEAD"
+        )
+        assert git(repo, "tag") == "v1.0.0\nv2.0.0"
+        assert get_last_fetch(repo) is not None
+
+    def test_recently_fetched_repo_is_skipped(self, upstream, tmp_path):
+        repo = clone(upstream, tmp_path.joinpath("full"))
+        scheduler = GitFetchScheduler(min_interval=300).add(repo)
+        assert scheduler.run(force=True)[repo].fetched
+
+        assert not scheduler.run()[repo].fetched
+        assert scheduler.run(force=True)[repo].fetched
+
+    def test_failed_fetch_reports_error_of_each_repo(self, upstream, tmp_path):
+        good = clone(upstream, tmp_path.joinpath("good"))
+        bad = clone(upstream, tmp_path.joinpath("bad"))
+        git(bad, "remote", "set-url", "origin", tmp_path.joinpath("gone").as_posix())
+
+        results = GitFetchScheduler().add(good, bad).run(force=True)
+
+        assert results[good].error is None
+        assert results[bad].fetched
+        assert results[bad].error
+
+    def test_non_repositories_are_ignored(self, tmp_path):
+        scheduler = GitFetchScheduler().add(tmp_path, tmp_path.joinpath("missing"))
+
+        assert scheduler.run() == {}
+
+    def test_fetch_cmd(self, upstream, tmp_path):
+        full = clone(upstream, tmp_path.joinpath("full"))
+        partial = clone(upstream, tmp_path.joinpath("partial"), "--filter=blob:none")
+        shallow = clone(upstream, tmp_path.joinpath("shallow"), "--depth=1")
+        scheduler = GitFetchScheduler()
+
+        base = ["git", "-C", "{}", "fetch", "--quiet"]
+        for repo, args in (
+            (full, ["origin", REFSPEC]),
+            (shallow, ["origin", REFSPEC]),
+            (partial, ["--filter=blob:none", "origin", REFSPEC]),
+        ):
+            expected = [a.format(repo.as_posix()) for a in base] + args
+            assert scheduler._get_fetch_cmd(repo) == expected
+
+        git(full, "checkout", "-q", "--detach")
+        assert scheduler._get_fetch_cmd(full)[-1] == "--quiet"
@@ -0,0 +1,148 @@
+import os
+import subprocess
+
+import pytest
+from utils.git_history import CommitGraph, DescribeEngine
+
+
+@pytest.fixture(autouse=True)
+def git_env(tmp_path, monkeypatch):
+    # isolate the fixture repositories from the global and system git config
+    monkeypatch.setenv("HOME", tmp_path.as_posix())
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for var in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{var}_NAME", "kiauh")
+        monkeypatch.setenv(f"{var}_EMAIL", "kiauh@localhost")
+
+
+def git(repo, *args, env=None):
+    result = subprocess.run(
+        ["git", "-C", repo.as_posix(), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+    )
+    return result.stdout.strip()
+
+
+def commit(repo, message):
+    # the commits get increasing dates, so that the order of the history walk
+    # does not depend on how fast the fixture was created
+    date = f"{1700000000 + int(git(repo, 'rev-list', '--all', '--count'))} +0000"
+    env = {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+    git(repo, "commit", "--allow-empty", "-q", "-m", message, env=env)
+    return git(repo, "rev-parse", "HEAD")
+
+
+def git_describe(repo, sha):
+    # cut like the DescribeEngine, e.g. "v1.0.0-3-g1234567" to "v1.0.0-3"
+    described = git(repo, "describe", "--tags", "--always", sha)
+    return "-".join(described.split("-")[:2])
+
+
+def all_commits(repo):
+    return git(repo, "rev-list", "--all").split()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path.joinpath("klipper")
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "master")
+    commit(repo, "initial")
+    git(repo, "tag", "v0.11.0")
+    commit(repo, "second")
+    git(repo, "tag", "-a", "-m", "release", "v0.12.0")
+    commit(repo, "third")
+    git(repo, "checkout", "-q", "-b", "feature", "HEAD~2")
+    commit(repo, "feature")
+    git(repo, "tag", "-a", "-m", "release", "v0.11.1")
+    commit(repo, "feature fix")
+    git(repo, "checkout", "-q", "master")
+    git(repo, "merge", "-q", "--no-ff", "-m", "merge feature", "feature")
+    commit(repo, "fourth")
+    return repo
+
+
+@pytest.fixture
+def engine():
+    return DescribeEngine()
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+    load = CommitGraph.load
+
+    def counting_load(repo, revs):
+        calls.append(list(revs))
+        return load(repo, revs)
+
+    monkeypatch.setattr(CommitGraph, "load", counting_load)
+    return calls
+
+
+class TestDescribeEngine:
+    def test_same_as_git_describe(self, repo, engine):
+        shas = all_commits(repo)
+
+        described = engine.describe(repo, shas)
+
+        assert described == {sha: git_describe(repo, sha) for sha in shas}
+        # lightweight and annotated tags, and a merge of both branches
+        assert set(described.values()) >= {"v0.11.0", "v0.12.0", "v0.11.1"}
+        # the tag of the merged branch is found first
+        assert described[git(repo, "rev-parse", "HEAD")] == "v0.11.1-5"
+
+    def test_untagged_history_is_described_by_abbreviated_sha(self, repo, engine):
+        for tag in git(repo, "tag").split():
+            git(repo, "tag", "-d", tag)
+        shas = all_commits(repo)
+
+        described = engine.describe(repo, shas)
+
+        assert described == {sha: git_describe(repo, sha) for sha in shas}
+        assert all(sha.startswith(described[sha]) for sha in shas)
+
+    def test_shallow_clone(self, repo, tmp_path, engine):
+        url = f"file://{repo.as_posix()}"
+        shallow = tmp_path.joinpath("shallow")
+        git(tmp_path, "clone", "-q", "--depth=4", url, shallow.as_posix())
+        shas = all_commits(shallow)
+
+        described = engine.describe(shallow, shas)
+
+        assert shallow.joinpath(".git", "shallow").is_file()
+        assert described == {sha: git_describe(shallow, sha) for sha in shas}
+        # the tag of the first commit is cut off, the one of the merged branch not
+        assert "v0.11.0" not in described.values()
+        assert "v0.11.1" in described.values()
+
+    def test_memoized_results_are_reused(self, repo, engine, loads):
+        shas = all_commits(repo)
+        first = engine.describe(repo, shas[:2])
+        assert engine.describe(repo, shas[:2]) == first
+        assert len(loads) == 1
+
+        # only the commits not described yet are read
+        engine.describe(repo, shas)
+        assert loads[1] == shas[2:]
+
+    def test_memoized_results_are_dropped_when_tags_change(self, repo, engine, loads):
+        head = git(repo, "rev-parse", "HEAD")
+        assert engine.describe(repo, [head]) == {head: "v0.11.1-5"}
+
+        git(repo, "tag", "v0.13.0")
+        assert engine.describe(repo, [head]) == {head: "v0.13.0"}
+
+        git(repo, "tag", "-d", "v0.13.0")
+        git(repo, "pack-refs", "--all")
+        assert engine.describe(repo, [head]) == {head: git_describe(repo, head)}
+        assert len(loads) == 3
+
+    def test_unknown_commits_and_repositories(self, repo, tmp_path, engine):
+        missing = "0" * 40
+
+        assert engine.describe(repo, [missing]) == {missing: None}
+        assert engine.describe(tmp_path, [missing]) == {missing: None}
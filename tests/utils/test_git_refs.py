@@ -0,0 +1,232 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+from utils.git_refs import GitRefError, GitRefReader, _parse_config
+
+
+@pytest.fixture
+def git_env(tmp_path, monkeypatch):
+    # isolate the fixture repositories from the global and system git config
+    monkeypatch.setenv("HOME", tmp_path.as_posix())
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for var in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{var}_NAME", "kiauh")
+        monkeypatch.setenv(f"{var}_EMAIL", "kiauh@localhost")
+
+
+def git(repo, *args):
+    result = subprocess.run(
+        ["git", "-C", repo.as_posix(), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=os.environ,
+    )
+    return result.stdout.strip()
+
+
+def commit(repo, message):
+    git(repo, "commit", "--allow-empty", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path, git_env):
+    repo = tmp_path.joinpath("klipper")
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "master")
+    git(repo, "remote", "add", "origin", "https://github.com/Klipper3d/klipper.git")
+    commit(repo, "initial")
+    git(repo, "tag", "v0.12.0")
+    git(repo, "tag", "-a", "-m", "release", "v0.13.0")
+    commit(repo, "second")
+    return repo
+
+
+class TestGitRefReader:
+    def test_loose_refs(self, repo):
+        reader = GitRefReader(repo)
+
+        assert reader.get_branch() == "master"
+        assert reader.get_packed_refs() == {}
+        for ref in ("HEAD", "refs/heads/master", "refs/tags/v0.12.0"):
+            assert reader.resolve(ref) == git(repo, "rev-parse", ref)
+        # an annotated tag resolves to the tag object, same as git
+        assert reader.resolve("refs/tags/v0.13.0") == git(
+            repo, "rev-parse", "refs/tags/v0.13.0"
+        )
+        assert reader.resolve("refs/heads/missing") is None
+
+    def test_packed_refs(self, repo):
+        git(repo, "pack-refs", "--all")
+        assert not repo.joinpath(".git", "refs", "heads", "master").exists()
+        reader = GitRefReader(repo)
+
+        packed = reader.get_packed_refs()
+        assert packed["refs/heads/master"] == git(repo, "rev-parse", "master")
+        assert packed["refs/tags/v0.13.0"] == git(repo, "rev-parse", "v0.13.0")
+        # the peeled commit of the annotated tag is no ref of its own
+        assert len(packed) == 3
+        assert reader.resolve("HEAD") == git(repo, "rev-parse", "HEAD")
+
+    def test_loose_ref_takes_precedence_over_packed_ref(self, repo):
+        git(repo, "pack-refs", "--all")
+        head = commit(repo, "third")
+        reader = GitRefReader(repo)
+
+        assert reader.get_packed_refs()["refs/heads/master"] != head
+        assert reader.resolve("refs/heads/master") == head
+        assert reader.resolve("HEAD") == head
+
+    def test_detached_head(self, repo):
+        sha = git(repo, "rev-parse", "HEAD~1")
+        git(repo, "checkout", "-q", "--detach", sha)
+        reader = GitRefReader(repo)
+
+        assert reader.get_branch() is None
+        assert reader.resolve("HEAD") == sha
+        assert reader.get_upstream_ref() is None
+        assert reader.get_upstream_ref("master") == "refs/remotes/origin/master"
+
+    def test_gitdir_file_with_absolute_path(self, tmp_path, git_env):
+        repo = tmp_path.joinpath("moonraker")
+        git_dir = tmp_path.joinpath("store", "moonraker.git")
+        git_dir.parent.mkdir()
+        git(tmp_path, "init", "-q", "-b", "main", f"--separate-git-dir={git_dir}", repo)
+        head = commit(repo, "initial")
+        reader = GitRefReader(repo)
+
+        assert repo.joinpath(".git").is_file()
+        assert reader.git_dir == git_dir.resolve()
+        assert reader.common_dir == git_dir.resolve()
+        assert reader.get_branch() == "main"
+        assert reader.resolve("HEAD") == head
+
+    def test_gitdir_file_with_relative_path(self, repo, tmp_path):
+        # like a submodule, whose git directory is in the parent repository
+        git_dir = tmp_path.joinpath("parent", ".git", "modules", "klipper")
+        git_dir.parent.mkdir(parents=True)
+        shutil.move(repo.joinpath(".git").as_posix(), git_dir.as_posix())
+        repo.joinpath(".git").write_text("gitdir: ../parent/.git/modules/klipper\n")
+        reader = GitRefReader(repo)
+
+        assert reader.git_dir == git_dir.resolve()
+        assert reader.get_branch() == "master"
+        assert reader.resolve("HEAD") == git(repo, "rev-parse", "HEAD")
+
+    def test_linked_worktree(self, repo, tmp_path):
+        worktree = tmp_path.joinpath("klipper-feature")
+        git(repo, "worktree", "add", "-q", "-b", "feature", worktree, "HEAD~1")
+        head = commit(worktree, "feature")
+        reader = GitRefReader(worktree)
+
+        assert reader.git_dir == repo.joinpath(".git", "worktrees", worktree.name)
+        assert reader.common_dir == repo.joinpath(".git").resolve()
+        assert reader.get_branch() == "feature"
+        assert reader.resolve("HEAD") == head
+        # branches, tags and config are shared with the main worktree
+        assert reader.resolve("refs/heads/master") == git(repo, "rev-parse", "HEAD")
+        assert reader.resolve("refs/heads/feature") == head
+        assert reader.get_remote_url() == "https://github.com/Klipper3d/klipper.git"
+        assert GitRefReader(repo).get_branch() == "master"
+
+    def test_upstream_of_branch(self, repo):
+        git(repo, "remote", "add", "fork", "https://github.com/someone/klipper.git")
+        git(repo, "branch", "-q", "dev")
+        git(repo, "branch", "-q", "local")
+        git(repo, "config", "branch.master.remote", "fork")
+        git(repo, "config", "branch.master.merge", "refs/heads/stable")
+        git(repo, "config", "branch.local.remote", ".")
+        git(repo, "config", "branch.local.merge", "refs/heads/master")
+        reader = GitRefReader(repo)
+
+        assert reader.get_upstream_ref() == "refs/remotes/fork/stable"
+        assert reader.get_upstream_ref("local") == "refs/heads/master"
+        # a branch without upstream tracks the branch of the same name on origin
+        assert reader.get_upstream_ref("dev") == "refs/remotes/origin/dev"
+        assert reader.get_remote_url("fork") == "https://github.com/someone/klipper.git"
+        assert reader.get_remote_url("missing") is None
+
+    def test_changed_config_is_read_again(self, repo):
+        reader = GitRefReader(repo)
+        assert reader.get_remote_url() == "https://github.com/Klipper3d/klipper.git"
+
+        git(repo, "remote", "set-url", "origin", "https://github.com/dw-0/klipper.git")
+
+        assert reader.get_remote_url() == "https://github.com/dw-0/klipper.git"
+
+    def test_no_git_repository(self, tmp_path):
+        with pytest.raises(GitRefError):
+            GitRefReader(tmp_path)
+
+        tmp_path.joinpath(".git").write_text("not a gitdir file\n")
+        with pytest.raises(GitRefError):
+            GitRefReader(tmp_path)
+
+
+CONFIG = r"""
+# a comment
+[core]
+	repositoryformatversion = 0
+	bare = false ; inline comment
+[remote "origin"]
+	url = "https://example.com/with space.git"
+	fetch = +refs/heads/*:refs/remotes/origin/*
+[branch "Feature/Mixed-Case"]
+	remote = origin
+	merge = refs/heads/Feature/Mixed-Case
+[Section "sub \"quoted\" \\ name"]
+	Key = value
+[alias]
+	hash = "log -1 --format=#%h; echo"
+	path = C:\\Users\\kiauh
+	multi = first\tsecond\nthird
+	mixed = unquoted "quoted ; part" # comment
+	flag
+	empty =
+[user] name = kiauh
+"""
+
+
+def git_config_list(path):
+    # -z separates the key and value by a newline and entries by NUL,
+    # a key without value is printed without newline
+    output = subprocess.run(
+        ["git", "config", "--file", path.as_posix(), "--list", "-z"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    values = {}
+    for entry in output.split("\0"):
+        if entry:
+            key, sep, value = entry.partition("\n")
+            values[key] = value if sep else "true"
+    return values
+
+
+class TestParseConfig:
+    def test_same_values_as_git(self, tmp_path, git_env):
+        path = tmp_path.joinpath("config")
+        path.write_text(CONFIG)
+
+        assert _parse_config(CONFIG) == git_config_list(path)
+
+    def test_quoted_and_escaped_values(self):
+        values = _parse_config(CONFIG)
+
+        assert values["remote.origin.url"] == "https://example.com/with space.git"
+        assert values["core.bare"] == "false"
+        assert values["branch.Feature/Mixed-Case.merge"] == (
+            "refs/heads/Feature/Mixed-Case"
+        )
+        assert values['section.sub "quoted" \\ name.key'] == "value"
+        assert values["alias.hash"] == "log -1 --format=#%h; echo"
+        assert values["alias.path"] == "C:\\Users\\kiauh"
+        assert values["alias.multi"] == "first\tsecond\nthird"
+        assert values["alias.mixed"] == "unquoted quoted ; part"
+        assert values["alias.flag"] == "true"
+        assert values["alias.empty"] == ""
+        assert values["user.name"] == "kiauh"
@@ -0,0 +1,129 @@
+from subprocess import CalledProcessError
+
+import pytest
+from components.klipper.klipper import Klipper
+from core.instance_manager.systemd_backend import set_systemd_backend
+from utils import instance_utils
+from utils.instance_utils import UnitStatusTable
+from utils.sys_utils import UnitState
+
+
+class FakeRegistry:
+    def __init__(self, names):
+        self.names = names
+
+    def get_service_names(self):
+        return list(self.names)
+
+
+class FakeBackend:
+    """A systemd backend returning fixed unit states and counting its queries"""
+
+    def __init__(self, active=(), missing=(), failing=False):
+        self.active = set(active)
+        self.missing = set(missing)
+        self.failing = failing
+        self.queries = 0
+
+    def get_unit_states(self, names):
+        self.queries += 1
+        if self.failing:
+            raise CalledProcessError(1, ["systemctl", "show"])
+        return {
+            name: UnitState(
+                name,
+                "loaded",
+                "active" if name in self.active else "inactive",
+                "running" if name in self.active else "dead",
+            )
+            for name in names
+            if name not in self.missing
+        }
+
+
+KLIPPERS = [Klipper("1"), Klipper("2")]
+NAMES = [k.service_file_path.name for k in KLIPPERS]
+
+
+@pytest.fixture
+def backend():
+    backend = FakeBackend(active=NAMES[:1])
+    set_systemd_backend(backend)
+    yield backend
+    set_systemd_backend(None)
+
+
+@pytest.fixture
+def registry():
+    return FakeRegistry(NAMES)
+
+
+@pytest.fixture
+def table(registry):
+    return UnitStatusTable(registry, ttl=2.0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(instance_utils.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestUnitStatusTable:
+    def test_count_active(self, backend, table):
+        assert table.count_active(KLIPPERS) == 1
+        assert table.count_active([]) == 0
+
+    def test_count_active_is_unknown_if_query_failed(self, backend, table):
+        backend.failing = True
+
+        assert table.count_active(KLIPPERS) is None
+        assert table.get_states() == {}
+
+    def test_count_active_is_unknown_if_a_unit_is_missing(self, backend, table):
+        backend.missing.add(NAMES[1])
+
+        assert table.count_active(KLIPPERS) is None
+        assert table.count_active(KLIPPERS[:1]) == 1
+
+    def test_states_are_reused_until_ttl_expired(self, backend, table, clock):
+        table.get_states()
+        clock[0] += 2.0
+        table.get_states()
+        assert backend.queries == 1
+
+        clock[0] += 0.1
+        table.get_states()
+        assert backend.queries == 2
+
+    @pytest.mark.parametrize("failing, missing", [(True, ()), (False, NAMES[1:])])
+    def test_failed_or_partial_query_is_reused_until_ttl_expired(
+        self, backend, table, clock, failing, missing
+    ):
+        backend.failing = failing
+        backend.missing.update(missing)
+
+        for _ in range(3):
+            table.count_active(KLIPPERS)
+        assert backend.queries == 1
+
+        clock[0] += 2.1
+        table.count_active(KLIPPERS)
+        assert backend.queries == 2
+
+    def test_changed_service_files_are_queried_at_once(
+        self, backend, table, registry, clock
+    ):
+        table.get_states()
+        registry.names = NAMES[:1]
+
+        assert list(table.get_states()) == NAMES[:1]
+        assert backend.queries == 2
+
+    def test_invalidate(self, backend, table, clock):
+        table.get_states()
+        table.invalidate()
+        table.get_states()
+
+        assert backend.queries == 2
@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+from utils.privileged_ops import HELPER_SCRIPT, PrivilegedFileOps, PrivilegedOpError
+
+
+@pytest.fixture
+def ops():
+    # the helper runs without sudo, as the current user
+    ops = PrivilegedFileOps([sys.executable, HELPER_SCRIPT.as_posix()])
+    yield ops
+    ops.close()
+
+
+class TestPrivilegedFileOps:
+    def test_file_operations_share_one_helper(self, ops, tmp_path):
+        src = tmp_path.joinpath("a.service")
+        ops.write_file(src, "[Unit]\n", mode=0o600)
+        process = ops._process
+        ops.copy(src, tmp_path.joinpath("b.service"))
+        ops.symlink(src, tmp_path.joinpath("link.service"))
+
+        assert ops._process is process
+        assert src.read_text() == "[Unit]\n"
+        assert src.stat().st_mode & 0o777 == 0o600
+        assert tmp_path.joinpath("b.service").read_text() == "[Unit]\n"
+        assert tmp_path.joinpath("link.service").resolve() == src
+
+        ops.remove(tmp_path)
+        assert not tmp_path.exists()
+
+    def test_failed_operation_raises_and_helper_keeps_running(self, ops, tmp_path):
+        missing = tmp_path.joinpath("missing", "a.service")
+
+        with pytest.raises(PrivilegedOpError) as e:
+            ops.copy(missing, tmp_path.joinpath("b.service"))
+        assert str(e.value).startswith(f"Failed to copy {missing} ")
+
+        ops.write_file(tmp_path.joinpath("c.service"), "")
+        assert tmp_path.joinpath("c.service").exists()
+
+    def test_helper_is_restarted_after_it_died(self, ops, tmp_path):
+        ops.write_file(tmp_path.joinpath("a.service"), "")
+        ops._process.kill()
+        ops._process.wait()
+
+        ops.write_file(tmp_path.joinpath("b.service"), "")
+        assert tmp_path.joinpath("b.service").exists()
+
+    def test_helper_that_cannot_start_raises(self, tmp_path):
+        ops = PrivilegedFileOps([tmp_path.joinpath("missing").as_posix()])
+
+        with pytest.raises(PrivilegedOpError, match="privileged helper failed"):
+            ops.remove(tmp_path)
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+from core.types import ComponentStatus
+from utils.status_utils import StatusCollector, StatusProbeTimeout, StatusSnapshotStore
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    return tmp_path.joinpath("status-snapshot.json")
+
+
+class BlockingProbe:
+    """A probe blocking until released, counting its calls"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self) -> int:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        return self.calls
+
+
+class TestStatusCollector:
+    def test_exclusive_probe_is_waited_for(self):
+        probe = BlockingProbe()
+        results = {}
+        collector = StatusCollector(timeout=0.05).add("system", probe, exclusive=True)
+        threading.Timer(0.3, probe.release.set).start()
+
+        errors = collector.collect(results.__setitem__)
+
+        assert errors == {}
+        assert results == {"system": 1}
+
+    def test_timed_out_probe_is_not_started_again_while_running(self):
+        probe = BlockingProbe()
+        collector = StatusCollector(timeout=0.05).add("apt", probe)
+
+        for _ in range(3):
+            errors = collector.collect(lambda name, value: None)
+            assert isinstance(errors["apt"], StatusProbeTimeout)
+        assert probe.calls == 1
+
+        probe.release.set()
+        results = {}
+        assert StatusCollector().add("apt", probe).collect(results.__setitem__) == {}
+        # either the running call or a new one delivers the result
+        assert results["apt"] in (1, 2)
+
+    def test_collector_joins_probe_still_running_from_another_one(self):
+        probe = BlockingProbe()
+        first = {}
+        thread = threading.Thread(
+            target=lambda: (
+                StatusCollector()
+                .add("system", probe, exclusive=True)
+                .collect(first.__setitem__)
+            )
+        )
+        thread.start()
+        assert probe.started.wait(timeout=5)
+
+        threading.Timer(0.1, probe.release.set).start()
+        second = {}
+        StatusCollector().add("system", probe, exclusive=True).collect(
+            second.__setitem__
+        )
+        thread.join(timeout=5)
+
+        assert probe.calls == 1
+        assert first == second == {"system": 1}
+
+
+class TestStatusSnapshotStore:
+    def test_snapshots_are_persisted(self, snapshot_file):
+        status = ComponentStatus(status=2, repo="klipper", instances=2)
+        store = StatusSnapshotStore(snapshot_file).register("kl", lambda: status)
+        store.register("version", lambda: "v6.0.0")
+        store.refresh()
+
+        loaded = StatusSnapshotStore(snapshot_file)
+        assert loaded.get("kl") == status
+        assert loaded.get("version") == "v6.0.0"
+
+    def test_refresher_can_be_started_again_after_stop(self):
+        refreshed = threading.Event()
+        store = StatusSnapshotStore(None).register(
+            "kl", lambda: refreshed.set(), ttl=-1
+        )
+
+        store.start_refresher(interval=0.01)
+        first = store._refresher
+        store.stop_refresher()
+        first.join(timeout=5)
+        assert not first.is_alive()
+
+        refreshed.clear()
+        store.start_refresher(interval=0.01)
+        try:
+            assert store._refresher is not first
+            assert refreshed.wait(timeout=5)
+        finally:
+            store.stop_refresher()
+
+    def test_stopped_refresher_is_replaced_while_still_running(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_probe():
+            started.set()
+            release.wait(timeout=5)
+
+        store = StatusSnapshotStore(None).register("kl", slow_probe, ttl=-1)
+        store.start_refresher(interval=0.01)
+        assert started.wait(timeout=5)
+        first = store._refresher
+        store.stop_refresher()
+
+        store.start_refresher(interval=0.01)
+        release.set()
+        first.join(timeout=5)
+        try:
+            assert not first.is_alive()
+            assert store._refresher is not first
+            assert store._refresher.is_alive()
+        finally:
+            store.stop_refresher()
+
+    def test_refresher_errors_are_kept_for_the_next_redraw(self):
+        error = ValueError("no repository")
+        failed = threading.Event()
+
+        def failing_probe():
+            failed.set()
+            raise error
+
+        store = StatusSnapshotStore(None).register("kl", failing_probe, ttl=-1)
+        store.start_refresher(interval=0.01)
+        try:
+            assert failed.wait(timeout=5)
+            for _ in range(500):
+                errors = store.pop_refresher_errors()
+                if errors:
+                    break
+                time.sleep(0.01)
+        finally:
+            store.stop_refresher()
+
+        assert errors == {"kl": error}
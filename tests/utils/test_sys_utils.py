@@ -0,0 +1,104 @@
+from subprocess import CompletedProcess
+
+import pytest
+from utils import sys_utils
+from utils.sys_utils import (
+    cmd_sysctl_manage,
+    cmd_sysctl_services,
+    systemd_transaction,
+)
+
+
+@pytest.fixture
+def manage_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(sys_utils, "_run_sysctl_manage", calls.append)
+    return calls
+
+
+class TestSystemdTransaction:
+    def test_actions_run_once_when_left(self, manage_calls):
+        with systemd_transaction() as transaction:
+            cmd_sysctl_manage("reset-failed")
+            cmd_sysctl_manage("daemon-reload")
+            cmd_sysctl_manage("daemon-reload")
+            assert manage_calls == []
+
+        assert transaction.actions == ["reset-failed", "daemon-reload"]
+        assert manage_calls == ["daemon-reload", "reset-failed"]
+
+    def test_nested_transaction_joins_outer_one(self, manage_calls):
+        with systemd_transaction() as outer:
+            with systemd_transaction() as inner:
+                sys_utils._record_unit_file_change()
+            assert inner is outer
+            assert manage_calls == []
+
+        assert manage_calls == ["daemon-reload"]
+
+    def test_actions_run_if_an_exception_was_raised(self, manage_calls):
+        with pytest.raises(RuntimeError):
+            with systemd_transaction():
+                cmd_sysctl_manage("daemon-reload")
+                raise RuntimeError
+
+        assert manage_calls == ["daemon-reload"]
+
+    def test_nothing_runs_without_requested_actions(self, manage_calls):
+        with systemd_transaction():
+            pass
+        sys_utils._record_unit_file_change()
+
+        assert manage_calls == []
+
+    def test_actions_run_at_once_outside_a_transaction(self, manage_calls):
+        cmd_sysctl_manage("daemon-reload")
+
+        assert manage_calls == ["daemon-reload"]
+
+
+def unit_state(name, active_state, unit_file_state="enabled"):
+    return sys_utils.UnitState(
+        name, "loaded", active_state, "running", 1, unit_file_state
+    )
+
+
+@pytest.fixture
+def systemctl(monkeypatch):
+    def fake_systemctl(returncode, stderr, states):
+        result = CompletedProcess([], returncode, stderr=stderr)
+        monkeypatch.setattr(sys_utils, "run", lambda *args, **kwargs: result)
+        monkeypatch.setattr(sys_utils, "get_unit_states", lambda names: states)
+
+    return fake_systemctl
+
+
+class TestCmdSysctlServices:
+    def test_failed_restart_of_active_units_is_reported(self, systemctl):
+        names = ["klipper.service", "moonraker.service"]
+        states = {name: unit_state(name, "active") for name in names}
+        systemctl(1, b"sudo: a password is required\n", states)
+
+        assert cmd_sysctl_services(names, "restart") == {
+            name: "sudo: a password is required" for name in names
+        }
+
+    def test_failed_call_is_ignored_for_units_in_proven_state(self, systemctl):
+        names = ["klipper.service", "moonraker.service"]
+        states = {
+            "klipper.service": unit_state("klipper.service", "inactive"),
+            "moonraker.service": unit_state("moonraker.service", "active"),
+        }
+        systemctl(5, b"Failed to stop moonraker.service", states)
+
+        assert cmd_sysctl_services(names, "stop") == {
+            "moonraker.service": "Failed to stop moonraker.service"
+        }
+
+    def test_successful_call_is_verified(self, systemctl):
+        names = ["klipper.service"]
+        systemctl(0, b"", {"klipper.service": unit_state("klipper.service", "failed")})
+
+        assert cmd_sysctl_services(names, "start") == {
+            "klipper.service": "unit is failed (running)"
+        }